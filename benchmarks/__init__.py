@@ -0,0 +1,2 @@
+# benchmarks/__init__.py
+# Empty file
\ No newline at end of file
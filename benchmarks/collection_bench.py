@@ -0,0 +1,160 @@
+# benchmarks/collection_bench.py
+# Times the desktop hot paths against synthetic collections of increasing size.
+#
+#   python -m benchmarks.collection_bench [--sizes 100 1000 10000 50000] [--output results.json]
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+# Point the app at a scratch root before any src module reads settings
+_ROOT = tempfile.mkdtemp(prefix="mtg-obs-bench-")
+os.environ["MTG_OBS_ROOT"] = _ROOT
+
+from benchmarks.common import VirtualDisplay, environment_info, save_results, time_call, time_items  # noqa: E402
+from benchmarks.synthetic import synthetic_cards, write_collection  # noqa: E402
+from src.config.settings import CACHE_DIR, CARD_HEIGHT, CARD_WIDTH, DECKS_DIR  # noqa: E402
+from src.utils.image_cache import image_cache  # noqa: E402
+
+DEFAULT_SIZES = [100, 1000, 10000, 50000]
+SEARCH_QUERIES = ["angel", "mystic drake", "phoenix 00042", "no such card"]
+
+
+def reset_dirs():
+    for directory in (DECKS_DIR, CACHE_DIR):
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory, exist_ok=True)
+    image_cache.reset()
+
+
+def bench_parse():
+    from src.utils.deck_parser import DeckParser
+    parser, init_stats = time_call(DeckParser)
+    deck_lines, read_stats = time_call(parser.get_deck_lines)
+    parsed = []
+    match_stats = time_items(deck_lines, lambda item: parsed.append(parser.pattern.match(item[1])))
+    return {
+        "refresh_deck_files": init_stats,
+        "get_deck_lines": read_stats,
+        "match_lines": match_stats,
+        "lines": len(deck_lines),
+        "unparsed": sum(1 for m in parsed if m is None),
+    }
+
+
+def bench_storage(cards, filenames, budget):
+    from src.utils.cards_storage import add_card, clear_storage
+    clear_storage()
+    return time_items(zip(cards, filenames),
+                      lambda item: add_card(item[0]["card_name"], item[0]["set_code"],
+                                            item[0]["collector_number"], item[1]),
+                      budget)
+
+
+def bench_search():
+    from src.utils.cards_storage import search_cards
+    results = {}
+    for query in SEARCH_QUERIES:
+        matches, stats = time_call(search_cards, query)
+        stats["matches"] = len(matches)
+        results[query] = stats
+    return results
+
+
+def bench_card_index():
+    """Index build, faceted/name query time, and the Tk-side cost of starting a search per keystroke."""
+    from src.utils.card_index import card_index
+    from src.utils.deck_parser import DeckParser
+    from src.utils.latest_task import LatestTaskRunner
+    _, rebuild = time_call(card_index.rebuild, DeckParser())
+    queries = {}
+    for query in SEARCH_QUERIES + ["set:mh3", "category:ramp set:mh3 angel", "deck:synthetic_0000 foil:yes"]:
+        matches, stats = time_call(card_index.search, query)
+        stats["matches"] = len(matches)
+        queries[query] = stats
+    runner = LatestTaskRunner()
+    keystrokes = [SEARCH_QUERIES[1][:i] for i in range(1, len(SEARCH_QUERIES[1]) + 1)]
+    submit = time_items(keystrokes, lambda text: runner.submit(card_index.search, text))
+    runner.cancel()
+    return {"rebuild": rebuild, "search": queries, "submit_per_keystroke": submit}
+
+
+def bench_gui(filenames, budget):
+    import tkinter as tk
+    from src.core.webpage import WebPage
+    from src.gui.base_frame import BaseCardFrame
+    from src.utils.image import CustomImage
+
+    root = tk.Tk()
+    root.withdraw()
+    try:
+        images = []
+
+        def load(filename):
+            image = CustomImage(filename)
+            image.load_thumbnail(CARD_WIDTH, CARD_HEIGHT)
+            images.append(image)
+
+        thumbnails = time_items(filenames, load, budget)
+        frame = BaseCardFrame(root, WebPage())
+        frame.images = images
+        _, grid = time_call(frame.create_grid_of_buttons, show_fav_button=True)
+        _, layout = time_call(root.update_idletasks)
+        grid["tiles"] = len(frame.list_of_buttons)
+        grid["update_idletasks_seconds"] = layout["seconds"]
+        single = {}
+        if images:
+            extra = CustomImage(images[0].name)
+            extra.load_thumbnail(CARD_WIDTH, CARD_HEIGHT)
+            _, single["insert_tile"] = time_call(frame.insert_tile, extra, index=0, show_fav_button=True)
+            replacement = CustomImage(images[0].name)
+            replacement.thumbnail = extra.thumbnail
+            _, single["replace_tile"] = time_call(frame.replace_tile, images[len(images) // 2], replacement,
+                                                  show_fav_button=True)
+            _, single["remove_tile"] = time_call(frame.remove_tile, extra)
+            _, single["update_idletasks"] = time_call(root.update_idletasks)
+        return {"load_thumbnail": thumbnails, "create_grid_of_buttons": grid, "single_tile": single}
+    finally:
+        root.destroy()
+
+
+def run(sizes, budget):
+    results = {"environment": environment_info(), "stage_budget_seconds": budget, "sizes": {}}
+    with VirtualDisplay() as display:
+        for size in sizes:
+            print(f"Benchmarking {size} cards...", file=sys.stderr)
+            reset_dirs()
+            cards = synthetic_cards(size)
+            filenames, generate = time_call(write_collection, DECKS_DIR, image_cache, cards)
+            entry = {
+                "generate": generate,
+                "parse": bench_parse(),
+                "cards_storage_population": bench_storage(cards, filenames, budget),
+                "search_cards": bench_search(),
+                "card_index": bench_card_index(),
+            }
+            if display.available:
+                entry["gui"] = bench_gui(filenames, budget)
+            else:
+                entry["gui"] = {"skipped": display.reason}
+            results["sizes"][str(size)] = entry
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark MTG-OBS hot paths on synthetic collections.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--stage-budget", type=float, default=120.0,
+                        help="Seconds a per-card stage may run before it is cut short and extrapolated")
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/collection-<timestamp>.json)")
+    args = parser.parse_args(argv)
+    try:
+        results = run(args.sizes, args.stage_budget)
+    finally:
+        shutil.rmtree(_ROOT, ignore_errors=True)
+    print(save_results("collection", results, args.output))
+
+
+if __name__ == "__main__":
+    main()
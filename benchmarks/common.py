@@ -0,0 +1,106 @@
+# benchmarks/common.py
+# Shared helpers for benchmark scripts: timing, virtual display and JSON results
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def time_items(items, fn, budget_seconds=None):
+    """Call fn(item) for each item, stopping early once budget_seconds is spent."""
+    items = list(items)
+    done = 0
+    start = time.perf_counter()
+    for item in items:
+        fn(item)
+        done += 1
+        if budget_seconds is not None and time.perf_counter() - start > budget_seconds:
+            break
+    elapsed = time.perf_counter() - start
+    return {
+        "seconds": elapsed,
+        "count": done,
+        "total": len(items),
+        "truncated": done < len(items),
+        "per_item_ms": (elapsed / done * 1000) if done else None,
+        # Linear extrapolation is a floor for anything that degrades with size
+        "projected_seconds": (elapsed / done * len(items)) if done else None,
+    }
+
+
+def time_call(fn, *args, **kwargs):
+    """Time a single call, returning (result, stats)."""
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, {"seconds": time.perf_counter() - start}
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment_info():
+    """Describe the machine and revision a run was taken on."""
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def save_results(name, results, output=None):
+    """Write results as JSON to `output` or benchmarks/results/<name>-<timestamp>.json."""
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        output = os.path.join(RESULTS_DIR, f"{name}-{stamp}.json")
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    return output
+
+
+class VirtualDisplay:
+    """Start Xvfb when no display is available so Tk stages can run headless."""
+
+    def __init__(self, display=":99", size="1920x1080x24"):
+        self.display = display
+        self.size = size
+        self.process = None
+        self.available = bool(os.environ.get("DISPLAY"))
+        self.reason = None
+
+    def __enter__(self):
+        if self.available:
+            return self
+        if not shutil.which("Xvfb"):
+            self.reason = "no DISPLAY and Xvfb is not installed"
+            return self
+        self.process = subprocess.Popen(["Xvfb", self.display, "-screen", "0", self.size],
+                                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        time.sleep(0.5)
+        if self.process.poll() is not None:
+            self.reason = f"Xvfb exited with code {self.process.returncode}"
+            self.process = None
+            return self
+        os.environ["DISPLAY"] = self.display
+        self.available = True
+        return self
+
+    def __exit__(self, *exc):
+        if self.process is not None:
+            self.process.terminate()
+            self.process.wait()
+            os.environ.pop("DISPLAY", None)
+        return False
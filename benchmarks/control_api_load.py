@@ -0,0 +1,131 @@
+# benchmarks/control_api_load.py
+# Load test for the /api control endpoints: concurrent clients against a real local server.
+#
+#   python -m benchmarks.control_api_load [--cards 2000] [--clients 8] [--requests 500]
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+# Point the app at a scratch root before any src module reads settings
+_ROOT = tempfile.mkdtemp(prefix="mtg-obs-api-")
+os.environ["MTG_OBS_ROOT"] = _ROOT
+
+from benchmarks.common import environment_info, save_results  # noqa: E402
+from benchmarks.synthetic import synthetic_cards, write_collection  # noqa: E402
+from src.config.settings import DECKS_DIR  # noqa: E402
+from src.utils.image_cache import image_cache  # noqa: E402
+
+
+def percentiles(samples):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+
+    def pick(p):
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+    return {"count": len(ordered), "mean_ms": statistics.fmean(ordered),
+            "p50_ms": pick(50), "p95_ms": pick(95), "p99_ms": pick(99), "max_ms": ordered[-1]}
+
+
+def start_server():
+    """Serve the control API on an ephemeral port, without the app's own server thread."""
+    from werkzeug.serving import make_server
+    from src.core.webpage import WebPage
+    from src.web.control_api import register_control_api
+    from src.web.server import app
+
+    register_control_api(app, WebPage())
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def make_request(kind, cards, rng):
+    """(method, path, json body) for one request of the given kind."""
+    card = rng.choice(cards)
+    if kind == "set":
+        return "POST", f"/api/slots/{rng.randint(1, 2)}", {"card": card}
+    if kind == "push":
+        return "POST", "/api/push", {"card": card}
+    if kind == "batch":
+        return "POST", "/api/batch", {"ops": [{"op": "set", "slot": 1, "card": card},
+                                              {"op": "set", "slot": 2, "card": rng.choice(cards)}]}
+    if kind == "lookup":
+        return "GET", f"/api/cards?name={card.split('_')[0]}&limit=5", None
+    return "GET", "/api/slots", None
+
+
+def client(base_url, kinds, cards, count, seed, latencies, handler_times, errors):
+    import requests
+    rng = random.Random(seed)
+    session = requests.Session()
+    for _ in range(count):
+        kind = rng.choice(kinds)
+        method, path, body = make_request(kind, cards, rng)
+        started = time.perf_counter()
+        response = session.request(method, base_url + path, json=body)
+        latencies[kind].append((time.perf_counter() - started) * 1000)
+        if response.status_code != 200:
+            errors.append(f"{method} {path}: HTTP {response.status_code}")
+            continue
+        timing = response.headers.get("Server-Timing", "")
+        if "dur=" in timing:
+            handler_times[kind].append(float(timing.split("dur=")[1]))
+
+
+def run(card_count, client_count, requests_per_client):
+    cards = synthetic_cards(card_count)
+    keys = write_collection(DECKS_DIR, image_cache, cards, png_bytes=b"\x89PNG stub")
+    server, base_url = start_server()
+    kinds = ["get", "set", "push", "batch", "lookup"]
+    latencies = {kind: [] for kind in kinds}
+    handler_times = {kind: [] for kind in kinds}
+    errors = []
+    threads = [threading.Thread(target=client, args=(base_url, kinds, keys, requests_per_client, seed,
+                                                      latencies, handler_times, errors))
+               for seed in range(client_count)]
+    print(f"Running {client_count} clients x {requests_per_client} requests...", file=sys.stderr)
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    server.shutdown()
+    total = client_count * requests_per_client
+    return {
+        "environment": environment_info(),
+        "cards": card_count,
+        "clients": client_count,
+        "requests": total,
+        "seconds": elapsed,
+        "requests_per_second": total / elapsed,
+        "errors": len(errors),
+        "first_errors": errors[:5],
+        "round_trip": {kind: percentiles(samples) for kind, samples in latencies.items()},
+        "handler": {kind: percentiles(samples) for kind, samples in handler_times.items()},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the overlay control API.")
+    parser.add_argument("--cards", type=int, default=2000)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=500, help="Requests per client")
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/control-api-<timestamp>.json)")
+    args = parser.parse_args(argv)
+    try:
+        results = run(args.cards, args.clients, args.requests)
+    finally:
+        shutil.rmtree(_ROOT, ignore_errors=True)
+    print(save_results("control-api", results, args.output))
+
+
+if __name__ == "__main__":
+    main()
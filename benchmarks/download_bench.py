@@ -0,0 +1,198 @@
+# benchmarks/download_bench.py
+# Throughput and resilience of the Scryfall fetch pipeline against a local fake Scryfall.
+#
+#   python -m benchmarks.download_bench [--cards 300] [--scenarios clean latency flaky] [--output results.json]
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.fake_scryfall import FakeScryfall, Faults
+
+# Point the app at a scratch root and the fake API before any src module reads settings
+_ROOT = tempfile.mkdtemp(prefix="mtg-obs-download-")
+os.environ["MTG_OBS_ROOT"] = _ROOT
+FAKE = FakeScryfall(count=300, reprints=3, page_size=50).start()
+os.environ["MTG_OBS_SCRYFALL_URL"] = FAKE.api_url
+
+from benchmarks.common import environment_info, save_results  # noqa: E402
+from src.config.settings import CACHE_DIR  # noqa: E402
+from src.utils.image import download_scryfall_images  # noqa: E402
+from src.utils.image_cache import image_cache  # noqa: E402
+from src.utils.download_queue import download_queue, fetch_stream_quality  # noqa: E402
+from src.utils.printings_cache import printings_cache  # noqa: E402
+from src.utils.scryfall_client import scryfall_client  # noqa: E402
+from src.utils.scryfall_stream import ScryfallSearchStream  # noqa: E402
+from src.utils.autocomplete import CardNameCompleter  # noqa: E402
+
+SCENARIOS = {
+    "clean": Faults(),
+    "latency": Faults(latency_ms=40, jitter_ms=20),
+    "flaky": Faults(latency_ms=10, jitter_ms=5, rate_limit_rate=0.03, error_rate=0.03, truncate_rate=0.03, seed=1),
+}
+
+
+def reset_cache():
+    shutil.rmtree(CACHE_DIR, ignore_errors=True)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    image_cache.reset()
+    printings_cache.reset()
+    download_queue.clear()
+
+
+def deck_cards(count):
+    """Download jobs for the first printing of `count` fixture names, like a parsed deck."""
+    cards = [card for card in FAKE.cards if card["id"].endswith("0" * 12)][:count]
+    return [{"card_name": card["name"].split(" // ")[0], "set_code": card["set"],
+             "collector_number": card["collector_number"], "is_foil": False} for card in cards]
+
+
+def expected_images(jobs):
+    by_print = {(card["set"], card["collector_number"]): card for card in FAKE.cards}
+    return sum(len(by_print[(job["set_code"], job["collector_number"])].get("card_faces", [None])) for job in jobs)
+
+
+def bench_downloads(jobs):
+    """Download every job into an empty cache, then resume whatever the first run left pending."""
+    reset_cache()
+    FAKE.reset_stats()
+    start = time.perf_counter()
+    download_scryfall_images(jobs)
+    elapsed = time.perf_counter() - start
+    pending_after_first_run = len(download_queue.pending())
+    resume_start = time.perf_counter()
+    download_queue.run()
+    resume_seconds = time.perf_counter() - resume_start
+    cache_bytes = image_cache.total_size()
+    server = dict(FAKE.stats)
+    upgrade_start = time.perf_counter()
+    upgraded = fetch_stream_quality(image_cache.keys()[0]) if len(image_cache) else None
+    return {
+        "cards": len(jobs),
+        "seconds": elapsed,
+        "cards_per_second": len(jobs) / elapsed if elapsed else None,
+        "images_expected": expected_images(jobs),
+        "images_stored": len(image_cache),
+        "pending_after_first_run": pending_after_first_run,
+        "pending_after_resume": len(download_queue.pending()),
+        "resume_seconds": resume_seconds,
+        "image_bytes_downloaded": sum(count for stat, count in server.items() if stat.startswith("bytes ")),
+        "cache_bytes": cache_bytes,
+        "stream_upgrade_seconds": time.perf_counter() - upgrade_start if upgraded else None,
+        "server": server,
+    }
+
+
+def bench_search(name, thumb_size=(73, 102)):
+    """Stream every printing matching `name` with thumbnails, as the Scryfall Search tab does."""
+    FAKE.reset_stats()
+    stream = ScryfallSearchStream(name, *thumb_size).start()
+    start = time.perf_counter()
+    first_page = None
+    results = thumbnails = failed = 0
+    while not stream.done:
+        for event in stream.drain(100):
+            if event[0] == "page":
+                first_page = first_page or time.perf_counter() - start
+                results += len(event[1])
+            elif event[3] is None:
+                thumbnails += 1
+            else:
+                failed += 1
+        time.sleep(0.005)
+    return {
+        "query": name,
+        "seconds": time.perf_counter() - start,
+        "first_page_seconds": first_page,
+        "results": results,
+        "thumbnails": thumbnails,
+        "thumbnail_failures": failed,
+        "error": str(stream.error) if stream.error else None,
+        "server": dict(FAKE.stats),
+    }
+
+
+def bench_autocomplete(name):
+    """Look up suggestions for every prefix of `name`, as if each keystroke outlasted the debounce."""
+    FAKE.reset_stats()
+    completer = CardNameCompleter()
+    timings = []
+    failed = 0
+    for end in range(2, len(name) + 1):
+        start = time.perf_counter()
+        try:
+            completer.suggest(name[:end], completer.remote(name[:end]))
+        except Exception:
+            failed += 1  # The search entry keeps its local suggestions and tries again on the next keystroke
+        timings.append(time.perf_counter() - start)
+    return {
+        "query": name,
+        "lookups": len(timings),
+        "requests": completer.stats["requests"],
+        "cache_hits": completer.stats["cache_hits"],
+        "failed_lookups": failed,
+        "max_lookup_seconds": max(timings, default=None),
+        "server": dict(FAKE.stats),
+    }
+
+
+def bench_search_during_download(jobs):
+    """Search while a deck download is running: the interactive search should not queue behind it."""
+    reset_cache()
+    download = threading.Thread(target=download_scryfall_images, args=(jobs,))
+    download.start()
+    time.sleep(0.1)
+    search = bench_search("Phoenix")
+    search["download_still_running"] = download.is_alive()
+    download.join()
+    return search
+
+
+def run(card_count, scenarios):
+    jobs = deck_cards(card_count)
+    results = {"environment": environment_info(), "fixture_printings": len(FAKE.cards), "scenarios": {}}
+    for name in scenarios:
+        print(f"Running {name} scenario...", file=sys.stderr)
+        FAKE.faults = SCENARIOS[name]
+        results["scenarios"][name] = {
+            "download": bench_downloads(jobs),
+            "search": bench_search("Phoenix"),
+            "search_during_download": bench_search_during_download(jobs),
+            "autocomplete": bench_autocomplete(jobs[0]["card_name"] if jobs else "Phoenix"),
+        }
+    results["client_latency"] = scryfall_client.latency_stats()
+    results["scheduler"] = scryfall_client.scheduler_stats()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Scryfall fetch pipeline against a local fake Scryfall.")
+    parser.add_argument("--cards", type=int, default=300, help="Cards to download per scenario (at most 300)")
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--output", help="Write results to this JSON file instead of benchmarks/results/")
+    args = parser.parse_args()
+    try:
+        results = run(args.cards, args.scenarios)
+    finally:
+        FAKE.stop()
+        shutil.rmtree(_ROOT, ignore_errors=True)
+    for name, scenario in results["scenarios"].items():
+        download, search, contended = scenario["download"], scenario["search"], scenario["search_during_download"]
+        autocomplete = scenario["autocomplete"]
+        print(f"{name:8s} download {download['cards']} cards in {download['seconds']:.2f}s "
+              f"({download['images_stored']}/{download['images_expected']} images, "
+              f"{download['pending_after_resume']} still pending, "
+              f"{download['image_bytes_downloaded'] / 1048576:.1f} MB fetched, "
+              f"{download['cache_bytes'] / 1048576:.1f} MB on disk) | search {search['results']} printings, "
+              f"first page {search['first_page_seconds'] or 0:.2f}s, all in {search['seconds']:.2f}s | "
+              f"during download: first page {contended['first_page_seconds'] or 0:.2f}s, "
+              f"all in {contended['seconds']:.2f}s | autocomplete {autocomplete['lookups']} prefixes, "
+              f"{autocomplete['requests']} requests")
+    print(f"Results written to {save_results('download_bench', results, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
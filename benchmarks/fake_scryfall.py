@@ -0,0 +1,282 @@
+# benchmarks/fake_scryfall.py
+# Local stand-in for the Scryfall API and image hosts, with injectable latency and faults.
+#
+#   python -m benchmarks.fake_scryfall [--cards 500] [--reprints 3] [--port 8765] [--error-rate 0.05] ...
+#   MTG_OBS_SCRYFALL_URL=http://127.0.0.1:8765 python main.py
+import argparse
+import io
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlsplit
+
+from PIL import Image
+
+from benchmarks.synthetic import synthetic_cards, _SETS
+
+# Scryfall's image sizes, by the key used in image_uris
+IMAGE_SIZES = {"small": (146, 204), "normal": (488, 680), "png": (745, 1040)}
+SEARCH_PAGE_SIZE = 175  # Scryfall's page size for /cards/search
+DFC_EVERY = 20          # Every Nth fixture card is a transform card with two faces
+_COLOURS = [(90, 60, 120), (150, 40, 40), (40, 120, 60), (30, 70, 150), (200, 170, 60), (80, 80, 80)]
+
+
+class Faults:
+    """What to inject into each response. Rates are per-request probabilities."""
+
+    def __init__(self, latency_ms=0, jitter_ms=0, rate_limit_rate=0.0, error_rate=0.0, truncate_rate=0.0,
+                 retry_after=0.5, seed=0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_limit_rate = rate_limit_rate
+        self.error_rate = error_rate
+        self.truncate_rate = truncate_rate
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def roll(self):
+        """(delay seconds, fault) for one request; fault is None, "429", "5xx" or "truncate"."""
+        with self._lock:
+            delay = max(0.0, self.latency_ms + self.rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+            draw = self.rng.random()
+        for fault, rate in (("429", self.rate_limit_rate), ("5xx", self.error_rate), ("truncate", self.truncate_rate)):
+            if draw < rate:
+                return delay, fault
+            draw -= rate
+        return delay, None
+
+
+def fixture_cards(count, reprints=1, image_base=""):
+    """Scryfall card objects for `count` synthetic names, each printed `reprints` times."""
+    cards = []
+    for i, card in enumerate(synthetic_cards(count)):
+        for r in range(reprints):
+            card_id = f"{i:08x}-0000-4000-8000-{r:012x}"
+            set_code = _SETS[(i + r) % len(_SETS)]
+            collector_number = str(i * reprints + r + 1)
+            scryfall_card = {
+                "object": "card", "id": card_id, "name": card["card_name"], "set": set_code,
+                "collector_number": collector_number, "layout": "normal",
+                "foil": True, "nonfoil": not card["is_foil"],
+            }
+            if i % DFC_EVERY == DFC_EVERY - 1:
+                scryfall_card["layout"] = "transform"
+                scryfall_card["name"] = f"{card['card_name']} // {card['card_name']} Flipped"
+                scryfall_card["card_faces"] = [
+                    {"name": face_name, "image_uris": _image_uris(image_base, f"{card_id}-{face}")}
+                    for face, face_name in enumerate([card["card_name"], f"{card['card_name']} Flipped"])]
+            else:
+                scryfall_card["image_uris"] = _image_uris(image_base, card_id)
+            cards.append(scryfall_card)
+    return cards
+
+
+def _image_uris(image_base, image_id):
+    return {size: f"{image_base}/{size}/{image_id}.{'png' if size == 'png' else 'jpg'}" for size in IMAGE_SIZES}
+
+
+class FakeScryfall:
+    """Serve /cards/collection, /cards/<id>, /cards/autocomplete, paginated /cards/search and card images
+    for synthetic cards.
+
+    The API and the images are served on two ports, like api.scryfall.com and
+    cards.scryfall.io, so the client's rate limit only applies to API calls.
+    `faults` can be swapped at any time; `stats` counts requests, injected faults
+    and image bytes served per size. Images are noisy so that, as on Scryfall,
+    the PNG is many times the size of the JPEG tiers.
+    """
+
+    def __init__(self, count=100, reprints=1, faults=None, page_size=SEARCH_PAGE_SIZE, host="127.0.0.1", port=0):
+        self.faults = faults or Faults()
+        self.page_size = page_size
+        self.stats = Counter()
+        self._stats_lock = threading.Lock()
+        self._image_cache = {}
+        self.api_server = ThreadingHTTPServer((host, port), self._handler(self._route_api))
+        self.image_server = ThreadingHTTPServer((host, 0), self._handler(self._route_image))
+        self.api_url = f"http://{host}:{self.api_server.server_port}"
+        self.image_url = f"http://{host}:{self.image_server.server_port}"
+        self.cards = fixture_cards(count, reprints, image_base=self.image_url)
+        self._by_print = {(card["set"], card["collector_number"]): card for card in self.cards}
+        self._by_id = {card["id"]: card for card in self.cards}
+
+    def start(self):
+        for server in (self.api_server, self.image_server):
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        for server in (self.api_server, self.image_server):
+            server.shutdown()
+            server.server_close()
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self.stats = Counter()
+
+    def count(self, *names):
+        with self._stats_lock:
+            self.stats.update(names)
+
+    def _handler(self, route):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True  # Headers and body go out in separate writes
+
+            def do_GET(self):
+                fake._respond(self, route)
+
+            def do_POST(self):
+                fake._respond(self, route)
+
+            def log_message(self, format, *args):
+                pass
+        return Handler
+
+    def _respond(self, handler, route):
+        length = int(handler.headers.get("Content-Length") or 0)
+        body = handler.rfile.read(length) if length else b""
+        delay, fault = self.faults.roll()
+        if delay:
+            time.sleep(delay)
+        parts = urlsplit(handler.path)
+        endpoint = "/" + "/".join(parts.path.strip("/").split("/")[:2]) if route == self._route_api else "images"
+        self.count(f"requests {endpoint}")
+        if fault == "429":
+            self.count("injected 429")
+            return self._send(handler, 429, _error_json("rate_limited", "Too many requests"),
+                              {"Retry-After": str(self.faults.retry_after)})
+        if fault == "5xx":
+            self.count("injected 5xx")
+            return self._send(handler, 503, _error_json("unavailable", "Service unavailable"))
+        status, payload, content_type = route(handler.command, parts, body)
+        if fault == "truncate" and status == 200:
+            self.count("injected truncation")
+            return self._send(handler, status, payload, {"Content-Type": content_type}, truncate=True)
+        self._send(handler, status, payload, {"Content-Type": content_type})
+
+    @staticmethod
+    def _send(handler, status, payload, headers=None, truncate=False):
+        headers = dict(headers or {})
+        headers.setdefault("Content-Type", "application/json")
+        handler.send_response(status)
+        for name, value in headers.items():
+            handler.send_header(name, value)
+        handler.send_header("Content-Length", str(len(payload)))
+        if truncate:
+            handler.send_header("Connection", "close")
+            handler.close_connection = True
+            payload = payload[:len(payload) // 2]  # Promise the full length, then hang up halfway
+        handler.end_headers()
+        try:
+            handler.wfile.write(payload)
+        except OSError:
+            pass
+
+    def _route_api(self, method, parts, body):
+        if method == "POST" and parts.path == "/cards/collection":
+            identifiers = json.loads(body or b"{}").get("identifiers", [])
+            data, not_found = [], []
+            for identifier in identifiers:
+                card = self._by_print.get((identifier.get("set", "").lower(), str(identifier.get("collector_number"))))
+                if card is None:
+                    not_found.append(identifier)
+                else:
+                    data.append(card)
+            return 200, json.dumps({"object": "list", "not_found": not_found, "data": data}).encode(), "application/json"
+        if method == "GET" and parts.path == "/cards/search":
+            return self._search(parse_qs(parts.query))
+        if method == "GET" and parts.path == "/cards/autocomplete":
+            return self._autocomplete(parse_qs(parts.query).get("q", [""])[0])
+        if method == "GET" and parts.path.startswith("/cards/") and parts.path[len("/cards/"):] in self._by_id:
+            return 200, json.dumps(self._by_id[parts.path[len("/cards/"):]]).encode(), "application/json"
+        return 404, _error_json("not_found", f"No route for {method} {parts.path}"), "application/json"
+
+    def _search(self, query):
+        q = query.get("q", [""])[0]
+        name = q.split('"')[1] if q.count('"') >= 2 else q
+        matches = [card for card in self.cards if name.lower() in card["name"].lower()]
+        if not matches:
+            return 404, _error_json("not_found", "Your query didn't match any cards."), "application/json"
+        page = int(query.get("page", ["1"])[0])
+        start = (page - 1) * self.page_size
+        result = {"object": "list", "total_cards": len(matches), "data": matches[start:start + self.page_size],
+                  "has_more": start + self.page_size < len(matches)}
+        if result["has_more"]:
+            result["next_page"] = f"{self.api_url}/cards/search?q={quote(q)}&page={page + 1}"
+        return 200, json.dumps(result).encode(), "application/json"
+
+    def _autocomplete(self, q):
+        """Up to 20 names with a word starting with `q`, like Scryfall; nothing for fewer than 2 characters."""
+        q = q.lower().strip()
+        names = []
+        if len(q) >= 2:
+            names = sorted(set(card["name"] for card in self.cards
+                               if card["name"].lower().startswith(q) or f" {q}" in card["name"].lower()))
+        result = {"object": "catalog", "total_values": min(len(names), 20), "data": names[:20]}
+        return 200, json.dumps(result).encode(), "application/json"
+
+    def _route_image(self, method, parts, body):
+        segments = parts.path.strip("/").split("/")
+        if method != "GET" or len(segments) != 2 or segments[0] not in IMAGE_SIZES:
+            return 404, b"", "text/plain"
+        data = self._image(segments[0], segments[1])
+        with self._stats_lock:
+            self.stats[f"bytes {segments[0]}"] += len(data)
+        return 200, data, "image/png" if segments[0] == "png" else "image/jpeg"
+
+    def _image(self, size, image_id):
+        """Noisy image of Scryfall's size and format for `size`; a few colours are encoded once and reused."""
+        colour = _COLOURS[sum(image_id.encode()) % len(_COLOURS)]
+        with self._stats_lock:
+            data = self._image_cache.get((size, colour))
+        if data is None:
+            width, height = IMAGE_SIZES[size]
+            noise = Image.effect_noise((width, height), 24).convert("RGB")
+            image = Image.blend(Image.new("RGB", (width, height), colour), noise, 0.25)
+            buffer = io.BytesIO()
+            if size == "png":
+                image.save(buffer, format="PNG")
+            else:
+                image.save(buffer, format="JPEG", quality=85)
+            data = buffer.getvalue()
+            with self._stats_lock:
+                self._image_cache[(size, colour)] = data
+        return data
+
+
+def _error_json(code, details):
+    return json.dumps({"object": "error", "code": code, "details": details}).encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local Scryfall stand-in for offline runs and benchmarks.")
+    parser.add_argument("--cards", type=int, default=500, help="Synthetic card names to serve")
+    parser.add_argument("--reprints", type=int, default=3, help="Printings per card name")
+    parser.add_argument("--port", type=int, default=8765, help="API port (images use a free port)")
+    parser.add_argument("--page-size", type=int, default=SEARCH_PAGE_SIZE)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0, help="Fraction of requests answered with 429")
+    parser.add_argument("--error-rate", type=float, default=0, help="Fraction of requests answered with 503")
+    parser.add_argument("--truncate-rate", type=float, default=0, help="Fraction of bodies cut off halfway")
+    args = parser.parse_args()
+    faults = Faults(args.latency_ms, args.jitter_ms, args.rate_limit_rate, args.error_rate, args.truncate_rate)
+    fake = FakeScryfall(args.cards, args.reprints, faults, args.page_size, port=args.port).start()
+    print(f"Fake Scryfall API at {fake.api_url}, images at {fake.image_url} ({len(fake.cards)} printings)")
+    print(f"Run the app against it with MTG_OBS_SCRYFALL_URL={fake.api_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        fake.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# benchmarks/headless_footprint.py
+# Measures time to a serving overlay and idle memory of `main.py headless`, and checks it never loads Tk.
+#
+#   python -m benchmarks.headless_footprint [--cards 1000] [--idle 5]
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import environment_info, save_results
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def rss_kb(pid):
+    """Resident set size of `pid` in KiB from /proc, or None where /proc is unavailable."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+def loaded_tk(pid):
+    """True if the process has a Tcl/Tk shared library mapped, None where /proc is unavailable."""
+    try:
+        with open(f"/proc/{pid}/maps") as f:
+            return any("libtk" in line or "_tkinter" in line for line in f)
+    except OSError:
+        return None
+
+
+def seed_collection(root, card_count):
+    """Write synthetic decks, images and a matching deck_cache.json so startup needs no network."""
+    code = (
+        "import os, json\n"
+        "from benchmarks.synthetic import synthetic_cards, write_collection\n"
+        "from src.config.settings import DECKS_DIR, CACHE_DIR\n"
+        "from src.core.deck_loader import write_deck_cache, decks_mtime\n"
+        "from src.utils.image_cache import image_cache\n"
+        f"files = write_collection(DECKS_DIR, image_cache, synthetic_cards({card_count}))\n"
+        "write_deck_cache(decks_mtime(os.listdir(DECKS_DIR)), files)\n"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, check=True,
+                   env=dict(os.environ, MTG_OBS_ROOT=root))
+
+
+def wait_for_server(url, timeout=30):
+    import requests
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if requests.get(url, timeout=1).ok:
+                return True
+        except requests.RequestException:
+            time.sleep(0.02)
+    return False
+
+
+def run(card_count, idle_seconds, port):
+    root = tempfile.mkdtemp(prefix="mtg-obs-headless-")
+    try:
+        seed_collection(root, card_count)
+        env = dict(os.environ, MTG_OBS_ROOT=root)
+        started = time.perf_counter()
+        process = subprocess.Popen([sys.executable, "main.py", "headless"], cwd=REPO_ROOT, env=env,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            ready = wait_for_server(f"http://localhost:{port}/slots")
+            time_to_serve = time.perf_counter() - started
+            time.sleep(idle_seconds)
+            return {
+                "environment": environment_info(),
+                "cards": card_count,
+                "ready": ready,
+                "time_to_serve_seconds": time_to_serve,
+                "idle_rss_kb": rss_kb(process.pid),
+                "tk_loaded": loaded_tk(process.pid),
+            }
+        finally:
+            process.terminate()
+            process.wait(timeout=10)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def main(argv=None):
+    from src.config.settings import SERVER_PORT
+    parser = argparse.ArgumentParser(description="Measure headless startup time and idle memory.")
+    parser.add_argument("--cards", type=int, default=1000)
+    parser.add_argument("--idle", type=float, default=5, help="Seconds to idle before sampling memory")
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/headless-<timestamp>.json)")
+    args = parser.parse_args(argv)
+    results = run(args.cards, args.idle, SERVER_PORT)
+    print(save_results("headless", results, args.output))
+    if not results["ready"] or results["tk_loaded"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# benchmarks/synthetic.py
+# Synthetic Archidekt decks and dummy image caches for benchmarking
+import io
+import os
+import random
+
+from PIL import Image
+
+# Full-size Scryfall PNGs are 745x1040; decode cost scales with pixel count
+SCRYFALL_PNG_SIZE = (745, 1040)
+DECK_SIZE = 100
+
+_ADJECTIVES = ["Ancient", "Blazing", "Cunning", "Dread", "Eternal", "Feral", "Gilded", "Hollow",
+               "Iron", "Jade", "Kindred", "Lunar", "Mystic", "Night", "Obsidian", "Primal"]
+_NOUNS = ["Angel", "Behemoth", "Colossus", "Drake", "Elemental", "Familiar", "Golem", "Hydra",
+          "Invoker", "Juggernaut", "Knight", "Leviathan", "Mage", "Nomad", "Oracle", "Phoenix"]
+_SETS = ["mh3", "otj", "mkm", "lci", "woe", "ltr", "mom", "one", "bro", "dmu", "snc", "neo"]
+_CATEGORIES = ["Commander", "Ramp", "Removal", "Draw", "Creature", "Land", "Sideboard"]
+
+
+def synthetic_cards(count, seed=0):
+    """Return `count` unique card dicts with deterministic names, sets and categories."""
+    rng = random.Random(seed)
+    cards = []
+    for i in range(count):
+        name = f"{rng.choice(_ADJECTIVES)} {rng.choice(_NOUNS)} {i:05d}"
+        cards.append({
+            "card_name": name,
+            "set_code": rng.choice(_SETS),
+            "collector_number": str(rng.randint(1, 400)),
+            "is_foil": rng.random() < 0.1,
+            "category": rng.choice(_CATEGORIES),
+            "scryfall_id": f"{i:032x}",
+        })
+    return cards
+
+
+def deck_line(card):
+    """Format a card as an Archidekt export line."""
+    foil = " *F*" if card["is_foil"] else ""
+    return (f"1x {card['card_name']} ({card['set_code']}) {card['collector_number']}{foil} "
+            f"[{card['category']}{{top}}]")
+
+
+def cache_filename(card):
+    """Match the cache key scheme used by download_scryfall_images."""
+    safe_name = card["card_name"].replace(" ", "_").replace("/", "_")
+    return f"{safe_name}_{card['set_code']}_{card['collector_number']}.png"
+
+
+def dummy_png_bytes(size=SCRYFALL_PNG_SIZE):
+    """Encode a single solid-colour PNG that is reused for every cached card."""
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (90, 60, 120)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def write_collection(decks_dir, image_cache, cards, png_bytes=None):
+    """Write `cards` as decks of DECK_SIZE lines plus one dummy PNG per card in `image_cache`."""
+    os.makedirs(decks_dir, exist_ok=True)
+    png_bytes = png_bytes or dummy_png_bytes()
+    for deck_number, start in enumerate(range(0, len(cards), DECK_SIZE)):
+        lines = [deck_line(card) for card in cards[start:start + DECK_SIZE]]
+        with open(os.path.join(decks_dir, f"synthetic_{deck_number:04d}.txt"), "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+    filenames = []
+    with image_cache.batch():
+        for card in cards:
+            filename = cache_filename(card)
+            image_cache.store(filename, png_bytes, card["card_name"], card["set_code"], card["collector_number"],
+                              scryfall_id=card["scryfall_id"])
+            filenames.append(filename)
+    return filenames
@@ -0,0 +1,80 @@
+# benchmarks/thumbnail_scaling.py
+# Measures how thumbnail rendering scales with the number of worker processes.
+#
+#   python -m benchmarks.thumbnail_scaling [--images 500] [--workers 1 2 4 8]
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.common import environment_info, save_results, time_call
+from benchmarks.synthetic import SCRYFALL_PNG_SIZE
+from src.config.settings import CARD_HEIGHT, CARD_WIDTH
+from src.utils.thumbnails import render_thumbnails
+
+
+def write_noise_pngs(directory, count, size=SCRYFALL_PNG_SIZE):
+    """Write `count` distinct noisy PNGs, which cost about as much to decode as real card scans."""
+    from PIL import Image
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"noise_{i:05d}.png")
+        Image.frombytes("RGB", size, os.urandom(size[0] * size[1] * 3)).save(path, format="PNG", compress_level=1)
+        paths.append(path)
+    return paths
+
+
+def render_all(paths, pool):
+    errors = [error for *_, error in render_thumbnails(paths, CARD_WIDTH, CARD_HEIGHT, pool=pool) if error]
+    if errors:
+        raise errors[0]
+
+
+def default_worker_counts():
+    counts, n = [], 1
+    while n < (os.cpu_count() or 1):
+        counts.append(n)
+        n *= 2
+    return counts + [os.cpu_count() or 1]
+
+
+def run(image_count, worker_counts, workdir):
+    paths = write_noise_pngs(workdir, image_count)
+    _, baseline = time_call(render_all, paths, None)
+    results = {
+        "environment": environment_info(),
+        "images": image_count,
+        "thumbnail_size": [CARD_WIDTH, CARD_HEIGHT],
+        "in_thread": dict(baseline, images_per_second=image_count / baseline["seconds"]),
+        "process_pool": {},
+    }
+    for workers in worker_counts:
+        print(f"Rendering {image_count} thumbnails with {workers} workers...", file=sys.stderr)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            render_all(paths[:workers], pool)  # Warm up: spawn workers and import Pillow
+            _, stats = time_call(render_all, paths, pool)
+        stats["images_per_second"] = image_count / stats["seconds"]
+        stats["speedup"] = baseline["seconds"] / stats["seconds"]
+        stats["efficiency"] = stats["speedup"] / workers
+        results["process_pool"][str(workers)] = stats
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark process-pool thumbnail rendering.")
+    parser.add_argument("--images", type=int, default=500)
+    parser.add_argument("--workers", type=int, nargs="+", default=default_worker_counts())
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/thumbnails-<timestamp>.json)")
+    args = parser.parse_args(argv)
+    workdir = tempfile.mkdtemp(prefix="mtg-obs-thumbs-")
+    try:
+        results = run(args.images, args.workers, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    print(save_results("thumbnails", results, args.output))
+
+
+if __name__ == "__main__":
+    main()
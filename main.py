@@ -1,14 +1,21 @@
 # main.py
+import time
+
+STARTED_AT = time.perf_counter()
+
 import os
+import sys
+import json
 import atexit
+import argparse
 import logging
+import threading
+import multiprocessing
 from datetime import datetime
-from src.config.settings import LOGS_DIR
+from src.config.settings import LOGS_DIR, STARTUP_BUDGET_MS, MEMORY_TRACE_AT_STARTUP
 from src.core.webpage import WebPage
-from src.gui.window import Window
-from src.utils.image import create_clear_png
-from src.utils.paths import get_relative_path
-from src.web.server import start_server
+from src.utils.app_logging import setup_logging
+from src.utils.scryfall_client import scryfall_client
 
 def cleanup_logs():
     """Rename app.log to a timestamped file on shutdown."""
@@ -21,12 +28,97 @@ def cleanup_logs():
         except PermissionError as e:
             print(f"Warning: Could not rename log file due to {e}")
 
+def start_overlay_server(browser):
+    """Import Flask and start the overlay server off the main thread."""
+    from src.web.server import start_server
+    start_server(browser)
+    logging.info(f"Overlay server ready {(time.perf_counter() - STARTED_AT) * 1000:.0f}ms after launch")
+
+def report_time_to_first_window():
+    """Log how long it took for the window to become responsive."""
+    elapsed_ms = (time.perf_counter() - STARTED_AT) * 1000
+    if elapsed_ms > STARTUP_BUDGET_MS:
+        logging.warning(f"Time to first window: {elapsed_ms:.0f}ms (budget {STARTUP_BUDGET_MS}ms)")
+    else:
+        logging.info(f"Time to first window: {elapsed_ms:.0f}ms")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="MTG-OBS card overlay for OBS.")
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("gui", help="Run the desktop app (default)")
+    headless = commands.add_parser("headless", help="Run the overlay server and deck cache without the GUI")
+    headless.add_argument("--slots-file", help="JSON file of slot operations (as for POST /api/batch), "
+                                               "re-applied whenever it changes")
+    export = commands.add_parser("export", help="Write the decks, favorites and their card images to a bundle")
+    export.add_argument("path", help="Bundle to write (.tar, or .tar.gz to compress)")
+    export.add_argument("--all-images", action="store_true",
+                        help="Include every cached image, not only those used by decks and favorites")
+    bundle_import = commands.add_parser("import", help="Add the decks and card images from a bundle")
+    bundle_import.add_argument("path", help="Bundle written by export")
+    warm = commands.add_parser("warm", help="Download and check every image the decks need, then exit; "
+                                            "prints a JSON report and exits non-zero if anything failed")
+    warm.add_argument("paths", nargs="*", help="Deck files or directories (default: the decks folder)")
+    warm.add_argument("--no-printings", action="store_true",
+                      help="Skip caching each card's printings and previews for the Replace Card dialog")
+    warm.add_argument("--no-verify", action="store_true", help="Skip the integrity check of cached images")
+    warm.add_argument("--report", help="Also write the JSON report to this file")
+    return parser.parse_args(argv)
+
+def run_bundle_command(args):
+    """Export or import a bundle. Returns the process exit code."""
+    from src.core.bundle import export_bundle, import_bundle
+    try:
+        if args.command == "export":
+            export_bundle(args.path, all_images=args.all_images)
+        else:
+            import_bundle(args.path)
+        return 0
+    except Exception as e:
+        logging.error(f"Bundle {args.command} failed: {str(e)}", exc_info=True)
+        return 1
+
+def run_warm_command(args):
+    """Warm the caches for event prep and print the JSON report. Returns the process exit code."""
+    from src.core.warmup import warm_cache
+    try:
+        report = warm_cache(args.paths, printings=not args.no_printings, verify=not args.no_verify)
+    except Exception as e:
+        logging.error(f"Cache warm-up failed: {str(e)}", exc_info=True)
+        report = {"ok": False, "error": str(e)}
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.report:
+        with open(args.report, "w") as f:
+            f.write(output)
+    return 0 if report["ok"] else 1
+
+def run_gui(browser):
+    threading.Thread(target=start_overlay_server, args=(browser,), daemon=True).start()
+    from src.gui.window import Window
+    window = Window(browser=browser)
+    window.after_idle(report_time_to_first_window)
+    window.mainloop()
+
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Thumbnail worker processes in the PyInstaller build
+    args = parse_args()
+    setup_logging()
+    if MEMORY_TRACE_AT_STARTUP:
+        from src.utils.memory_report import start_tracing
+        start_tracing()
     atexit.register(cleanup_logs)
-    clear_url = create_clear_png()
+    atexit.register(scryfall_client.log_latency_summary)  # Runs before cleanup_logs closes the log
+    # Empty slots are served as the transparent clear.png
     browser = WebPage()
-    browser.set_slot(0, clear_url)
-    browser.set_slot(1, clear_url)
-    start_server(browser)
-    window = Window(browser=browser)
-    window.mainloop()
\ No newline at end of file
+    if args.command in ("export", "import"):
+        logging.getLogger().addHandler(logging.StreamHandler())
+        sys.exit(run_bundle_command(args))
+    elif args.command == "warm":
+        logging.getLogger().addHandler(logging.StreamHandler())  # stderr; the report goes to stdout
+        sys.exit(run_warm_command(args))
+    elif args.command == "headless":
+        logging.getLogger().addHandler(logging.StreamHandler())  # No Log tab, so also log to the console
+        from src.core.headless import run_headless
+        run_headless(browser, STARTED_AT, slots_file=args.slots_file)
+    else:
+        run_gui(browser)
@@ -3,7 +3,9 @@ import os
 import sys
 
 # Determine the root directory based on executable or script location
-if hasattr(sys, 'frozen'):  # Running as PyInstaller .exe
+if os.environ.get("MTG_OBS_ROOT"):  # Explicit override (benchmarks, alternate data dirs)
+    ROOT_DIR = os.path.abspath(os.environ["MTG_OBS_ROOT"])
+elif hasattr(sys, 'frozen'):  # Running as PyInstaller .exe
     ROOT_DIR = os.path.dirname(os.path.abspath(sys.executable))
 else:  # Running as script
     ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
@@ -28,6 +30,77 @@ CARD_HEIGHT = THUMBNAIL_HEIGHT * SCALE  # New card display size
 
 CLEAR_IMAGE_SIZE = (672, 936)
 
+# Image cache limits
+CACHE_SIZE_BUDGET_MB = 2048     # LRU eviction target; images used by decks/favorites are always kept
+CACHE_GC_GRACE_SECONDS = 300    # Never collect images stored more recently than this
+CACHE_VERIFY_WORKERS = min(8, (os.cpu_count() or 1) * 2)  # Threads hashing and checking images
+
+# Image quality tiers (Scryfall image_uris keys: small, normal, large, png)
+GALLERY_IMAGE_QUALITY = "normal"  # Downloaded for deck cards and gallery thumbnails; JPEG, a fraction of the PNG's size
+STREAM_IMAGE_QUALITY = "png"      # Fetched the first time a card is put in an overlay slot
+
+# Downloads
+DOWNLOAD_MAX_ATTEMPTS = 5     # Tries per request before a job is left for the next run
+DOWNLOAD_BACKOFF_BASE = 0.5   # Seconds before the first retry; doubles each attempt
+DOWNLOAD_BACKOFF_MAX = 30     # Cap on any single backoff, including Retry-After
+DOWNLOAD_WORKERS = 4          # Cards of a batch whose images download at once
+DOWNLOAD_JOB_MAX_RUNS = 3     # Runs a card's download may fail in before it is parked as failed
+
+# Scryfall
+SCRYFALL_API_URL = os.environ.get("MTG_OBS_SCRYFALL_URL", "https://api.scryfall.com").rstrip("/")  # Override for a mirror or test server
+SCRYFALL_REQUESTS_PER_SECOND = 10  # Shared budget for every call to the API host (images are not limited)
+SCRYFALL_USER_AGENT = "MTG-OBS/1.0"
+SCRYFALL_IMAGE_CONCURRENCY = 8     # Image downloads in flight at once, shared by every request class
+SCHEDULER_AGING_SECONDS = 3        # Queued bulk/speculative requests move up one class per this many seconds
+
+# Speculative printings prefetch (Replace Card dialog)
+PRINTINGS_MAX_AGE_DAYS = 7          # Cached printings lists older than this are fetched again
+PRINTINGS_BUDGET_MB = 200           # Disk budget for printings lists and their small previews
+PRINTINGS_PREFETCH_PER_MINUTE = 60  # Requests the idle prefetcher may make, API and images combined
+PRINTINGS_IDLE_SECONDS = 10         # Quiet time after user input before prefetching resumes
+PRINTINGS_WARM_WORKERS = 4          # Card names fetched at once by `main.py warm`
+
+# Scryfall search autocomplete
+AUTOCOMPLETE_DEBOUNCE_MS = 250  # Pause in typing before suggestions are looked up
+AUTOCOMPLETE_MIN_CHARS = 2      # Scryfall's autocomplete returns nothing for shorter queries
+AUTOCOMPLETE_LIMIT = 10         # Suggestions shown under the search entry
+AUTOCOMPLETE_CACHE_SIZE = 500   # Scryfall autocomplete answers kept per prefix, least recently used dropped first
+
+# Progressive gallery loading
+THUMBNAIL_BATCH_SIZE = 24  # Thumbnails turned into tiles per Tk tick
+THUMBNAIL_POLL_MS = 15     # Delay between Tk ticks while thumbnails are loading
+THUMBNAIL_WORKERS = max(1, (os.cpu_count() or 1) - 1)  # Decode/resize processes; 1 renders in-thread
+
+# Overlay server and remote control API
+SERVER_HOST = os.environ.get("MTG_OBS_HOST", "localhost")  # 0.0.0.0 accepts a second operator machine; needs a token
+SERVER_PORT = 8000
+CONTROL_API_TOKEN = os.environ.get("MTG_OBS_API_TOKEN")  # When set, /api requests must send it as X-API-Token
+CONTROL_API_BUDGET_MS = 5  # Control requests slower than this are logged
+SLOTS_LONG_POLL_SECONDS = 25  # How long /slots?since= holds a request open waiting for a change
+
+# Overlay prefetching
+PREFETCH_RECENT_LIMIT = 12        # Recently slotted/hovered cards offered as prefetch hints
+PREFETCH_MEMORY_BUDGET_MB = 256   # Decoded image budget for the overlay's prefetch cache
+PREFETCH_INTERVAL_MS = 5000       # How often the overlay refreshes its prefetch set
+
+# Startup
+STARTUP_BUDGET_MS = 1500  # Target time from launch to a responsive window
+
+# Stall watchdog
+WATCHDOG_INTERVAL_MS = 100  # Tk heartbeat used to detect event-loop stalls
+WATCHDOG_STALL_MS = 250     # Heartbeat lag reported as a UI stall
+
+# Memory report
+MEMORY_TRACE_AT_STARTUP = bool(os.environ.get("MTG_OBS_TRACEMALLOC"))  # Otherwise tracing starts with the first report
+MEMORY_TRACE_FRAMES = 10    # Stack depth kept per allocation to find the app module responsible
+MEMORY_REPORT_TOP = 15      # Subsystems listed per report
+MEMORY_BUDGETS_MB = {       # Estimated size per probe above which a report is flagged
+    "deck gallery": 512,
+    "favorites": 64,
+    "scryfall search": 128,
+    "log tab": 32,
+}
+
 # Window
 DEFAULT_WINDOW_WIDTH = 1000
 DEFAULT_WINDOW_HEIGHT = 800
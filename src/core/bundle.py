@@ -0,0 +1,185 @@
+# src/core/bundle.py
+# Portable bundles of decks and card images for moving an event setup between machines
+import io
+import os
+import re
+import json
+import time
+import uuid
+import hashlib
+import logging
+import tarfile
+from src.config.settings import DECKS_DIR
+from src.utils.image_cache import image_cache, COPY_CHUNK_SIZE
+from src.utils.cache_gc import referenced_keys
+from src.core.deck_loader import refresh_deck_cache
+
+BUNDLE_FORMAT = 1
+BUNDLE_JSON = "bundle.json"
+FAVORITES_TXT = "favorites.txt"
+
+
+def _valid_image_info(info):
+    """True if a bundle.json image entry names its file safely: a UUID Scryfall id (or none),
+    an integer face (or none) and a hex SHA-1. The file path is built from these."""
+    scryfall_id, face, sha1 = info.get("scryfall_id"), info.get("face"), info.get("sha1")
+    if scryfall_id is not None:
+        try:
+            if not isinstance(scryfall_id, str) or str(uuid.UUID(scryfall_id)) != scryfall_id:
+                return False
+        except ValueError:
+            return False
+    if face is not None and (not isinstance(face, int) or isinstance(face, bool) or face < 0):
+        return False
+    return isinstance(sha1, str) and re.fullmatch(r"[0-9a-f]{40}", sha1) is not None
+
+
+def file_sha1(abs_path):
+    with open(abs_path, "rb") as f:
+        digest = hashlib.sha1()
+        for chunk in iter(lambda: f.read(COPY_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cached_sha1(key, entry):
+    """Content hash of a cached image, from its verification stamp when the file is unchanged."""
+    abs_path = os.path.join(image_cache.cache_dir, entry["path"])
+    stamp = entry.get("verified")
+    if stamp:
+        stat = os.stat(abs_path)
+        if stamp["size"] == stat.st_size and stamp["mtime"] == stat.st_mtime_ns:
+            return stamp["sha1"]
+    return file_sha1(abs_path)
+
+
+def _add_bytes(tar, name, data):
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    info.mtime = int(time.time())
+    tar.addfile(info, io.BytesIO(data))
+
+
+def export_bundle(path, all_images=False):
+    """Write the decks, favorites and their cached images to a tar bundle at `path`.
+
+    The archive is written as a stream (gzip-compressed for .tar.gz/.tgz): bundle.json
+    first, with every image's manifest entry and content hash, then the deck files,
+    then each distinct image once under images/<sha1>.png. Only images used by decks
+    or favorites are included unless `all_images` is set.
+    Returns {"decks", "images", "files", "bytes"}.
+    """
+    deck_files = sorted(f for f in os.listdir(DECKS_DIR) if f.endswith(".txt")) if os.path.isdir(DECKS_DIR) else []
+    keys = set(key for key, _ in image_cache.items()) if all_images else referenced_keys()
+    images, files = {}, {}
+    for key in sorted(keys):
+        entry = image_cache.get(key)
+        if entry is None:
+            continue
+        try:
+            sha1 = cached_sha1(key, entry)
+        except OSError as e:
+            logging.warning(f"Skipping {key} in bundle: {str(e)}")
+            continue
+        images[key] = {field: entry.get(field) for field in ("name", "set", "collector_number", "face", "scryfall_id",
+                                                                 "quality", "full_url")}
+        images[key]["sha1"] = sha1
+        files.setdefault(sha1, os.path.join(image_cache.cache_dir, entry["path"]))
+
+    header = {"format": BUNDLE_FORMAT, "created_at": time.time(), "decks": deck_files, "images": images}
+    mode = "w|gz" if path.endswith((".tar.gz", ".tgz")) else "w|"
+    written = 0
+    with tarfile.open(path, mode) as tar:
+        _add_bytes(tar, BUNDLE_JSON, json.dumps(header).encode("utf-8"))
+        for deck_file in deck_files:
+            tar.add(os.path.join(DECKS_DIR, deck_file), arcname=f"decks/{deck_file}")
+        for sha1, abs_path in files.items():
+            tar.add(abs_path, arcname=f"images/{sha1}{os.path.splitext(abs_path)[1]}")
+            written += os.path.getsize(abs_path)
+    logging.info(f"Exported {len(deck_files)} deck files and {len(images)} images "
+                 f"({len(files)} files, {written / 1048576:.1f} MB) to {path}")
+    return {"decks": len(deck_files), "images": len(images), "files": len(files), "bytes": written}
+
+
+def _write_deck(name, data):
+    """Write one bundled deck file. favorites.txt is merged with the local one instead of replaced."""
+    deck_path = os.path.join(DECKS_DIR, name)
+    if name == FAVORITES_TXT and os.path.exists(deck_path):
+        with open(deck_path, "r") as f:
+            existing = [line.strip() for line in f if line.strip()]
+        missing = [line for line in data.decode("utf-8").splitlines() if line.strip() and line.strip() not in existing]
+        if missing:
+            with open(deck_path, "a") as f:
+                f.writelines(f"{line.strip()}\n" for line in missing)
+        return
+    with open(deck_path, "wb") as f:
+        f.write(data)
+
+
+def import_bundle(path):
+    """Unpack a bundle from `export_bundle` into the local decks and image cache.
+
+    The archive is read as a stream. Images the cache already holds with the same
+    content are skipped, everything else is hash-checked as it is copied. Deck
+    files are written only after all images are in, replacing local decks of the
+    same name (favorites are merged). deck_cache.json is refreshed so the next
+    launch loads straight from the cache, without downloading or reparsing.
+    Returns {"decks", "images", "skipped"}.
+    """
+    with tarfile.open(path, "r|*") as tar:
+        members = iter(tar)
+        first = next(members, None)
+        if first is None or first.name != BUNDLE_JSON:
+            raise ValueError(f"{path} is not an MTG-OBS bundle (no {BUNDLE_JSON} at the start)")
+        header = json.load(tar.extractfile(first))
+        if header.get("format") != BUNDLE_FORMAT:
+            raise ValueError(f"Unsupported bundle format {header.get('format')}")
+
+        keys_by_sha1 = {}
+        skipped = 0
+        for key, info in list(header["images"].items()):
+            if not _valid_image_info(info):
+                logging.warning(f"Skipping {key} in bundle: invalid Scryfall id, face or hash")
+                del header["images"][key]
+                continue
+            entry = image_cache.get(key)
+            try:
+                if entry is not None and cached_sha1(key, entry) == info["sha1"]:
+                    skipped += 1
+                    continue
+            except OSError:
+                pass  # Listed but missing locally: take the bundled copy
+            keys_by_sha1.setdefault(info["sha1"], []).append(key)
+
+        decks = {}
+        imported = 0
+        with image_cache.batch():
+            for member in members:
+                if member.name.startswith("decks/") and member.isfile():
+                    name = os.path.basename(member.name)
+                    if name.endswith(".txt"):
+                        decks[name] = tar.extractfile(member).read()
+                    continue
+                sha1 = os.path.splitext(os.path.basename(member.name))[0]
+                if not member.name.startswith("images/") or sha1 not in keys_by_sha1:
+                    continue
+                stored_path = None
+                for key in keys_by_sha1.pop(sha1):
+                    info = header["images"][key]
+                    source = tar.extractfile(member) if stored_path is None else open(stored_path, "rb")
+                    with source:
+                        stored_path = image_cache.store_stream(
+                            key, source, info["name"], info["set"], info["collector_number"],
+                            scryfall_id=info.get("scryfall_id"), face=info.get("face"), sha1=sha1,
+                            quality=info.get("quality"), full_url=info.get("full_url"))
+                    imported += 1
+        if keys_by_sha1:
+            logging.warning(f"Bundle is missing {sum(len(k) for k in keys_by_sha1.values())} images it lists")
+
+    os.makedirs(DECKS_DIR, exist_ok=True)
+    for name, data in decks.items():
+        _write_deck(name, data)
+    refresh_deck_cache()
+    logging.info(f"Imported {len(decks)} deck files and {imported} images from {path} "
+                 f"({skipped} images already cached)")
+    return {"decks": len(decks), "images": imported, "skipped": skipped}
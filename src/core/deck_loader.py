@@ -0,0 +1,139 @@
+# src/core/deck_loader.py
+# Deck parsing, image downloads and card indexing shared by the GUI and headless mode
+import os
+import json
+import logging
+from src.config.settings import CACHE_DIR, DECKS_DIR
+from src.utils.deck_parser import DeckParser
+from src.utils.image import download_scryfall_images
+from src.utils.image_cache import image_cache
+from src.utils.download_queue import download_queue
+from src.utils.cards_storage import init_storage, add_cards, clear_storage
+from src.utils.card_index import card_index
+
+DECK_CACHE_JSON = os.path.join(CACHE_DIR, "deck_cache.json")
+
+
+def decks_mtime(deck_files):
+    """Newest modification time of the given deck files, 0 when there are none."""
+    return max((os.path.getmtime(os.path.join(DECKS_DIR, f)) for f in deck_files), default=0)
+
+
+def read_deck_cache(mtime):
+    """Cache keys from deck_cache.json if it is at least as new as `mtime`, else None.
+
+    Returns None while downloads from a previous session are still pending, so
+    they are resumed by a fresh parse.
+    """
+    if download_queue.pending():
+        logging.info(f"Resuming {len(download_queue.pending())} unfinished downloads")
+        return None
+    if not os.path.exists(DECK_CACHE_JSON):
+        return None
+    try:
+        with open(DECK_CACHE_JSON, "r") as f:
+            cache_data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logging.warning(f"Failed to read deck_cache.json, reparsing decks: {str(e)}")
+        return None
+    if cache_data.get("mtime", 0) < mtime:
+        return None
+    cached_files = []
+    for filename in cache_data["files"]:
+        if image_cache.contains(filename):
+            cached_files.append(filename)
+        else:
+            logging.warning(f"Cached image not found: {filename}")
+    return cached_files
+
+
+def write_deck_cache(mtime, filenames):
+    with open(DECK_CACHE_JSON, "w") as f:
+        json.dump({"mtime": mtime, "files": filenames}, f)
+
+
+def parse_decks(deck_parser, deck_lines=None):
+    """Return (cards to fetch, unparsed-line failures) for every line in the current deck files,
+    or in `deck_lines` ((deck file, line) pairs) when given."""
+    unique_cards = set()
+    cards = []
+    failures = []
+    for deck_file, line in deck_parser.get_deck_lines() if deck_lines is None else deck_lines:
+        match = deck_parser.pattern.match(line)
+        if match:
+            quantity, card_name, set_code, collector_number, card_type = match.groups()
+            is_foil = "*F*" in line or "*E*" in line
+            card_id = f"{card_name}_{set_code}_{collector_number}"
+            if card_id not in unique_cards:
+                unique_cards.add(card_id)
+                cards.append({
+                    "card_name": card_name,
+                    "set_code": set_code,
+                    "collector_number": collector_number,
+                    "is_foil": is_foil
+                })
+        else:
+            logging.warning(f"Failed to parse line in {deck_file}: {line}")
+            failures.append(f"Unparsed: {line}")
+    return cards, failures
+
+
+def refresh_deck_cache():
+    """Point deck_cache.json at the cached images if every deck card now has one,
+    so the next launch loads straight from the cache. Returns True if it was written."""
+    deck_parser = DeckParser()
+    cards, _ = parse_decks(deck_parser)
+    missing = [card for card in cards if not image_cache.find(card["set_code"], card["collector_number"])]
+    if missing:
+        logging.info(f"{len(missing)} deck cards have no cached image yet; they will download on next load")
+        return False
+    write_deck_cache(decks_mtime(deck_parser.deck_files), cached_files_for(cards))
+    return True
+
+
+def cached_files_for(cards):
+    """Cache keys of every downloaded face of `cards`, in deck order."""
+    filenames = []
+    for card in cards:
+        filenames.extend(image_cache.find(card["set_code"], card["collector_number"]))
+    return filenames
+
+
+def card_from_filename(filename):
+    """Look up (name, set_code, collector_number, filename) in the image manifest."""
+    entry = image_cache.get(filename)
+    return entry["name"], entry["set"], entry["collector_number"], filename
+
+
+def load_decks(deck_parser=None):
+    """Parse the decks, download missing images and index the cards, without any UI.
+
+    Uses deck_cache.json when the decks have not changed since it was written.
+    Returns {"cards": cache keys loaded, "failures": unparsed lines, "from_cache": bool}.
+    """
+    deck_parser = deck_parser or DeckParser()
+    os.makedirs(DECKS_DIR, exist_ok=True)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    init_storage()
+    clear_storage()
+    deck_parser.refresh_deck_files()
+    if not deck_parser.deck_files:
+        logging.info("No deck files found in the 'decks' directory")
+        return {"cards": [], "failures": [], "from_cache": False}
+
+    mtime = decks_mtime(deck_parser.deck_files)
+    filenames = read_deck_cache(mtime)
+    failures = []
+    from_cache = bool(filenames)
+    if not filenames:
+        cards, failures = parse_decks(deck_parser)
+        if cards:
+            download_scryfall_images(cards)
+        filenames = cached_files_for(cards)
+        if filenames:
+            write_deck_cache(mtime, filenames)
+    add_cards(card_from_filename(filename) for filename in filenames)
+    card_index.rebuild(deck_parser)
+    logging.info(f"Loaded {len(filenames)} cards{' from cache' if from_cache else ''}"
+                 f"{f' with {len(failures)} unparsed lines' if failures else ''}")
+    return {"cards": filenames, "failures": failures, "from_cache": from_cache}
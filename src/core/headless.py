@@ -0,0 +1,72 @@
+# src/core/headless.py
+# Overlay server, deck loading and cache upkeep without Tk, for dedicated stream machines
+import os
+import json
+import time
+import logging
+import threading
+from src.core.deck_loader import load_decks
+from src.utils.cache_gc import start_background_maintenance, slot_paths
+from src.utils.cache_verify import start_background_verification
+
+SLOTS_FILE_POLL_SECONDS = 0.5
+
+
+def load_decks_in_background(browser):
+    """Load decks and warm the image cache on a daemon thread, then run cache maintenance."""
+    def run():
+        try:
+            load_decks()
+            start_background_maintenance(slot_paths(browser))
+            start_background_verification()
+        except Exception as e:
+            logging.error(f"Headless deck load failed: {str(e)}", exc_info=True)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def apply_slots_file(browser, path):
+    """Apply the operations in a slots file, using the same JSON as POST /api/batch."""
+    from src.web.control_api import ControlError, apply_operations
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        apply_operations(browser, payload.get("ops") if isinstance(payload, dict) else payload)
+        logging.info(f"Applied slots file {path}")
+    except (OSError, json.JSONDecodeError, ControlError) as e:
+        logging.warning(f"Could not apply slots file {path}: {str(e)}")
+
+
+def watch_slots_file(browser, path, stop_event):
+    """Re-apply `path` whenever its modification time changes, until `stop_event` is set."""
+    last_mtime = None
+    while not stop_event.is_set():
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            mtime = None
+        if mtime is not None and mtime != last_mtime:
+            last_mtime = mtime
+            apply_slots_file(browser, path)
+        stop_event.wait(SLOTS_FILE_POLL_SECONDS)
+
+
+def run_headless(browser, started_at, slots_file=None):
+    """Serve the overlay and control API until interrupted; never imports tkinter."""
+    from src.web.server import start_server
+    start_server(browser)
+    logging.info(f"Headless overlay server ready {(time.perf_counter() - started_at) * 1000:.0f}ms after launch")
+    load_decks_in_background(browser)
+
+    stop_event = threading.Event()
+    try:
+        if slots_file:
+            logging.info(f"Watching slots file {slots_file}")
+            watch_slots_file(browser, slots_file, stop_event)
+        else:
+            while not stop_event.wait(3600):
+                pass
+    except KeyboardInterrupt:
+        logging.info("Headless server stopped")
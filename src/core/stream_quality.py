@@ -0,0 +1,45 @@
+# src/core/stream_quality.py
+# Upgrade slotted cards from the gallery image quality to the stream quality in the background
+import logging
+import threading
+from src.config.settings import CACHE_DIR
+from src.utils.image_cache import image_cache
+from src.utils.paths import get_relative_path
+from src.utils.download_queue import needs_stream_quality, fetch_stream_quality
+from src.utils.scryfall_client import request_priority, INTERACTIVE
+
+_upgrading = set()
+_lock = threading.Lock()
+
+
+def upgrade_slotted(browser, key):
+    """Fetch the stream-quality image of a card that was just slotted, if only a gallery-tier one is cached.
+
+    The slot keeps showing the gallery image until the download finishes, then
+    every slot showing it switches to the new file. Returns True if an upgrade
+    is running for `key`.
+    """
+    if not needs_stream_quality(image_cache.get(key)):
+        return False
+    with _lock:
+        if key in _upgrading:
+            return True
+        _upgrading.add(key)
+    threading.Thread(target=_upgrade, args=(browser, key), daemon=True).start()
+    return True
+
+
+def _upgrade(browser, key):
+    try:
+        old_file = image_cache.get(key)["path"]
+        with request_priority(INTERACTIVE):
+            new_path = fetch_stream_quality(key, keep_replaced=True)
+        if new_path:
+            # Repoint the slots before the gallery file goes, so the overlay never sees a missing image
+            browser.replace_path(get_relative_path(CACHE_DIR, old_file), get_relative_path(CACHE_DIR, new_path))
+            image_cache.discard_file(old_file)
+    except Exception as e:
+        logging.error(f"Stream-quality upgrade of {key} failed: {str(e)}", exc_info=True)
+    finally:
+        with _lock:
+            _upgrading.discard(key)
@@ -0,0 +1,113 @@
+# src/core/warmup.py
+# Scriptable cache warm-up for event preparation: images, replace-dialog printings and deck_cache.json
+import os
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from src.config.settings import DECKS_DIR, PRINTINGS_WARM_WORKERS
+from src.utils.deck_parser import DeckParser
+from src.utils.image_cache import image_cache
+from src.utils.download_queue import download_queue
+from src.utils.cache_verify import verify_cache
+from src.utils.printings_cache import printings_cache
+from src.core.deck_loader import parse_decks, cached_files_for, refresh_deck_cache
+
+
+def deck_files_in(paths):
+    """Deck .txt files named by `paths`, expanding directories (favorites.txt is skipped, as in DeckParser)."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(os.path.join(path, f) for f in sorted(os.listdir(path))
+                         if f.endswith(".txt") and f != "favorites.txt" and os.path.isfile(os.path.join(path, f)))
+        elif os.path.isfile(path):
+            files.append(path)
+        else:
+            raise FileNotFoundError(f"No deck file or directory at {path}")
+    return files
+
+
+def deck_lines(files):
+    """(deck file, line) for every non-empty line of `files`, like DeckParser.get_deck_lines."""
+    for path in files:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield os.path.basename(path), line.strip()
+
+
+def _describe(card):
+    return f"{card['card_name']} ({card['set_code']} #{card['collector_number']})"
+
+
+def warm_cache(paths=None, printings=True, verify=True):
+    """Download every missing image for the decks in `paths` (default: the decks folder), check
+    them, and cache each card's printings and previews for the Replace Card dialog.
+
+    Images download concurrently through the download queue, which also retries
+    cards it gave up on in earlier runs; printings download on
+    PRINTINGS_WARM_WORKERS threads. The shared client keeps both within
+    Scryfall's rate limit. When the decks folder is warmed, deck_cache.json is
+    written so the app starts straight from the cache.
+    Returns a JSON-serialisable report; "ok" is False if anything failed.
+    """
+    started = time.perf_counter()
+    files = deck_files_in(paths or [DECKS_DIR])
+    cards, unparsed = parse_decks(DeckParser(), deck_lines(files))
+    report = {"deck_files": files, "cards": len(cards), "unparsed_lines": unparsed}
+
+    missing = [card for card in cards if not image_cache.find(card["set_code"], card["collector_number"])]
+    download_queue.retry_failed()  # Event prep gives cards parked after earlier failures another go
+    logging.info(f"Warming cache for {len(cards)} cards from {len(files)} deck files; {len(missing)} need images")
+    download_queue.enqueue(missing)
+    download_queue.run()
+    if verify:
+        report["verification"] = verify_cache()
+        if report["verification"]["requeued"]:
+            download_queue.run()
+    pending = set((job["set_code"].lower(), job["collector_number"])
+                  for job in download_queue.pending() + download_queue.failed())
+    fetched, failed, not_found = [], [], []
+    for card in missing:
+        if image_cache.find(card["set_code"], card["collector_number"]):
+            fetched.append(_describe(card))
+        elif (card["set_code"].lower(), card["collector_number"]) in pending:
+            failed.append(_describe(card))
+        else:
+            not_found.append(_describe(card))  # Scryfall has no such printing, so the queue dropped it
+    report["images"] = {"fetched": fetched, "skipped": len(cards) - len(missing), "failed": failed,
+                        "not_found": not_found}
+
+    if printings:
+        report["printings"] = warm_printings(cached_files_for(cards))
+
+    decks_dir = os.path.abspath(DECKS_DIR)
+    if any(os.path.dirname(os.path.abspath(path)) == decks_dir for path in files):
+        report["deck_cache_written"] = refresh_deck_cache()
+    report["seconds"] = round(time.perf_counter() - started, 2)
+    report["ok"] = not (failed or not_found or unparsed or report.get("printings", {}).get("failed"))
+    return report
+
+
+def warm_printings(keys, workers=PRINTINGS_WARM_WORKERS):
+    """Fill the printings cache for the card names of the cached images `keys`."""
+    names = list(dict.fromkeys(image_cache.get(key)["name"] for key in keys if image_cache.get(key)))
+    result = {"lists_fetched": 0, "previews_fetched": 0, "skipped": 0, "failed": []}
+
+    def fill(name):
+        try:
+            return name, printings_cache.fill(name), None
+        except Exception as e:
+            return name, None, e
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for name, filled, error in pool.map(fill, names):
+            if error is not None:
+                logging.warning(f"Failed to cache printings of {name}: {str(error)}")
+                result["failed"].append(name)
+            elif filled == (False, 0):
+                result["skipped"] += 1
+            else:
+                result["lists_fetched"] += filled[0]
+                result["previews_fetched"] += filled[1]
+    return result
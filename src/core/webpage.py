@@ -1,16 +1,99 @@
 # src/core/webpage.py
 # Manages the data model for webpage slots
+import threading
+from collections import deque, namedtuple
+from src.config.settings import PREFETCH_RECENT_LIMIT
+
+# Immutable view of every slot at one version; readers never see a half-applied update
+SlotSnapshot = namedtuple("SlotSnapshot", ["version", "slots"])
+
 
 class WebPage:
     def __init__(self, slot_count=2):
-        # Initialize slots with empty strings
-        self.slots = [""] * slot_count
+        # Slots start empty (shown as clear); each update publishes a new snapshot
+        self._snapshot = SlotSnapshot(0, ("",) * slot_count)
+        # Guards writers and wakes threads blocked in wait_for_change
+        self._changed = threading.Condition(threading.RLock())
+        # Recently slotted or hovered image paths, newest first, used as overlay prefetch hints
+        self.recent = deque(maxlen=PREFETCH_RECENT_LIMIT)
+        self._recent_lock = threading.Lock()
+
+    @property
+    def slots(self):
+        # Slot paths of the current snapshot, as a tuple
+        return self._snapshot.slots
+
+    def snapshot(self):
+        # Current version and slots; a single attribute read, so no lock is needed
+        return self._snapshot
+
+    def wait_for_change(self, version, timeout=None):
+        # Block until the version differs from `version` or `timeout` passes, then return the snapshot
+        with self._changed:
+            self._changed.wait_for(lambda: self._snapshot.version != version, timeout)
+            return self._snapshot
+
+    def _publish(self, slots):
+        # Caller holds self._changed; only bump the version when something actually changed
+        slots = tuple(slots)
+        if slots != self._snapshot.slots:
+            self._snapshot = SlotSnapshot(self._snapshot.version + 1, slots)
+            self._changed.notify_all()
+        return self._snapshot
 
     def set_slot(self, slot, image_path):
         # Set the image path for a specific slot (0-based index)
-        if 0 <= slot < len(self.slots):
-            self.slots[slot] = image_path
+        return self.apply([("set", slot, image_path)])
 
     def get_slot(self, slot):
         # Get the image path for a specific slot, return empty string if invalid
-        return self.slots[slot] if 0 <= slot < len(self.slots) else ""
\ No newline at end of file
+        slots = self._snapshot.slots
+        return slots[slot] if 0 <= slot < len(slots) else ""
+
+    def get_slots(self):
+        # Consistent copy of every slot
+        return list(self._snapshot.slots)
+
+    def push_slot(self, image_path, clear_url=None):
+        # Show an image in slot 1, moving the current slot 1 image to slot 2 unless it is empty/clear
+        return self.apply([("push", image_path)], clear_url)
+
+    def apply(self, operations, clear_url=None):
+        # Apply ("set", slot, path), ("clear", slot) and ("push", path) operations as one new snapshot
+        with self._changed:
+            slots = list(self._snapshot.slots)
+            for operation in operations:
+                if operation[0] == "set":
+                    if 0 <= operation[1] < len(slots):
+                        slots[operation[1]] = operation[2]
+                elif operation[0] == "clear":
+                    if 0 <= operation[1] < len(slots):
+                        slots[operation[1]] = ""
+                elif operation[0] == "push":
+                    if slots[0] and slots[0] != clear_url and len(slots) > 1:
+                        slots[1] = slots[0]
+                    slots[0] = operation[1]
+                else:
+                    raise ValueError(f"Unknown slot operation: {operation[0]}")
+            return self._publish(slots)
+
+    def replace_path(self, old_path, new_path):
+        # Point every slot and recent entry showing `old_path` at `new_path`, e.g. after an image upgrade
+        with self._changed:
+            snapshot = self._publish(new_path if path == old_path else path for path in self._snapshot.slots)
+        with self._recent_lock:
+            self.recent = deque((new_path if path == old_path else path for path in self.recent),
+                                maxlen=self.recent.maxlen)
+        return snapshot
+
+    def note_recent(self, image_path):
+        # Move an image path to the front of the recent list
+        with self._recent_lock:
+            if image_path in self.recent:
+                self.recent.remove(image_path)
+            self.recent.appendleft(image_path)
+
+    def get_recent(self):
+        # Snapshot of recent image paths, newest first
+        with self._recent_lock:
+            return list(self.recent)
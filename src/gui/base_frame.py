@@ -2,10 +2,13 @@
 import tkinter as tk
 from tkinter import ttk
 from src.utils.paths import get_relative_path
-from src.utils.image import CustomImage, create_clear_png
+from src.utils.image import create_clear_png
+from src.utils.image_cache import image_cache
+from src.utils.thumbnails import ThumbnailLoader
+from src.gui.watchdog import operation
 from src.config.settings import CARD_WIDTH, CARD_HEIGHT, CACHE_DIR, PRIMARY_BG_COLOR, TEXT_COLOR, DEFAULT_FONT, \
-    WIDGET_BG_COLOR, WIDGET_ACTIVE_COLOR, CONTROL_TEXT_COLOR, SECONDARY_BG_COLOR, SLOT_BUTTON_WIDTH, FAV_BUTTON_WIDTH
-from PIL import Image
+    WIDGET_BG_COLOR, WIDGET_ACTIVE_COLOR, CONTROL_TEXT_COLOR, SECONDARY_BG_COLOR, SLOT_BUTTON_WIDTH, FAV_BUTTON_WIDTH, \
+    THUMBNAIL_BATCH_SIZE, THUMBNAIL_POLL_MS
 import logging
 
 class BaseCardFrame(tk.Frame):
@@ -19,6 +22,7 @@ class BaseCardFrame(tk.Frame):
         self.padding = padding
         self.images = []
         self.list_of_buttons = []
+        self.loader = None
 
     def create_grid_of_buttons(self, target_frame=None, show_fav_button=False):
         """Create grid of card buttons in the specified frame (defaults to self)."""
@@ -27,53 +31,162 @@ class BaseCardFrame(tk.Frame):
             widget.destroy()
         self.list_of_buttons = []
 
+        for image in self.images:
+            self.list_of_buttons.append(self.create_card_button(frame, image, show_fav_button))
+        logging.debug(f"Created {len(self.list_of_buttons)} buttons")
+
+    def create_card_button(self, frame, image, show_fav_button=False, before=None):
+        """Create a single card tile with slot/fav buttons and pack it into `frame`.
+
+        The tile goes before the widget `before` if given, else at the end. Buttons are
+        bound to `image` itself, not its position, so tiles can be inserted and removed
+        around it. Returns (label, label_name).
+        """
         # Style for rounded buttons
         style = ttk.Style()
         style.configure("Card.TButton", font=DEFAULT_FONT, padding=2, background=WIDGET_BG_COLOR, foreground=CONTROL_TEXT_COLOR)
         style.map("Card.TButton", background=[("active", WIDGET_ACTIVE_COLOR)])
 
-        for index, image in enumerate(self.images):
-            filename = image.name
-            label = tk.Label(frame, image=image.thumbnail, width=self.button_width, height=self.button_height, bg=PRIMARY_BG_COLOR)
-            display_name = " ".join(filename.replace("_", " ").split(" ")[0:-2])
-            label_name = tk.Label(label, text=display_name, fg=TEXT_COLOR, font=DEFAULT_FONT, bg=PRIMARY_BG_COLOR)
-            label_name.place(relx=0.5, rely=0.5, anchor="center")
-            if show_fav_button and hasattr(self, 'add_to_favorites'):
-                fav_button = ttk.Button(label, text="Fav", command=lambda x=index: self.add_to_favorites(x), width=FAV_BUTTON_WIDTH,
-                                        style="Card.TButton")
-                fav_button.place(relx=0.5, rely=0.0, anchor='n')
-            slot1_button = ttk.Button(label, text="SLOT 1", command=lambda x=index: self.set_slot(0, self.images[x].name),
-                                      style="Card.TButton", width=SLOT_BUTTON_WIDTH)  # Match Fav width
-            slot1_button.place(relx=0.0, rely=1.0, anchor='sw')
-            slot2_button = ttk.Button(label, text="SLOT 2", command=lambda x=index: self.set_slot(1, self.images[x].name),
-                                      style="Card.TButton", width=SLOT_BUTTON_WIDTH)  # Match Fav width
-            slot2_button.place(relx=1.0, rely=1.0, anchor='se')
-            if hasattr(self, 'replace_card'):
-                menu = tk.Menu(label, tearoff=0, bg=SECONDARY_BG_COLOR, fg=TEXT_COLOR)
-                menu.add_command(label="Replace Card", command=lambda i=index: self.replace_card(i))
-                label.bind("<Button-3>", lambda e, m=menu: m.tk_popup(e.x_root, e.y_root))
-            self.list_of_buttons.append((label, label_name))
+        label = tk.Label(frame, image=image.thumbnail, width=self.button_width, height=self.button_height, bg=PRIMARY_BG_COLOR)
+        display_name = image_cache.display_name(image.name)
+        label_name = tk.Label(label, text=display_name, fg=TEXT_COLOR, font=DEFAULT_FONT, bg=PRIMARY_BG_COLOR)
+        label_name.place(relx=0.5, rely=0.5, anchor="center")
+        if show_fav_button and hasattr(self, 'add_to_favorites'):
+            fav_button = ttk.Button(label, text="Fav", command=lambda img=image: self.add_to_favorites(img), width=FAV_BUTTON_WIDTH,
+                                    style="Card.TButton")
+            fav_button.place(relx=0.5, rely=0.0, anchor='n')
+        slot1_button = ttk.Button(label, text="SLOT 1", command=lambda img=image: self.set_slot(0, img.name),
+                                  style="Card.TButton", width=SLOT_BUTTON_WIDTH)  # Match Fav width
+        slot1_button.place(relx=0.0, rely=1.0, anchor='sw')
+        slot2_button = ttk.Button(label, text="SLOT 2", command=lambda img=image: self.set_slot(1, img.name),
+                                  style="Card.TButton", width=SLOT_BUTTON_WIDTH)  # Match Fav width
+        slot2_button.place(relx=1.0, rely=1.0, anchor='se')
+        label.bind("<Enter>", lambda e, name=image.name: self.hint_prefetch(name))
+        if hasattr(self, 'replace_card'):
+            menu = tk.Menu(label, tearoff=0, bg=SECONDARY_BG_COLOR, fg=TEXT_COLOR)
+            menu.add_command(label="Replace Card", command=lambda img=image: self.replace_card(img))
+            label.bind("<Button-3>", lambda e, m=menu: m.tk_popup(e.x_root, e.y_root))
+        if before is not None:
+            label.pack(side=tk.LEFT, padx=self.padding, pady=self.padding, before=before)
+        else:
             label.pack(side=tk.LEFT, padx=self.padding, pady=self.padding)
-        logging.debug(f"Created {len(self.list_of_buttons)} buttons")
+        return label, label_name
+
+    def tile_index(self, image):
+        """Position of `image` (by identity) in the gallery, or None if it has no tile."""
+        for index, shown in enumerate(self.images):
+            if shown is image:
+                return index
+        return None
+
+    def shown_image(self, filename):
+        """The gallery image showing cache key `filename`, or None."""
+        for image in self.images:
+            if image.name == filename:
+                return image
+        return None
+
+    def insert_tile(self, image, target_frame=None, index=None, show_fav_button=False):
+        """Add a tile for `image` at `index` (default: the end) without touching the other tiles."""
+        frame = target_frame if target_frame is not None else self
+        index = len(self.images) if index is None else index
+        before = self.list_of_buttons[index][0] if index < len(self.list_of_buttons) else None
+        tile = self.create_card_button(frame, image, show_fav_button, before=before)
+        self.images.insert(index, image)
+        self.list_of_buttons.insert(index, tile)
+
+    def remove_tile(self, image):
+        """Destroy the tile for `image`. Returns False if it is not shown."""
+        index = self.tile_index(image)
+        if index is None:
+            return False
+        self.list_of_buttons.pop(index)[0].destroy()
+        del self.images[index]
+        return True
+
+    def replace_tile(self, old_image, new_image, show_fav_button=False):
+        """Swap the tile for `old_image` with one for `new_image` in the same position."""
+        index = self.tile_index(old_image)
+        if index is None:
+            return False
+        label = self.list_of_buttons[index][0]
+        self.list_of_buttons[index] = self.create_card_button(label.master, new_image, show_fav_button, before=label)
+        label.destroy()
+        self.images[index] = new_image
+        return True
+
+    def load_thumbnails_progressively(self, filenames, target_frame=None, show_fav_button=False,
+                                      on_loaded=None, on_done=None):
+        """Decode thumbnails in the background and add tiles in small batches on the Tk thread.
+
+        `on_loaded(image)` runs for each card that gets a tile; `on_done()` runs once all
+        files have been processed. Starting a new load cancels one still in progress.
+        """
+        self.cancel_thumbnail_load()
+        frame = target_frame if target_frame is not None else self
+        self.loader = ThumbnailLoader(filenames, self.button_width, self.button_height).start()
+        self.after(THUMBNAIL_POLL_MS, self._drain_thumbnails, self.loader, frame, show_fav_button, on_loaded, on_done)
+
+    def cancel_thumbnail_load(self):
+        if self.loader is not None:
+            self.loader.cancel()
+            self.loader = None
+
+    @operation("thumbnail batch")
+    def _drain_thumbnails(self, loader, frame, show_fav_button, on_loaded, on_done):
+        if loader is not self.loader:
+            return  # Superseded by a newer load
+        for image, rendered, error in loader.drain(THUMBNAIL_BATCH_SIZE):
+            if error is not None:
+                logging.error(f"Failed to load thumbnail for {image.name}: {str(error)}")
+                continue
+            image.set_thumbnail(rendered)
+            self.images.append(image)
+            self.list_of_buttons.append(self.create_card_button(frame, image, show_fav_button))
+            if on_loaded:
+                on_loaded(image)
+        if loader.done:
+            self.loader = None
+            logging.debug(f"Progressive load finished with {len(self.images)} images")
+            if on_done:
+                on_done()
+        else:
+            self.after(THUMBNAIL_POLL_MS, self._drain_thumbnails, loader, frame, show_fav_button, on_loaded, on_done)
+
+    @staticmethod
+    def slot_path(filename):
+        """Path stored in a browser slot for a cached card, or None if it is not cached."""
+        entry = image_cache.get(filename)
+        return get_relative_path(CACHE_DIR, entry["path"]) if entry is not None else None
+
+    def hint_prefetch(self, filename):
+        """Tell the overlay a card is likely to be slotted soon (e.g. on hover)."""
+        path = self.slot_path(filename)
+        if path:
+            self.browser.note_recent(path)
 
     def set_slot(self, slot, filename):
-        path = get_relative_path(CACHE_DIR, filename)
+        path = self.slot_path(filename)
+        if path is None:
+            logging.warning(f"Cannot set slot {slot}: {filename} is not in the image cache")
+            return
+        image_cache.touch(filename)
+        self.browser.note_recent(path)
         try:
+            from PIL import Image
             with Image.open(path) as img:
                 width, height = img.size
                 logging.debug(f"Setting slot {slot} to {path} (size: {width}x{height}px)")
         except Exception as e:
             logging.warning(f"Could not check image size for {path}: {str(e)}")
 
-        clear_url = create_clear_png()
         if slot == 0:  # Slot 1: Push current slot 1 to slot 2
-            current_slot1 = self.browser.get_slot(0)
-            if current_slot1 and current_slot1 != clear_url:
-                logging.debug(f"Pushing slot 1 ({current_slot1}) to slot 2")
-                self.browser.set_slot(1, current_slot1)
-            self.browser.set_slot(0, path)
+            logging.debug(f"Pushing slot 1 ({self.browser.get_slot(0)}) to slot 2")
+            self.browser.push_slot(path, create_clear_png())
         elif slot == 1:  # Slot 2: Replace directly
             self.browser.set_slot(1, path)
         else:
             logging.warning(f"Invalid slot index: {slot}")
-            return
\ No newline at end of file
+            return
+        from src.core.stream_quality import upgrade_slotted
+        upgrade_slotted(self.browser, filename)
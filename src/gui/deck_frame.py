@@ -1,15 +1,23 @@
 # src/gui/deck_frame.py
 import os
-import json
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from src.gui.base_frame import BaseCardFrame
+from src.gui.watchdog import operation
 from src.utils.favorites import save_favorite
 from src.utils.deck_parser import DeckParser
-from src.utils.image import download_scryfall_images, CustomImage
-from src.utils.cards_storage import init_storage, add_card, search_cards, clear_storage
-from src.config.settings import CARD_WIDTH, CARD_HEIGHT, CACHE_DIR, DECKS_DIR, PRIMARY_BG_COLOR
-from PIL import Image
+from src.utils.image import CustomImage, download_scryfall_images
+from src.utils.image_cache import image_cache
+from src.utils.download_queue import download_queue
+from src.utils.cache_gc import start_background_maintenance, slot_paths
+from src.utils.cache_verify import start_background_verification
+from src.utils.printings_cache import printings_cache, printings_prefetcher
+from src.utils.cards_storage import init_storage, add_cards, clear_storage, replace_card as replace_stored_card
+from src.utils.card_index import card_index
+from src.utils.latest_task import LatestTaskRunner
+from src.core.deck_loader import (decks_mtime, read_deck_cache, write_deck_cache, parse_decks, cached_files_for,
+                                  card_from_filename)
+from src.config.settings import CARD_WIDTH, CARD_HEIGHT, CACHE_DIR, DECKS_DIR, PRIMARY_BG_COLOR, THUMBNAIL_POLL_MS
 import logging
 import shutil
 import threading
@@ -25,43 +33,80 @@ class Frame(BaseCardFrame):
         self.image_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
         self.failures = []
         self.filter_timer = None
+        self.searches = LatestTaskRunner("deck search")
         init_storage()
-        self.load_all_decks()
 
     def filter_cards(self, event=None):
-        """Schedule filtering with a debounce delay."""
+        """Schedule filtering with a debounce delay, cancelling any search still running."""
+        self.searches.cancel()
         if self.filter_timer:
             self.after_cancel(self.filter_timer)
         self.filter_timer = self.after(300, self._do_filter)
 
     def _do_filter(self):
-        """Rebuild UI with search results from JSON."""
+        """Run the search on a worker thread; only the newest query's results reach the grid."""
+        self.filter_timer = None
         search_text = self.window.controls_frame.search_field.get()
         logging.info(f"Initiating search with query: '{search_text}'")
-        results = search_cards(search_text)
-        self.images = []
+        generation = self.searches.submit(card_index.search, search_text)
+        self.after(THUMBNAIL_POLL_MS, self._poll_search, generation, search_text)
+
+    def _poll_search(self, generation, search_text):
+        if not self.searches.is_current(generation):
+            return  # A newer keystroke or reload superseded this search
+        done, results, error = self.searches.result(generation)
+        if not done:
+            self.after(THUMBNAIL_POLL_MS, self._poll_search, generation, search_text)
+            return
+        if error is not None:
+            logging.error(f"Search failed for '{search_text}': {str(error)}", exc_info=error)
+            return
+        self._show_search_results(results, search_text)
+
+    @operation("deck search results")
+    def _show_search_results(self, results, search_text):
+        """Replace the grid with the search results, decoding thumbnails in the background."""
+        filenames = []
         for card in results:
-            image_path = os.path.join(CACHE_DIR, card["filename"])
-            if os.path.exists(image_path):
-                image = CustomImage(CACHE_DIR, card["filename"])
-                try:
-                    image.load_thumbnail(self.button_width, self.button_height)
-                    self.images.append(image)
-                except Exception as e:
-                    logging.error(f"Failed to load thumbnail for {card['filename']}: {str(e)}", exc_info=True)
+            if image_cache.contains(card["filename"]):
+                filenames.append(card["filename"])
             else:
                 logging.warning(f"Image not found for card: {card['filename']}")
-        logging.debug(f"Preparing to rebuild UI with {len(self.images)} images")
-        self.create_grid_of_buttons(target_frame=self.image_frame, show_fav_button=True)
-        logging.info(f"UI rebuilt with {len(self.images)} images and {len(self.list_of_buttons)} buttons")
-        # Debug: Log state to check for desync
-        if len(self.images) != len(self.list_of_buttons):
-            logging.warning(f"UI desync detected: images={len(self.images)}, buttons={len(self.list_of_buttons)}")
-
-    def add_to_favorites(self, index):
-        card = self.images[index]
-        self.favorites_frame.add_card(card)
-        save_favorite(card.name)
+        self.cancel_thumbnail_load()
+        self.images = []
+        for widget in self.image_frame.winfo_children():
+            widget.destroy()
+        self.list_of_buttons = []
+        self.load_thumbnails_progressively(
+            filenames, target_frame=self.image_frame, show_fav_button=True,
+            on_done=lambda: logging.info(f"Showing {len(self.images)} cards for '{search_text}'"))
+
+    def add_to_favorites(self, image):
+        self.favorites_frame.add_card(image)
+        save_favorite(image.name)
+
+    @operation("card add")
+    def add_card(self, filename, deck_file):
+        """Show and index a card just added to `deck_file`, leaving the rest of the gallery alone."""
+        add_cards([card_from_filename(filename)])
+        card_index.add(filename, deck_file)
+        if self.shown_image(filename) is not None:
+            return
+        image = CustomImage(filename)
+        image.load_thumbnail(self.button_width, self.button_height)
+        self.insert_tile(image, target_frame=self.image_frame, show_fav_button=True)
+
+    @operation("card replace")
+    def show_replacement(self, old_image, filename):
+        """Swap a card's tile and cards.json entry for the printing cached as `filename`."""
+        name, set_code, collector_number, _ = card_from_filename(filename)
+        replace_stored_card(old_image.name, name, set_code, collector_number, filename)
+        if self.shown_image(filename) is not None:
+            self.remove_tile(old_image)  # The new printing already has a tile of its own
+            return
+        image = CustomImage(filename)
+        image.load_thumbnail(self.button_width, self.button_height)
+        self.replace_tile(old_image, image, show_fav_button=True)
 
     def clear_all(self):
         """Clear all deck files, cached images, JSON storage, and reset the app."""
@@ -73,11 +118,18 @@ class Frame(BaseCardFrame):
                 if file.endswith('.txt'):
                     os.remove(os.path.join(DECKS_DIR, file))
                     logging.debug(f"Deleted deck file: {file}")
+            printings_prefetcher.stop()
             if os.path.exists(CACHE_DIR):
                 shutil.rmtree(CACHE_DIR)
                 logging.debug("Cleared cache directory")
             os.makedirs(CACHE_DIR, exist_ok=True)
+            image_cache.reset()
+            printings_cache.reset()
+            download_queue.clear()
             clear_storage()
+            card_index.clear()
+            self.searches.cancel()
+            self.cancel_thumbnail_load()
             self.images = []
             self.list_of_buttons = []
             self.create_grid_of_buttons(target_frame=self.image_frame, show_fav_button=True)
@@ -110,53 +162,75 @@ class Frame(BaseCardFrame):
         """Download images in a separate thread."""
         download_scryfall_images(cards_to_fetch)
 
-    def _update_progress(self, progress_bar, expected_files):
-        """Poll the cache directory for file count and update progress."""
-        current_files = len([f for f in os.listdir(CACHE_DIR) if f.endswith('.png')])
-        logging.debug(f"Progress: {current_files}/{expected_files} files downloaded")
+    def _update_progress(self, progress_bar, cards):
+        """Poll the image cache for downloaded cards and update progress."""
+        current_files = sum(1 for card in cards if image_cache.find(card["set_code"], card["collector_number"]))
+        logging.debug(f"Progress: {current_files}/{len(cards)} cards downloaded")
         progress_bar["value"] = current_files
-        self.update_idletasks()
 
-        if current_files < expected_files or not self.download_thread.is_alive():
-            self.after(100, self._update_progress, progress_bar, expected_files)
+        if self.download_thread.is_alive():
+            self.after(100, self._update_progress, progress_bar, cards)
         else:
-            self._finalize_load(progress_bar)
+            self._finalize_load(progress_bar, cards)
 
-    def _finalize_load(self, progress_bar):
+    def _finalize_load(self, progress_bar, cards):
         """Complete the loading process after downloads."""
         progress_bar.destroy()
-        downloaded_files = [f for f in os.listdir(CACHE_DIR) if f.endswith('.png')]
+        downloaded_files = cached_files_for(cards)
         logging.info(f"Finalizing load with {len(downloaded_files)} downloaded files")
-        for filename in downloaded_files:
-            image_path = os.path.join(CACHE_DIR, filename)
-            image = CustomImage(CACHE_DIR, filename)
-            try:
-                image.load_thumbnail(self.button_width, self.button_height)
-                self.images.append(image)
-                self.cached_files.append(filename)
-                parts = filename.rsplit("_", 2)
-                card_name = " ".join(parts[0].split("_"))
-                set_code = parts[1]
-                collector_number = parts[2].replace(".png", "")
-                add_card(card_name, set_code, collector_number, filename)
-            except Exception as e:
-                logging.error(f"Failed to process image {filename}: {str(e)}", exc_info=True)
+        self._load_cards(downloaded_files, on_done=self._finish_downloaded_load)
+
+    def _finish_downloaded_load(self):
         if not self.images:
             logging.warning("No images loaded despite files in cache")
             logging.info("No valid cards found in deck files")
         else:
-            self.create_grid_of_buttons(target_frame=self.image_frame, show_fav_button=True)
-            with open(os.path.join(CACHE_DIR, "deck_cache.json"), "w") as f:
-                json.dump({"mtime": self.deck_mtime, "files": self.cached_files}, f)
+            write_deck_cache(self.deck_mtime, self.cached_files)
             if self.failures:
                 logging.warning(
                     f"Loaded {len(self.images)} cards with failures: {', '.join(self.failures[:10])}{'...' if len(self.failures) > 10 else ''}")
             else:
                 logging.info(f"Loaded {len(self.images)} cards successfully")
+        self.start_cache_maintenance()
+
+    def start_cache_maintenance(self):
+        """Collect images orphaned by deck changes, enforce the cache size budget and verify new images in the background,
+        then prefetch every deck card's printings for the Replace Card dialog while the app is idle."""
+        start_background_maintenance(slot_paths(self.browser))
+        start_background_verification()
+        printings_prefetcher.start(card_index.names())
+
+    def _load_cards(self, filenames, progress_bar=None, on_done=None):
+        """Fill the gallery in the background and index every card that loads."""
+        self.cached_files = []
+        loaded_cards = []
+
+        def on_loaded(image):
+            self.cached_files.append(image.name)
+            loaded_cards.append(card_from_filename(image.name))
+            if progress_bar is not None:
+                progress_bar["value"] = len(self.cached_files)
+
+        def finish():
+            add_cards(loaded_cards)
+            card_index.rebuild(self.deck_parser)
+            if progress_bar is not None:
+                progress_bar.destroy()
+            if on_done:
+                on_done()
 
+        self.load_thumbnails_progressively(filenames, target_frame=self.image_frame,
+                                           show_fav_button=True, on_loaded=on_loaded, on_done=finish)
+
+    @operation("deck load")
     def load_all_decks(self):
+        self.searches.cancel()
+        self.cancel_thumbnail_load()
         self.images = []
         self.failures = []
+        for widget in self.image_frame.winfo_children():
+            widget.destroy()
+        self.list_of_buttons = []
         os.makedirs(DECKS_DIR, exist_ok=True)
         os.makedirs(CACHE_DIR, exist_ok=True)
         clear_storage()
@@ -166,67 +240,37 @@ class Frame(BaseCardFrame):
             logging.info("No deck files found in the 'decks' directory")
             return
 
-        cache_file = os.path.join(CACHE_DIR, "deck_cache.json")
-        self.deck_mtime = max(os.path.getmtime(os.path.join(DECKS_DIR, f)) for f in deck_files) if deck_files else 0
+        self.deck_mtime = decks_mtime(deck_files)
         logging.info(f"Loading decks with mtime: {self.deck_mtime}")
 
+        # None when the decks changed or a previous session stopped mid-download
+        cached_files = read_deck_cache(self.deck_mtime)
+        if cached_files is not None:
+            logging.info(f"Loading {len(cached_files)} cards from cache")
+            progress_bar = ttk.Progressbar(self.image_frame, orient=tk.HORIZONTAL, length=200, mode='determinate')
+            progress_bar.place(relx=0.5, rely=0.5, anchor=tk.CENTER)
+            progress_bar["maximum"] = len(cached_files)
+            self._load_cards(cached_files, progress_bar, on_done=self._finish_cached_load)
+            return
+
+        self._parse_and_download()
+
+    def _finish_cached_load(self):
+        if self.images:
+            logging.info(f"Loaded {len(self.images)} cards from cache")
+            self.start_cache_maintenance()
+        else:
+            logging.info("Cache found but no images loaded. Reparsing decks")
+            self._parse_and_download()
+
+    def _parse_and_download(self):
+        """Parse all deck files and download any card images that are missing."""
         progress_bar = ttk.Progressbar(self.image_frame, orient=tk.HORIZONTAL, length=200, mode='determinate')
         progress_bar.place(relx=0.5, rely=0.5, anchor=tk.CENTER)
 
-        if os.path.exists(cache_file):
-            with open(cache_file, "r") as f:
-                cache_data = json.load(f)
-            if cache_data.get("mtime", 0) >= self.deck_mtime:
-                cached_files = cache_data["files"]
-                progress_bar["maximum"] = len(cached_files)
-                logging.info(f"Loading {len(cached_files)} cards from cache")
-                for i, filename in enumerate(cached_files):
-                    image_path = os.path.join(CACHE_DIR, filename)
-                    if os.path.exists(image_path):
-                        image = CustomImage(CACHE_DIR, filename)
-                        try:
-                            image.load_thumbnail(self.button_width, self.button_height)
-                            self.images.append(image)
-                            parts = filename.rsplit("_", 2)
-                            card_name = " ".join(parts[0].split("_"))
-                            set_code = parts[1]
-                            collector_number = parts[2].replace(".png", "")
-                            add_card(card_name, set_code, collector_number, filename)
-                        except Exception as e:
-                            logging.error(f"Failed to load cached image {filename}: {str(e)}", exc_info=True)
-                    else:
-                        logging.warning(f"Cached image not found: {filename}")
-                    progress_bar["value"] = i + 1
-                    self.update_idletasks()
-                if self.images:
-                    progress_bar.destroy()
-                    self.create_grid_of_buttons(target_frame=self.image_frame, show_fav_button=True)
-                    logging.info(f"Loaded {len(self.images)} cards from cache")
-                    return
-                else:
-                    progress_bar.destroy()
-                    logging.info("Cache found but no images loaded. Reparsing decks")
-
-        unique_cards = set()
         self.cached_files = []
-        cards_to_fetch = []
-        for deck_file, line in self.deck_parser.get_deck_lines():
-            match = self.deck_parser.pattern.match(line)
-            if match:
-                quantity, card_name, set_code, collector_number, card_type = match.groups()
-                is_foil = "*F*" in line or "*E*" in line
-                card_id = f"{card_name}_{set_code}_{collector_number}"
-                if card_id not in unique_cards:
-                    unique_cards.add(card_id)
-                    cards_to_fetch.append({
-                        "card_name": card_name,
-                        "set_code": set_code,
-                        "collector_number": collector_number,
-                        "is_foil": is_foil
-                    })
-            else:
-                logging.warning(f"Failed to parse line in {deck_file}: {line}")
-                self.failures.append(f"Unparsed: {line}")
+        cards_to_fetch, failures = parse_decks(self.deck_parser)
+        self.failures.extend(failures)
 
         expected_files = len(cards_to_fetch)
         if expected_files == 0:
@@ -240,14 +284,13 @@ class Frame(BaseCardFrame):
 
         self.download_thread = threading.Thread(target=self._download_images_thread, args=(cards_to_fetch,))
         self.download_thread.start()
-        self.after(100, self._update_progress, progress_bar, expected_files)
+        self.after(100, self._update_progress, progress_bar, cards_to_fetch)
 
     def reload_images(self):
         self.load_all_decks()
 
-    def replace_card(self, index):
-        filename = self.images[index].name
-        parts = filename.rsplit("_", 2)
-        card_name = " ".join(parts[0].split("_"))
-        set_code = parts[1]
-        self.window.show_scryfall_search(card_name, set_code, index)
\ No newline at end of file
+    def replace_card(self, image):
+        entry = image_cache.get(image.name)
+        card_name = entry["name"]
+        set_code = entry["set"]
+        self.window.show_scryfall_search(card_name, set_code, image)
\ No newline at end of file
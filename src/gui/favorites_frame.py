@@ -2,7 +2,7 @@
 import tkinter as tk
 from tkinter import messagebox
 from src.gui.base_frame import BaseCardFrame
-from src.utils.favorites import load_favorites, save_favorite
+from src.utils.favorites import favorite_filenames, save_favorite
 from src.config.settings import CARD_WIDTH, CARD_HEIGHT, DECKS_DIR, PRIMARY_BG_COLOR, TEXT_COLOR, BOLD_FONT
 import logging
 import os
@@ -12,7 +12,6 @@ class FavoritesFrame(BaseCardFrame):
         super().__init__(parent, browser, button_width, button_height, padding)
         self.config(bg=PRIMARY_BG_COLOR, borderwidth=2, relief="groove")
         self.create_widgets()
-        self.load_favorites()
 
     def create_widgets(self):
         """Create widgets for the Favorites frame with modern styling."""
@@ -21,15 +20,15 @@ class FavoritesFrame(BaseCardFrame):
         self.label.pack(side=tk.LEFT, padx=self.padding, pady=self.padding)
 
     def load_favorites(self):
-        """Load favorites from file on startup."""
-        self.images = load_favorites(self.button_width, self.button_height)
+        """Load favorites from file, filling in tiles as thumbnails decode."""
+        self.images = []
         self.create_grid_of_buttons(show_fav_button=False)
+        self.load_thumbnails_progressively(favorite_filenames(), show_fav_button=False)
 
     def add_card(self, card):
         """Add a card to the favorites frame."""
-        if card.name not in [img.name for img in self.images]:
-            self.images.append(card)
-            self.create_grid_of_buttons(show_fav_button=False)
+        if self.shown_image(card.name) is None:
+            self.insert_tile(card, show_fav_button=False)
 
     def clear_favorites(self):
         """Clear all favorites from memory and file."""
@@ -37,6 +36,7 @@ class FavoritesFrame(BaseCardFrame):
             logging.info("Clear favorites operation canceled by user")
             return
         try:
+            self.cancel_thumbnail_load()
             self.images = []
             self.list_of_buttons = []
             self.create_grid_of_buttons()
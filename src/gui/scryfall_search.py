@@ -1,14 +1,19 @@
 # src/gui/scryfall_search.py
 import tkinter as tk
 from tkinter import ttk
-import requests
 import os
-from PIL import Image, ImageTk
-import io
-import time
 import json
 from src.utils.image import CustomImage
-from src.config.settings import CACHE_DIR, THUMBNAIL_WIDTH, THUMBNAIL_HEIGHT, DECKS_DIR
+from src.utils.image_cache import image_cache, card_cache_key
+from src.utils.card_index import card_index
+from src.utils.scryfall_stream import ScryfallSearchStream
+from src.utils.scryfall_client import scryfall_client, request_priority, INTERACTIVE
+from src.utils.download_queue import image_urls
+from src.utils.autocomplete import card_name_completer
+from src.utils.latest_task import LatestTaskRunner
+from src.gui.watchdog import operation
+from src.config.settings import CACHE_DIR, THUMBNAIL_WIDTH, THUMBNAIL_HEIGHT, DECKS_DIR, THUMBNAIL_BATCH_SIZE, \
+    THUMBNAIL_POLL_MS, AUTOCOMPLETE_DEBOUNCE_MS, AUTOCOMPLETE_MIN_CHARS, AUTOCOMPLETE_LIMIT
 import logging
 
 
@@ -23,8 +28,15 @@ class ScryfallSearchFrame(tk.Frame):
         self.button_height = button_height
         self.padding = padding
         self.results = []
-        self.photos = []
+        self.thumbnails = {}  # Scryfall id -> PhotoImage, or None if it failed to load
+        self.thumb_labels = {}  # Scryfall id -> label showing that thumbnail
         self.current_set = None
+        self.stream = None
+        self.card_name = None
+        self.set_code = None
+        self.target = None  # Deck gallery image being replaced, if any
+        self.suggestions = LatestTaskRunner("autocomplete")
+        self.suggest_timer = None
         self.create_widgets()
 
     def create_widgets(self):
@@ -35,9 +47,18 @@ class ScryfallSearchFrame(tk.Frame):
         self.search_entry = tk.Entry(self.search_frame, width=30)
         self.search_entry.pack(side=tk.LEFT, padx=self.padding)
         self.search_entry.bind("<Return>", self.handle_enter)
+        self.search_entry.bind("<KeyRelease>", self.schedule_suggestions)
+        self.search_entry.bind("<Down>", self.focus_suggestions)
+        self.search_entry.bind("<Escape>", lambda event: self.hide_suggestions())
         self.search_button = tk.Button(self.search_frame, text="Search", command=self.manual_search)
         self.search_button.pack(side=tk.LEFT, padx=self.padding)
 
+        # Floats under the entry while there are suggestions for what is being typed
+        self.suggestion_list = tk.Listbox(self, height=AUTOCOMPLETE_LIMIT, activestyle="dotbox")
+        self.suggestion_list.bind("<ButtonRelease-1>", self.choose_suggestion)
+        self.suggestion_list.bind("<Return>", self.choose_suggestion)
+        self.suggestion_list.bind("<Escape>", lambda event: self.hide_suggestions(refocus=True))
+
         self.status_label = tk.Label(self, text="Enter a card name above to search Scryfall.")
         self.status_label.pack(side=tk.TOP, pady=5)
 
@@ -63,6 +84,80 @@ class ScryfallSearchFrame(tk.Frame):
         else:
             logging.debug("Enter ignored—Scryfall tab not active")
 
+    def schedule_suggestions(self, event=None):
+        """Look up suggestions once typing pauses for AUTOCOMPLETE_DEBOUNCE_MS."""
+        if event is not None and event.keysym in ("Return", "KP_Enter", "Down", "Up", "Escape", "Tab"):
+            return
+        self.suggestions.cancel()
+        if self.suggest_timer:
+            self.after_cancel(self.suggest_timer)
+        self.suggest_timer = self.after(AUTOCOMPLETE_DEBOUNCE_MS, self._lookup_suggestions)
+
+    @operation("autocomplete")
+    def _lookup_suggestions(self):
+        self.suggest_timer = None
+        query = self.search_entry.get().strip()
+        if len(query) < AUTOCOMPLETE_MIN_CHARS:
+            self.hide_suggestions()
+            return
+        # Known card names show straight away; Scryfall's follow, unless the prefix cache already has them
+        remote = card_name_completer.cached(query)
+        self.show_suggestions(card_name_completer.suggest(query, remote))
+        if remote is None:
+            generation = self.suggestions.submit(card_name_completer.remote, query)
+            self.after(THUMBNAIL_POLL_MS, self._poll_suggestions, generation, query)
+
+    def _poll_suggestions(self, generation, query):
+        if not self.suggestions.is_current(generation):
+            return  # A newer keystroke or a search superseded this lookup
+        done, names, error = self.suggestions.result(generation)
+        if not done:
+            self.after(THUMBNAIL_POLL_MS, self._poll_suggestions, generation, query)
+            return
+        if error is not None:
+            logging.warning(f"Scryfall autocomplete failed for '{query}': {str(error)}")
+        elif names is not None:
+            self.show_suggestions(card_name_completer.suggest(query, names))
+
+    def show_suggestions(self, names):
+        if not names:
+            self.hide_suggestions()
+            return
+        self.suggestion_list.delete(0, tk.END)
+        for name in names:
+            self.suggestion_list.insert(tk.END, name)
+        self.suggestion_list.config(height=len(names))
+        self.suggestion_list.place(in_=self.search_entry, relx=0, rely=1, relwidth=1.5)
+        self.suggestion_list.lift()
+
+    def hide_suggestions(self, refocus=False):
+        self.suggestions.cancel()
+        if self.suggest_timer:
+            self.after_cancel(self.suggest_timer)
+            self.suggest_timer = None
+        self.suggestion_list.place_forget()
+        if refocus:
+            self.search_entry.focus_set()
+
+    def focus_suggestions(self, event=None):
+        if self.suggestion_list.winfo_ismapped():
+            self.suggestion_list.focus_set()
+            self.suggestion_list.selection_clear(0, tk.END)
+            self.suggestion_list.selection_set(0)
+            self.suggestion_list.activate(0)
+        return "break"
+
+    def choose_suggestion(self, event=None):
+        """Search for the highlighted suggestion."""
+        selection = self.suggestion_list.curselection()
+        if not selection:
+            return
+        name = self.suggestion_list.get(selection[0])
+        self.search_entry.delete(0, tk.END)
+        self.search_entry.insert(0, name)
+        self.search_entry.focus_set()
+        self.manual_search()
+
     def manual_search(self):
         """Perform a manual Scryfall search from the entry field."""
         card_name = self.search_entry.get().strip()
@@ -72,50 +167,93 @@ class ScryfallSearchFrame(tk.Frame):
             return
         self.search_scryfall(card_name, None, None)
 
-    def search_scryfall(self, card_name, set_code, index):
+    def search_scryfall(self, card_name, set_code, target):
+        """Start a background search; pages and thumbnails are shown as they arrive."""
         clean_name = card_name.replace("_", " ").strip()
+        self.hide_suggestions()
         self.status_label.config(text=f"Searching for '{clean_name}' across all sets...")
+        self.cancel_search()
+        self.card_name = clean_name
+        self.set_code = set_code
+        self.target = target
+        self.current_set = None
         self.results = []
-        self.photos = []
+        self.thumbnails = {}
+        self.thumb_labels = {}
         for widget in self.results_frame.winfo_children():
             widget.destroy()
         self.sets_listbox.delete(0, tk.END)
+        self.stream = ScryfallSearchStream(clean_name, self.button_width // 2, self.button_height // 2).start()
+        self.after(THUMBNAIL_POLL_MS, self._drain_search, self.stream)
 
-        url = f"https://api.scryfall.com/cards/search?q=\"{clean_name}\" unique:prints"
-        logging.debug(f"Searching Scryfall with URL: {url}")
-        try:
-            while url:
-                response = requests.get(url)
-                response.raise_for_status()
-                data = response.json()
-                if "data" in data:
-                    self.results.extend(data["data"])
-                    if "next_page" in data:
-                        url = data["next_page"]
-                        logging.debug(f"Fetching next page: {url}")
-                        time.sleep(0.1)
-                    else:
-                        url = None
-                else:
-                    logging.info(f"No results found for '{clean_name}' in Scryfall response")
-                    self.status_label.config(text=f"No results found for '{clean_name}'.")
-                    return
-            logging.debug(f"Total results fetched: {len(self.results)}")
-            if self.results:
-                self.display_results(clean_name, set_code, index)
-                self.populate_sets()
-            else:
-                logging.info(f"No printings found for '{clean_name}'")
-                self.status_label.config(text=f"No printings found for '{clean_name}'.")
-        except requests.RequestException as e:
-            logging.error(f"Scryfall search failed for '{clean_name}': {str(e)}", exc_info=True)
+    def cancel_search(self):
+        if self.stream is not None:
+            self.stream.cancel()
+            self.stream = None
+
+    @operation("scryfall search")
+    def _drain_search(self, stream):
+        if stream is not self.stream:
+            return  # Superseded by a newer search
+        for event in stream.drain(THUMBNAIL_BATCH_SIZE):
+            if event[0] == "page":
+                self._add_page(event[1], event[2])
+            elif event[0] == "thumbnail":
+                self._set_thumbnail(*event[1:])
+        if not stream.done:
+            self.after(THUMBNAIL_POLL_MS, self._drain_search, stream)
+            return
+        self.stream = None
+        if stream.error is not None:
+            logging.error(f"Scryfall search failed for '{self.card_name}': {str(stream.error)}", exc_info=stream.error)
             self.status_label.config(text="Search failed. Check logs.")
+        elif not self.results:
+            logging.info(f"No printings found for '{self.card_name}'")
+            self.status_label.config(text=f"No printings found for '{self.card_name}'.")
+        else:
+            logging.debug(f"Total results fetched: {len(self.results)}")
+            self._update_status()
+
+    def _add_page(self, cards, total_cards):
+        self.results.extend(cards)
+        self.populate_sets()
+        for card in cards:
+            if not self.current_set or card["set"] == self.current_set:
+                self._add_result_row(card)
+        if self.stream is not None and len(self.results) < total_cards:
+            self.status_label.config(text=f"Loaded {len(self.results)} of {total_cards} versions for '{self.card_name}'...")
+
+    def _set_thumbnail(self, card_id, image, error):
+        from PIL import ImageTk
+        if error is not None:
+            logging.warning(f"Failed to load thumbnail for {card_id}: {str(error)}")
+            self.thumbnails[card_id] = None
+        else:
+            self.thumbnails[card_id] = ImageTk.PhotoImage(image)
+        label = self.thumb_labels.get(card_id)
+        if label is not None and label.winfo_exists():
+            self._show_thumbnail(label, card_id)
+
+    def _show_thumbnail(self, label, card_id):
+        if card_id not in self.thumbnails:
+            label.config(text="[Loading...]")
+        elif self.thumbnails[card_id] is None:
+            label.config(text="[Image Failed]")
+        else:
+            label.config(image=self.thumbnails[card_id], text="")
+
+    def _update_status(self):
+        filtered = [card for card in self.results if not self.current_set or card["set"] == self.current_set]
+        self.status_label.config(text=f"Found {len(filtered)} versions for '{self.card_name}':")
 
     def populate_sets(self):
         sets = sorted(set(card["set"] for card in self.results))
+        self.sets_listbox.delete(0, tk.END)
         self.sets_listbox.insert(0, "All Sets")
         for set_code in sets:
             self.sets_listbox.insert(tk.END, set_code)
+        if self.current_set in sets:
+            self.sets_listbox.selection_set(sets.index(self.current_set) + 1)
         logging.debug(f"Populated sets: {sets}")
 
     def filter_by_set(self, event):
@@ -124,81 +262,74 @@ class ScryfallSearchFrame(tk.Frame):
             return
         set_code = self.sets_listbox.get(selection[0])
         self.current_set = None if set_code == "All Sets" else set_code
-        self.display_results(self.card_name, self.set_code, self.index)
+        self.display_results(self.card_name, self.set_code, self.target)
 
-    def display_results(self, card_name, set_code, index):
+    def display_results(self, card_name, set_code, target):
+        """Show the results fetched so far for the current set filter, reusing downloaded thumbnails."""
         self.card_name = card_name
         self.set_code = set_code
-        self.index = index
+        self.target = target
+        self.thumb_labels = {}
         for widget in self.results_frame.winfo_children():
             widget.destroy()
+        for card in self.results:
+            if not self.current_set or card["set"] == self.current_set:
+                self._add_result_row(card)
+        if self.stream is None:
+            self._update_status()
 
-        filtered_results = [card for card in self.results if not self.current_set or card["set"] == self.current_set]
-        self.status_label.config(text=f"Found {len(filtered_results)} versions for '{card_name}':")
+    def _add_result_row(self, card):
+        if "image_uris" in card and "small" in card["image_uris"]:
+            quality, image_url, full_url = image_urls(card)
+            frame = tk.Frame(self.results_frame)
+            frame.pack(side=tk.TOP, fill=tk.X, pady=2)
 
-        for i, card in enumerate(filtered_results):
-            if "image_uris" in card and "small" in card["image_uris"]:
-                small_image_url = card["image_uris"]["small"]
-                high_quality_url = card["image_uris"]["png"]
-                frame = tk.Frame(self.results_frame)
-                frame.pack(side=tk.TOP, fill=tk.X, pady=2)
+            img_label = tk.Label(frame)
+            img_label.pack(side=tk.LEFT, padx=self.padding)
+            self.thumb_labels[card["id"]] = img_label
+            self._show_thumbnail(img_label, card["id"])
 
-                try:
-                    response = requests.get(small_image_url)
-                    response.raise_for_status()
-                    img_data = response.content
-                    img = Image.open(io.BytesIO(img_data))
-                    img = img.resize((self.button_width // 2, self.button_height // 2), Image.Resampling.LANCZOS)
-                    photo = ImageTk.PhotoImage(img)
-                    self.photos.append(photo)
-                    img_label = tk.Label(frame, image=photo)
-                    img_label.pack(side=tk.LEFT, padx=self.padding)
-                except Exception as e:
-                    logging.warning(f"Failed to load thumbnail for {card['name']}: {str(e)}")
-                    img_label = tk.Label(frame, text="[Image Failed]")
-                    img_label.pack(side=tk.LEFT, padx=self.padding)
-
-                info = f"{card['name']} ({card['set'].upper()} #{card['collector_number']})"
-                if "foil" in card and card["foil"]:
-                    info += " [Foil]"
-                if "nonfoil" in card and not card["nonfoil"]:
-                    info += " [Foil Only]"
-                if card.get("frame_effects"):
-                    info += f" [{', '.join(card['frame_effects'])}]"
-                label = tk.Label(frame, text=info)
-                label.pack(side=tk.LEFT, padx=self.padding)
-
-                # Add to Deck button
-                add_button = tk.Button(frame, text="Add to Deck",
-                                       command=lambda url=high_quality_url,
-                                                      fname=f"{card['name'].replace(' ', '_')}_{card['set']}_{card['collector_number']}.png",
-                                                      set=card['set'], num=card['collector_number']:
-                                       self.add_to_deck(url, fname, card['name'], set, num))
-                add_button.pack(side=tk.RIGHT, padx=self.padding)
-
-                # Select button for replacement (only if index provided)
-                if self.index is not None:
-                    parts = self.frame.images[self.index].name.rsplit("_", 2)
-                    old_collector_number = parts[2].replace(".png", "")
-                    button = tk.Button(frame, text="Select",
-                                       command=lambda url=high_quality_url,
-                                                      fname=f"{card['name'].replace(' ', '_')}_{card['set']}_{card['collector_number']}.png",
-                                                      idx=self.index,
-                                                      old_set=self.set_code, old_num=old_collector_number,
-                                                      new_set=card['set'], new_num=card['collector_number']:
-                                       self.replace_card(url, fname, idx, old_set, old_num, new_set, new_num))
-                    button.pack(side=tk.RIGHT, padx=self.padding)
-            else:
-                logging.warning(f"No image available for {card['name']} ({card['set']} #{card['collector_number']})")
+            info = f"{card['name']} ({card['set'].upper()} #{card['collector_number']})"
+            if "foil" in card and card["foil"]:
+                info += " [Foil]"
+            if "nonfoil" in card and not card["nonfoil"]:
+                info += " [Foil Only]"
+            if card.get("frame_effects"):
+                info += f" [{', '.join(card['frame_effects'])}]"
+            label = tk.Label(frame, text=info)
+            label.pack(side=tk.LEFT, padx=self.padding)
 
-    def add_to_deck(self, image_url, filename, card_name, set_code, collector_number):
-        """Add a card from search results to scryfall_added.txt and cache."""
+            # Add to Deck button
+            add_button = tk.Button(frame, text="Add to Deck",
+                                   command=lambda url=image_url,
+                                                  fname=card_cache_key(card['name'], card['set'], card['collector_number']),
+                                                  name=card['name'], set=card['set'], num=card['collector_number'],
+                                                  card_id=card.get('id'), quality=quality, full_url=full_url:
+                                   self.add_to_deck(url, fname, name, set, num, card_id, quality, full_url))
+            add_button.pack(side=tk.RIGHT, padx=self.padding)
+
+            # Select button for replacement (only when replacing a deck card)
+            if self.target is not None:
+                # The target is read at click time: after one replacement it is the new printing's tile
+                button = tk.Button(frame, text="Select",
+                                   command=lambda url=image_url,
+                                                  fname=card_cache_key(card['name'], card['set'], card['collector_number']),
+                                                  new_set=card['set'], new_num=card['collector_number'],
+                                                  card_id=card.get('id'), quality=quality, full_url=full_url:
+                                   self.replace_card(url, fname, new_set, new_num, card_id, quality, full_url))
+                button.pack(side=tk.RIGHT, padx=self.padding)
+        else:
+            logging.warning(f"No image available for {card['name']} ({card['set']} #{card['collector_number']})")
+
+    def add_to_deck(self, image_url, filename, card_name, set_code, collector_number, scryfall_id=None, quality=None,
+                    full_url=None):
+        """Add a card from search results to scryfall_added.txt and cache (at the gallery image quality)."""
         try:
-            response = requests.get(image_url)
+            with request_priority(INTERACTIVE):
+                response = scryfall_client.get(image_url)
             response.raise_for_status()
-            image_path = os.path.join(CACHE_DIR, filename)
-            with open(image_path, "wb") as f:
-                f.write(response.content)
+            image_cache.store(filename, response.content, card_name, set_code, collector_number, scryfall_id=scryfall_id,
+                              quality=quality, full_url=full_url)
             logging.debug(f"Downloaded {filename} to cache")
 
             added_file = os.path.join(DECKS_DIR, "scryfall_added.txt")
@@ -222,48 +353,45 @@ class ScryfallSearchFrame(tk.Frame):
                 except (json.JSONDecodeError, OSError) as e:
                     logging.warning(f"Failed to update deck_cache.json: {str(e)}")
 
-            self.frame.reload_images()
+            self.frame.add_card(filename, "scryfall_added.txt")
             logging.info(f"Added {card_name} to decks")
             self.status_label.config(text=f"Added {card_name} to decks. Search again or add another.")
         except Exception as e:
             logging.error(f"Failed to add card to deck: {str(e)}", exc_info=True)
             self.status_label.config(text=f"Failed to add {card_name} to deck. Check logs.")
 
-    def replace_card(self, image_url, filename, index, old_set_code, old_collector_number, new_set_code,
-                     new_collector_number):
+    def replace_card(self, image_url, filename, new_set_code, new_collector_number, scryfall_id=None, quality=None,
+                     full_url=None):
+        """Replace the target deck card with the printing at `image_url`, updating only its tile."""
+        import requests
+        target = self.target
+        if target is None:
+            return
         try:
-            response = requests.get(image_url)
+            old_filename = target.name
+            old_entry = image_cache.get(old_filename)
+            old_set_code = old_entry["set"] if old_entry else self.set_code
+            old_collector_number = old_entry["collector_number"] if old_entry else None
+            with request_priority(INTERACTIVE):
+                response = scryfall_client.get(image_url)
             response.raise_for_status()
-            image_path = os.path.join(CACHE_DIR, filename)
-            with open(image_path, "wb") as f:
-                f.write(response.content)
-            new_image = CustomImage(CACHE_DIR, filename)
-            new_image.load_thumbnail(self.button_width, self.button_height)
-            self.frame.images[index] = new_image
-            self.frame.create_grid_of_buttons(target_frame=self.frame.image_frame, show_fav_button=True)
+            image_cache.store(filename, response.content, old_entry["name"] if old_entry else self.card_name,
+                              new_set_code, new_collector_number, scryfall_id=scryfall_id, quality=quality,
+                              full_url=full_url)
+            self.frame.show_replacement(target, filename)
+            self.target = self.frame.shown_image(filename) or CustomImage(filename)
 
             success = self.frame.deck_parser.update_card(
                 self.card_name, old_set_code, old_collector_number,
                 new_set_code, new_collector_number
             )
+            if success:
+                card_index.replace_key(old_filename, filename)
 
             cache_file = os.path.join(CACHE_DIR, "deck_cache.json")
             cache_updated = False
-            old_filename = f"{self.card_name.replace(' ', '_')}_{old_set_code}_{old_collector_number}.png"
-            old_image_path = os.path.join(CACHE_DIR, old_filename)
-
-            if os.path.exists(old_image_path):
-                is_used = False
-                for _, line in self.frame.deck_parser.get_deck_lines():
-                    if old_filename.replace(".png", "") in line:
-                        is_used = True
-                        break
-                if not is_used:
-                    try:
-                        os.remove(old_image_path)
-                        logging.debug(f"Removed unused image from cache: {old_filename}")
-                    except OSError as e:
-                        logging.warning(f"Failed to remove unused image {old_filename}: {str(e)}")
+            # The old printing's image is collected in the background once nothing references it
+            self.frame.start_cache_maintenance()
 
             if os.path.exists(cache_file):
                 try:
@@ -0,0 +1,138 @@
+# src/gui/watchdog.py
+# Detects Tk event-loop stalls and records where the Tk thread was stuck
+import os
+import sys
+import time
+import logging
+import threading
+import traceback
+from contextlib import contextmanager
+from src.config.settings import WATCHDOG_INTERVAL_MS, WATCHDOG_STALL_MS
+
+STACK_LIMIT = 12  # Innermost frames logged per stall
+
+_operations = []  # Labels of the Tk-thread operations in progress, innermost last
+
+
+@contextmanager
+def operation(label):
+    """Label Tk-thread work (e.g. "deck load") so stalls inside it are attributed to it."""
+    _operations.append(label)
+    try:
+        yield
+    finally:
+        _operations.pop()
+
+
+def current_operation():
+    return _operations[-1] if _operations else None
+
+
+class StallStats:
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, lag_ms):
+        self.count += 1
+        self.total_ms += lag_ms
+        self.max_ms = max(self.max_ms, lag_ms)
+
+
+class StallWatchdog:
+    """Measure how late a periodic `after()` heartbeat fires on the Tk thread.
+
+    A monitor thread notices when the heartbeat is overdue by more than the
+    threshold and captures the Tk thread's stack while it is still stuck, with
+    the innermost `operation` label. When the heartbeat runs again the full
+    stall duration is logged and added to the per-operation totals.
+    """
+
+    def __init__(self, root, interval_ms=WATCHDOG_INTERVAL_MS, threshold_ms=WATCHDOG_STALL_MS):
+        self.root = root
+        self.interval = interval_ms / 1000
+        self.threshold = threshold_ms / 1000
+        self.threshold_ms = threshold_ms
+        self.stats = StallStats()
+        self.by_operation = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread_id = None
+        self._last_beat = None
+        self._captured = None  # (operation, stack) of the stall in progress
+
+    def start(self):
+        """Start the heartbeat and monitor. Must be called on the Tk thread."""
+        self._thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self.root.after(int(self.interval * 1000), self._beat)
+        threading.Thread(target=self._monitor, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+
+    def _beat(self):
+        if self._stopped.is_set():
+            return
+        now = time.monotonic()
+        with self._lock:
+            lag = now - self._last_beat - self.interval
+            captured, self._captured = self._captured, None
+            self._last_beat = now
+        if lag >= self.threshold:
+            self._record(lag * 1000, captured)
+        self.root.after(int(self.interval * 1000), self._beat)
+
+    def _monitor(self):
+        while not self._stopped.wait(self.interval / 2):
+            with self._lock:
+                overdue = time.monotonic() - self._last_beat - self.interval
+                if overdue < self.threshold or self._captured is not None:
+                    continue
+                frame = sys._current_frames().get(self._thread_id)
+                label = current_operation() or _innermost_function(frame)
+                stack = "".join(traceback.format_stack(frame, limit=STACK_LIMIT)) if frame is not None else ""
+                self._captured = (label, stack)
+            logging.warning(f"Tk event loop stuck for {overdue * 1000:.0f}ms past its heartbeat during {label}; "
+                            f"Tk thread stack:\n{stack}")
+
+    def _record(self, lag_ms, captured):
+        label = captured[0] if captured else "unattributed"  # Shorter than a monitor tick
+        with self._lock:
+            self.stats.add(lag_ms)
+            self.by_operation.setdefault(label, StallStats()).add(lag_ms)
+        logging.warning(f"Tk event loop stall of {lag_ms:.0f}ms during {label}")
+
+    def summary(self):
+        """{"count", "total_ms", "max_ms", "by_operation": {label: {"count", "total_ms", "max_ms"}}}."""
+        with self._lock:
+            def as_dict(stats):
+                return {"count": stats.count, "total_ms": round(stats.total_ms), "max_ms": round(stats.max_ms)}
+            report = as_dict(self.stats)
+            report["by_operation"] = {label: as_dict(stats) for label, stats in self.by_operation.items()}
+            return report
+
+    def summary_text(self):
+        """One line for the Log tab, worst operations first."""
+        report = self.summary()
+        if not report["count"]:
+            return f"No UI stalls over {self.threshold_ms}ms"
+        worst = sorted(report["by_operation"].items(), key=lambda item: item[1]["total_ms"], reverse=True)
+        parts = ", ".join(f"{label} {stats['count']}x/{stats['max_ms']}ms max" for label, stats in worst[:4])
+        return (f"UI stalls over {self.threshold_ms}ms: {report['count']} "
+                f"(total {report['total_ms']}ms, worst {report['max_ms']}ms) - {parts}")
+
+
+def _innermost_function(frame):
+    """`file:function` of the innermost frame from this app's code, for stalls with no operation label."""
+    fallback = None
+    while frame is not None:
+        code = frame.f_code
+        location = f"{os.path.basename(code.co_filename)}:{code.co_name}"
+        if f"{os.sep}src{os.sep}" in code.co_filename:
+            return location
+        fallback = fallback or location
+        frame = frame.f_back
+    return fallback or "unattributed"
@@ -1,14 +1,18 @@
 # src/gui/window.py
 import os
+import json
+import threading
 import tkinter as tk
 from tkinter import ttk, filedialog
 from src.gui.deck_frame import Frame
 from src.gui.favorites_frame import FavoritesFrame
 from src.gui.deck_controls_frame import DeckControlsFrame
 from src.gui.scryfall_search import ScryfallSearchFrame
+from src.gui.watchdog import StallWatchdog, operation
+from src.utils.memory_report import register_probe, log_report
+from src.utils.printings_cache import printings_prefetcher
 from src.config.settings import DECKS_DIR, DEFAULT_WINDOW_WIDTH, DEFAULT_WINDOW_HEIGHT, WINDOW_TITLE, PRIMARY_BG_COLOR, SECONDARY_BG_COLOR, TEXT_COLOR, FIELD_BG_COLOR, WIDGET_ACTIVE_COLOR, DEFAULT_FONT, CONTROL_TEXT_COLOR
 import logging
-import yaml
 
 class Window(tk.Tk):
     def __init__(self, browser, title=WINDOW_TITLE, width=DEFAULT_WINDOW_WIDTH, height=DEFAULT_WINDOW_HEIGHT, resizable=(True, True), *args, **kwargs):
@@ -31,13 +35,29 @@ class Window(tk.Tk):
         self.controls_frame = DeckControlsFrame(self.decks_tab, self.frame, self.favorites_frame)
         self.search_frame = ScryfallSearchFrame(self.search_tab, self.browser, self.frame, self.notebook)
         self.log_text = tk.Text(self.log_tab, height=20, width=80, bg=FIELD_BG_COLOR, fg=TEXT_COLOR, font=DEFAULT_FONT)
+        self.status_bar = tk.Frame(self.log_tab, bg=SECONDARY_BG_COLOR)
+        self.stall_label = tk.Label(self.status_bar, anchor="w", bg=SECONDARY_BG_COLOR, fg=TEXT_COLOR, font=DEFAULT_FONT)
+        self.watchdog = StallWatchdog(self).start()
+        self.memory_sample = {}
+        for probe in ("deck gallery", "favorites", "scryfall search", "log tab", "widgets"):
+            register_probe(probe, lambda probe=probe: self.memory_sample.get(probe, {"sampled": False}))
         self.log_level = tk.StringVar(value="INFO")
         self.verbose = tk.BooleanVar(value=False)
         self.config_file = os.path.join(DECKS_DIR, "..", "config.yml")
         self.load_config()
         self.create_widgets()
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
+        # Any input pauses speculative prefetching until the app has been idle for a while
+        for sequence in ("<Any-KeyPress>", "<Any-ButtonPress>", "<MouseWheel>"):
+            self.bind_all(sequence, lambda e: printings_prefetcher.note_activity(), add="+")
         self.start_log_refresh()
+        # Decode favorites and deck thumbnails once the window is up, not before
+        self.after_idle(self.load_galleries)
+
+    def load_galleries(self):
+        """Start filling the favorites and deck galleries in the background."""
+        self.favorites_frame.load_favorites()
+        self.frame.load_all_decks()
 
     def create_widgets(self):
         self.notebook.add(self.decks_tab, text="Decks")
@@ -62,6 +82,10 @@ class Window(tk.Tk):
         tk.Checkbutton(settings_frame, text="Verbose", variable=self.verbose, bg=SECONDARY_BG_COLOR, fg=TEXT_COLOR,
                        font=DEFAULT_FONT, selectcolor=WIDGET_ACTIVE_COLOR).pack(side=tk.LEFT)
 
+        tk.Button(self.status_bar, text="Memory Report", command=self.memory_report, bg=SECONDARY_BG_COLOR,
+                  fg=CONTROL_TEXT_COLOR, font=DEFAULT_FONT).pack(side=tk.RIGHT, padx=5)
+        self.stall_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.status_bar.pack(side=tk.TOP, fill=tk.X)
         self.log_text.pack(fill="both", expand=True)
         self.search_frame.pack(fill="both", expand=True)
         self.update_log_display()
@@ -70,6 +94,7 @@ class Window(tk.Tk):
         """Load logging settings from config.yml."""
         if os.path.exists(self.config_file):
             try:
+                import yaml
                 with open(self.config_file, "r") as f:
                     config = yaml.safe_load(f) or {}
                 self.log_level.set(config.get("log_level", "INFO"))
@@ -87,6 +112,7 @@ class Window(tk.Tk):
             "verbose": self.verbose.get()
         }
         try:
+            import yaml
             with open(self.config_file, "w") as f:
                 yaml.safe_dump(config, f)
             logging.debug(f"Saved config: {config}")
@@ -101,12 +127,17 @@ class Window(tk.Tk):
         self.save_config()
 
     def on_closing(self):
-        """Save config before closing."""
+        """Save config and log the stall summary before closing."""
+        self.watchdog.stop()
+        logging.info(self.watchdog.summary_text())
         self.save_config()
         self.destroy()
 
+    @operation("log refresh")
     def update_log_display(self):
         """Update Log tab display based on log level and verbose setting."""
+        self.stall_label.config(text=self.watchdog.summary_text())
+        self.sample_memory()
         self.log_text.delete(1.0, tk.END)
         level = self.log_level.get()
         log_file = os.path.join(DECKS_DIR, "..", "logs", "app.log")
@@ -128,12 +159,55 @@ class Window(tk.Tk):
         else:
             logging.warning("Log file not found for display")
 
+    def sample_memory(self, count_widgets=False):
+        """Record live image and widget counts for the memory report. Runs on the Tk thread.
+
+        PhotoImage sizes are estimated from their dimensions at 4 bytes per pixel. Walking the
+        widget tree costs one Tk call per widget, so it is only done for an explicit report.
+        """
+        tile_bytes = self.frame.button_width * self.frame.button_height * 4
+        gallery_ids = set(id(image) for image in self.frame.images)
+        favorites_own = [image for image in self.favorites_frame.images if id(image) not in gallery_ids]
+        search = self.search_frame
+        thumbnails = sum(1 for photo in search.thumbnails.values() if photo is not None)
+        sample_json = sum(len(json.dumps(card)) for card in search.results[:20])
+        result_bytes = sample_json * len(search.results) // min(20, len(search.results)) if search.results else 0
+        chars = self.log_text.count("1.0", tk.END, "chars")
+        chars = chars[0] if chars else 0
+        sample = {
+            "deck gallery": {"tiles": len(self.frame.images), "estimated_bytes": len(gallery_ids) * tile_bytes},
+            "favorites": {"tiles": len(self.favorites_frame.images), "shared_with_gallery":
+                          len(self.favorites_frame.images) - len(favorites_own),
+                          "estimated_bytes": len(favorites_own) * tile_bytes},
+            "scryfall search": {"results": len(search.results), "thumbnails": thumbnails,
+                                "estimated_bytes": thumbnails * (search.button_width // 2) * (search.button_height // 2) * 4
+                                + result_bytes},
+            "log tab": {"lines": int(self.log_text.index("end-1c").split(".")[0]), "chars": chars,
+                        "estimated_bytes": chars},
+            "widgets": self.memory_sample.get("widgets", {"sampled": False}),
+        }
+        if count_widgets:
+            count, pending = 0, [self]
+            while pending:
+                widget = pending.pop()
+                count += 1
+                pending.extend(widget.winfo_children())
+            sample["widgets"] = {"count": count}
+        self.memory_sample = sample
+
+    def memory_report(self):
+        """Sample the GUI counts here, then build and log the report off the Tk thread."""
+        with operation("memory sample"):
+            self.sample_memory(count_widgets=True)
+        threading.Thread(target=log_report, kwargs={"trace": True}, daemon=True).start()
+        self.after(2000, self.update_log_display)
+
     def start_log_refresh(self, interval=5000):
         """Periodically refresh the log display."""
         self.update_log_display()
         self.after(interval, lambda: self.start_log_refresh(interval))
         logging.debug(f"Scheduled log refresh every {interval}ms")
 
-    def show_scryfall_search(self, card_name, set_code, index):
+    def show_scryfall_search(self, card_name, set_code, image):
         self.notebook.select(self.search_tab)
-        self.search_frame.search_scryfall(card_name, set_code, index)
\ No newline at end of file
+        self.search_frame.search_scryfall(card_name, set_code, image)
\ No newline at end of file
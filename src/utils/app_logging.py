@@ -0,0 +1,21 @@
+# src/utils/app_logging.py
+# Logging setup, run once at startup instead of as an import side effect
+import os
+import logging
+from datetime import datetime
+from src.config.settings import LOGS_DIR
+
+LOG_FILE = os.path.join(LOGS_DIR, "app.log")
+
+
+def setup_logging(level=logging.INFO):
+    """Rotate any leftover app.log to a timestamped file and log to a fresh one."""
+    # LOGS_DIR is already created by settings.py
+    if os.path.exists(LOG_FILE):
+        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        try:
+            os.rename(LOG_FILE, os.path.join(LOGS_DIR, f"{timestamp}.log"))
+        except PermissionError as e:
+            print(f"Warning: Could not rename log file due to {e}")
+    logging.basicConfig(filename=LOG_FILE, level=level,
+                        format="%(asctime)s - %(levelname)s - %(message)s")
@@ -0,0 +1,101 @@
+# src/utils/autocomplete.py
+# Card name suggestions for the Scryfall search entry: cached card names first, then Scryfall's autocomplete
+import re
+import logging
+import threading
+from collections import OrderedDict
+from src.config.settings import AUTOCOMPLETE_MIN_CHARS, AUTOCOMPLETE_LIMIT, AUTOCOMPLETE_CACHE_SIZE
+from src.utils.image_cache import image_cache
+from src.utils.scryfall_client import scryfall_client, request_priority, INTERACTIVE
+
+AUTOCOMPLETE_URL = scryfall_client.url("/cards/autocomplete")
+SCRYFALL_AUTOCOMPLETE_MAX = 20  # Scryfall's cap on returned names; a shorter answer is the complete list
+
+
+def normalize(text):
+    """Lowercase `text` and drop punctuation, so "jace the" matches "Jace, the Mind Sculptor"."""
+    return " ".join(re.sub(r"[^0-9a-z ]+", "", text.lower()).split())
+
+
+def matching(names, query, limit=None):
+    """Names whose words start with the normalized `query`, those starting with it first."""
+    query = normalize(query)
+    prefix, inner = [], []
+    for name in names:
+        normalized = normalize(name)
+        if normalized.startswith(query):
+            prefix.append(name)
+        elif f" {query}" in normalized:
+            inner.append(name)
+    return (prefix + inner)[:limit]
+
+
+class CardNameCompleter:
+    """Suggest card names for a partly typed query.
+
+    Names of cards already in the image cache are matched locally and need no
+    request. Scryfall's /cards/autocomplete answers are cached per prefix: when
+    a complete answer (fewer than Scryfall's 20 names) is cached for a prefix of
+    the query, it is filtered locally instead of sending another request.
+    """
+
+    def __init__(self, cache_size=AUTOCOMPLETE_CACHE_SIZE):
+        self.cache_size = cache_size
+        self.stats = {"requests": 0, "cache_hits": 0}
+        self._lock = threading.Lock()
+        self._generation = None
+        self._local_names = []
+        self._remote = OrderedDict()  # Normalized query -> (names, complete)
+
+    def local(self, query, limit=AUTOCOMPLETE_LIMIT):
+        """Matching names from the image cache. Cheap enough for the Tk thread."""
+        with self._lock:
+            if self._generation != image_cache.generation:
+                self._generation = image_cache.generation
+                self._local_names = sorted(set(entry["name"] for _, entry in image_cache.items()))
+            names = self._local_names
+        return matching(names, query, limit)
+
+    def cached(self, query):
+        """Scryfall's suggestions for `query` from the prefix cache, or None if a request is needed."""
+        query = normalize(query)
+        with self._lock:
+            for end in range(len(query), AUTOCOMPLETE_MIN_CHARS - 1, -1):
+                hit = self._remote.get(query[:end])
+                if hit is None:
+                    continue
+                self._remote.move_to_end(query[:end])
+                names, complete = hit
+                if end == len(query):
+                    return names
+                # Names matching the longer query are a subset of a complete answer for its prefix
+                return matching(names, query) if complete else None
+        return None
+
+    def remote(self, query, cancelled=None):
+        """Scryfall's suggestions for `query`, from the prefix cache or one interactive request.
+        Returns None if `cancelled` was set before the request went out."""
+        names = self.cached(query)
+        if names is not None:
+            self.stats["cache_hits"] += 1
+            return names
+        if len(normalize(query)) < AUTOCOMPLETE_MIN_CHARS or (cancelled and cancelled.is_set()):
+            return None
+        self.stats["requests"] += 1
+        with request_priority(INTERACTIVE):
+            response = scryfall_client.get(AUTOCOMPLETE_URL, params={"q": query})
+        response.raise_for_status()
+        names = response.json().get("data", [])
+        with self._lock:
+            self._remote[normalize(query)] = (names, len(names) < SCRYFALL_AUTOCOMPLETE_MAX)
+            while len(self._remote) > self.cache_size:
+                self._remote.popitem(last=False)
+        logging.debug(f"Scryfall autocomplete for '{query}': {len(names)} names")
+        return names
+
+    def suggest(self, query, remote_names=None, limit=AUTOCOMPLETE_LIMIT):
+        """Local matches followed by Scryfall's names that are not already listed."""
+        return list(dict.fromkeys(self.local(query, limit) + list(remote_names or [])))[:limit]
+
+
+card_name_completer = CardNameCompleter()
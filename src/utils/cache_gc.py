@@ -0,0 +1,123 @@
+# src/utils/cache_gc.py
+# Reference-aware garbage collection and size-bounded LRU eviction for the image cache
+import os
+import time
+import logging
+import threading
+from src.config.settings import CACHE_SIZE_BUDGET_MB, CACHE_GC_GRACE_SECONDS
+from src.utils.deck_parser import DeckParser
+from src.utils.favorites import favorite_filenames
+from src.utils.image_cache import image_cache
+
+_maintenance_lock = threading.Lock()
+
+
+def referenced_keys(deck_parser=None):
+    """Keys used by the current deck files or favorites. These are never collected or evicted."""
+    deck_parser = deck_parser or DeckParser()
+    deck_parser.refresh_deck_files()
+    keys = set(favorite_filenames())
+    for _, line in deck_parser.get_deck_lines():
+        match = deck_parser.pattern.match(line)
+        if match:
+            keys.update(image_cache.find(match.group(3), match.group(4)))
+    return keys
+
+
+def slot_paths(browser):
+    """Manifest-relative paths of the images currently shown in the overlay."""
+    paths = set()
+    for value in browser.snapshot().slots:
+        if value and not value.startswith("data:"):  # Empty slots hold the clear.png data URL
+            paths.add(os.path.relpath(os.path.abspath(value), image_cache.cache_dir).replace(os.sep, "/"))
+    return paths
+
+
+def _is_protected(key, entry, protected_keys, protected_paths, now):
+    return (key in protected_keys or entry["path"] in protected_paths
+            or now - entry.get("stored_at", 0) < CACHE_GC_GRACE_SECONDS)
+
+
+def collect_garbage(protected_keys, protected_paths=()):
+    """Delete images no deck, favorite or slot refers to, plus stray files no entry points to.
+
+    Entries stored within the grace period are kept so an in-progress add or
+    replace is never collected before its deck line is written.
+    Returns {"entries": removed entry count, "files": stray files removed, "bytes": bytes reclaimed}.
+    """
+    now = time.time()
+    report = {"entries": 0, "files": 0, "bytes": 0}
+    with image_cache.batch():
+        for key, entry in image_cache.items():
+            if not _is_protected(key, entry, protected_keys, protected_paths, now):
+                report["bytes"] += image_cache.remove(key)
+                report["entries"] += 1
+                logging.debug(f"Cache GC removed unreferenced image: {key}")
+    for rel_path in image_cache.orphan_files():
+        abs_path = os.path.join(image_cache.cache_dir, rel_path)
+        try:
+            if now - os.path.getmtime(abs_path) < CACHE_GC_GRACE_SECONDS:
+                continue  # May be a download still being written
+            size = os.path.getsize(abs_path)
+            os.remove(abs_path)
+            report["bytes"] += size
+            report["files"] += 1
+            logging.debug(f"Cache GC removed orphaned file: {rel_path}")
+        except OSError as e:
+            logging.warning(f"Cache GC could not remove {rel_path}: {str(e)}")
+    return report
+
+
+def evict_to_budget(protected_keys, protected_paths=(), budget_bytes=CACHE_SIZE_BUDGET_MB * 1024 * 1024):
+    """Evict least recently used images until the cache fits in `budget_bytes`.
+
+    Referenced images are never evicted, so a cache whose decks alone exceed
+    the budget stays over it. Returns {"entries": evicted count, "bytes": bytes reclaimed}.
+    """
+    report = {"entries": 0, "bytes": 0}
+    if image_cache.total_size() <= budget_bytes:
+        return report
+    now = time.time()
+    candidates = [(entry.get("last_used", entry.get("stored_at", 0)), key)
+                  for key, entry in image_cache.items()
+                  if not _is_protected(key, entry, protected_keys, protected_paths, now)]
+    candidates.sort()
+    with image_cache.batch():
+        for _, key in candidates:
+            if image_cache.total_size() <= budget_bytes:
+                break
+            report["bytes"] += image_cache.remove(key)
+            report["entries"] += 1
+    if image_cache.total_size() > budget_bytes:
+        logging.warning(f"Image cache is {image_cache.total_size() / 1048576:.1f} MB, over its "
+                        f"{budget_bytes / 1048576:.0f} MB budget, but the rest is referenced by decks or favorites")
+    return report
+
+
+def run_maintenance(protected_paths=(), collect=True):
+    """Run garbage collection (optionally) and LRU eviction once, logging the space reclaimed."""
+    if not _maintenance_lock.acquire(blocking=False):
+        logging.debug("Cache maintenance already running, skipping")
+        return None
+    try:
+        protected_keys = referenced_keys()
+        gc_report = collect_garbage(protected_keys, protected_paths) if collect else {"entries": 0, "files": 0, "bytes": 0}
+        eviction_report = evict_to_budget(protected_keys, protected_paths)
+        image_cache.flush()
+        reclaimed = gc_report["bytes"] + eviction_report["bytes"]
+        logging.info(f"Cache maintenance reclaimed {reclaimed / 1048576:.1f} MB "
+                     f"(GC: {gc_report['entries']} images, {gc_report['files']} stray files, {gc_report['bytes']} bytes; "
+                     f"eviction: {eviction_report['entries']} images, {eviction_report['bytes']} bytes)")
+        return {"gc": gc_report, "eviction": eviction_report, "bytes": reclaimed}
+    except Exception as e:
+        logging.error(f"Cache maintenance failed: {str(e)}", exc_info=True)
+        return None
+    finally:
+        _maintenance_lock.release()
+
+
+def start_background_maintenance(protected_paths=(), collect=True):
+    """Run cache maintenance on a daemon thread."""
+    thread = threading.Thread(target=run_maintenance, args=(set(protected_paths), collect), daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,114 @@
+# src/utils/cache_verify.py
+# Parallel integrity check of cached images with per-file verification stamps
+import os
+import io
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from src.config.settings import CACHE_VERIFY_WORKERS
+from src.utils.image_cache import image_cache
+from src.utils.download_queue import download_queue, image_complete, JPEG_START
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+_verify_lock = threading.Lock()
+
+
+def verify_image(abs_path):
+    """Hash and decode-check one image file. Returns (stamp, error); stamp is None when the file is bad."""
+    from PIL import Image
+    try:
+        with open(abs_path, "rb") as f:
+            data = f.read()
+        stat = os.stat(abs_path)
+    except OSError as e:
+        return None, f"unreadable: {str(e)}"
+    if not data:
+        return None, "empty file"
+    if data.startswith(PNG_SIGNATURE) and not image_complete(data):
+        return None, "truncated PNG (no IEND chunk)"
+    if data.startswith(JPEG_START) and not image_complete(data):
+        return None, "truncated JPEG (no end-of-image marker)"
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            image.verify()
+    except Exception as e:
+        return None, f"undecodable: {str(e)}"
+    return {"size": len(data), "mtime": stat.st_mtime_ns, "sha1": hashlib.sha1(data).hexdigest()}, None
+
+
+def _stamp_current(entry, abs_path):
+    """True if the file still has the size and mtime recorded when it last verified clean."""
+    stamp = entry.get("verified")
+    if not stamp:
+        return False
+    try:
+        stat = os.stat(abs_path)
+    except OSError:
+        return False
+    return stamp["size"] == stat.st_size and stamp["mtime"] == stat.st_mtime_ns
+
+
+def verify_cache(workers=CACHE_VERIFY_WORKERS):
+    """Check every cached image not verified since it last changed, quarantining bad ones.
+
+    Files are checked on a thread pool, since reading and hashing release the
+    GIL and most files are skipped by their stamp anyway. Good files get a stamp in the
+    manifest so the next run skips them; bad files are moved to cache/quarantine
+    and their printings queued for download again.
+    Returns {"checked", "skipped", "quarantined": [keys], "requeued": job count}.
+    """
+    by_path = {}
+    skipped = 0
+    for key, entry in image_cache.items():
+        abs_path = os.path.join(image_cache.cache_dir, entry["path"])
+        if _stamp_current(entry, abs_path):
+            skipped += 1
+        else:
+            by_path.setdefault(abs_path, []).append(key)
+
+    quarantined = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool, image_cache.batch():
+        for abs_path, (stamp, error) in zip(by_path, pool.map(verify_image, by_path)):
+            for key in by_path[abs_path]:
+                if stamp is not None:
+                    image_cache.set_stamp(key, stamp)
+                    continue
+                logging.warning(f"Quarantining corrupt cached image {key}: {error}")
+                entry = image_cache.quarantine(key)
+                if entry is not None:
+                    quarantined.append((key, entry))
+
+    jobs = [{"card_name": entry["name"], "set_code": entry["set"],
+             "collector_number": entry["collector_number"], "is_foil": False}
+            for _, entry in quarantined]
+    requeued = download_queue.enqueue(jobs, force=True) if jobs else 0
+    logging.info(f"Verified {len(by_path)} cached images ({skipped} unchanged since last check), "
+                 f"quarantined {len(quarantined)}")
+    return {"checked": len(by_path), "skipped": skipped,
+            "quarantined": [key for key, _ in quarantined], "requeued": requeued}
+
+
+def run_verification():
+    """Verify the cache once and re-download whatever was quarantined."""
+    if not _verify_lock.acquire(blocking=False):
+        logging.debug("Cache verification already running, skipping")
+        return None
+    try:
+        report = verify_cache()
+        if report["requeued"]:
+            download_queue.run()
+        return report
+    except Exception as e:
+        logging.error(f"Cache verification failed: {str(e)}", exc_info=True)
+        return None
+    finally:
+        _verify_lock.release()
+
+
+def start_background_verification():
+    """Run cache verification on a daemon thread."""
+    thread = threading.Thread(target=run_verification, daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,231 @@
+# src/utils/card_index.py
+# Faceted in-memory index of deck cards for filtered search
+import os
+import re
+import logging
+import threading
+from src.utils.image_cache import image_cache
+
+# Query tokens like deck:atraxa, category:"Card Draw", set:mh3, foil:yes
+FILTER_PATTERN = re.compile(r'(\w+):(?:"([^"]*)"|(\S+))')
+FACET_ALIASES = {
+    "deck": "deck", "d": "deck",
+    "category": "category", "cat": "category", "c": "category",
+    "set": "set", "s": "set", "e": "set",
+    "foil": "foil", "f": "foil",
+}
+FOIL_VALUES = {
+    "yes": ("foil", "etched"), "true": ("foil", "etched"), "foil": ("foil",),
+    "etched": ("etched",), "no": ("nonfoil",), "false": ("nonfoil",), "nonfoil": ("nonfoil",),
+}
+FUZZY_THRESHOLD = 70  # Same cut-off as cards_storage.search_cards
+CANCEL_CHECK_INTERVAL = 256  # Cards fuzzy-matched between checks of the cancelled flag
+
+
+def line_categories(line):
+    """Every Archidekt category in a deck line's [...] group, without {tags}."""
+    start, end = line.find("["), line.rfind("]")
+    if start == -1 or end <= start:
+        return []
+    categories = []
+    for part in line[start + 1:end].split(","):
+        category = re.sub(r"\{.*?\}", "", part).strip()
+        if category:
+            categories.append(category)
+    return categories
+
+
+def parse_query(query):
+    """Split a search query into ({facet: [values]}, name text). Unknown `key:` tokens stay in the name."""
+    filters = {}
+    name_parts = []
+    position = 0
+    for match in FILTER_PATTERN.finditer(query):
+        facet = FACET_ALIASES.get(match.group(1).lower())
+        if facet is None:
+            continue
+        name_parts.append(query[position:match.start()])
+        position = match.end()
+        value = match.group(2) if match.group(2) is not None else match.group(3)
+        filters.setdefault(facet, []).append(value.lower().strip())
+    name_parts.append(query[position:])
+    return filters, " ".join(" ".join(name_parts).split())
+
+
+def _card_record(key, entry):
+    return {
+        "name": entry["name"],
+        "set_code": entry["set"],
+        "collector_number": entry["collector_number"],
+        "filename": key,
+    }
+
+
+def bitset_ids(bits):
+    """Card ids set in a bitset, in ascending order."""
+    return [i for i, bit in enumerate(reversed(bin(bits)[2:])) if bit == "1"]
+
+
+class CardIndex:
+    """Deck cards indexed by deck file, category, set and foil finish.
+
+    Each card image key gets an integer id in deck order, and every facet value
+    maps to a bitset (a Python int) of the ids that have it, so a filter is an
+    AND of bitsets and only the survivors are fuzzy-matched by name. The index
+    is rebuilt as a whole and swapped in, so searches on other threads always
+    see a complete one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state = ([], {}, {})  # (cards, {key: id}, {facet: {value: bitset}})
+
+    def rebuild(self, deck_parser):
+        """Index every parsed deck line whose image is in the cache."""
+        cards, ids, facets = [], {}, {"deck": {}, "category": {}, "set": {}, "foil": {}}
+
+        def add(facet, value, card_id):
+            values = facets[facet]
+            values[value] = values.get(value, 0) | (1 << card_id)
+
+        deck_parser.refresh_deck_files()
+        for deck_file, line in deck_parser.get_deck_lines():
+            match = deck_parser.pattern.match(line)
+            if not match:
+                continue
+            set_code, collector_number = match.group(3), match.group(4)
+            finish = "etched" if "*E*" in line else "foil" if "*F*" in line else "nonfoil"
+            for key in image_cache.find(set_code, collector_number):
+                card_id = ids.get(key)
+                if card_id is None:
+                    entry = image_cache.get(key)
+                    card_id = ids[key] = len(cards)
+                    cards.append(_card_record(key, entry))
+                    add("set", entry["set"].lower(), card_id)
+                add("deck", os.path.splitext(deck_file)[0].lower(), card_id)
+                add("foil", finish, card_id)
+                for category in line_categories(line):
+                    add("category", category.lower(), card_id)
+        with self._lock:
+            self._state = (cards, ids, facets)
+        logging.info(f"Indexed {len(cards)} cards across {len(facets['deck'])} decks, "
+                     f"{len(facets['category'])} categories and {len(facets['set'])} sets")
+
+    def clear(self):
+        with self._lock:
+            self._state = ([], {}, {})
+
+    def add(self, key, deck_file, categories=(), finish="nonfoil"):
+        """Index one cached card from `deck_file` without rebuilding, e.g. after adding it from Scryfall."""
+        entry = image_cache.get(key)
+        if entry is None:
+            return
+        with self._lock:
+            cards, ids, facets = self._state
+            cards, ids = list(cards), dict(ids)
+            facets = {facet: dict(facets.get(facet, {})) for facet in ("deck", "category", "set", "foil")}
+
+            def add(facet, value, card_id):
+                facets[facet][value] = facets[facet].get(value, 0) | (1 << card_id)
+
+            card_id = ids.get(key)
+            if card_id is None:
+                card_id = ids[key] = len(cards)
+                cards.append(_card_record(key, entry))
+                add("set", entry["set"].lower(), card_id)
+            add("deck", os.path.splitext(deck_file)[0].lower(), card_id)
+            add("foil", finish, card_id)
+            for category in categories:
+                add("category", category.lower(), card_id)
+            self._state = (cards, ids, facets)
+
+    def replace_key(self, old_key, new_key):
+        """Point an indexed card at a new printing, keeping its deck, category and foil facets.
+
+        If the new printing is already indexed, the old card's facets are merged into it.
+        """
+        with self._lock:
+            cards, ids, facets = self._state
+            card_id = ids.get(old_key)
+            entry = image_cache.get(new_key)
+            if card_id is None or entry is None or old_key == new_key:
+                return
+            target = ids.get(new_key)
+            bit = 1 << card_id
+            new_facets = {}
+            for facet, values in facets.items():
+                new_values = {}
+                for value, bits in values.items():
+                    if bits & bit and (facet == "set" or target is not None):
+                        bits &= ~bit
+                        if facet != "set":
+                            bits |= 1 << target
+                    new_values[value] = bits
+                new_facets[facet] = new_values
+            cards, ids = list(cards), dict(ids)
+            del ids[old_key]
+            if target is None:
+                ids[new_key] = card_id
+                cards[card_id] = _card_record(new_key, entry)
+                sets = new_facets["set"]
+                sets[entry["set"].lower()] = sets.get(entry["set"].lower(), 0) | bit
+            else:
+                cards[card_id] = None  # Ids stay stable; the slot is skipped by searches
+            self._state = (cards, ids, new_facets)
+
+    def facet_values(self, facet):
+        """Sorted values known for a facet, e.g. the deck names."""
+        return sorted(self._state[2].get(facet, {}))
+
+    def names(self):
+        """Distinct card names in deck order."""
+        return list(dict.fromkeys(card["name"] for card in self._state[0] if card is not None))
+
+    def __len__(self):
+        return len(self._state[1])
+
+    def _facet_bits(self, facets, facet, value):
+        values = facets.get(facet, {})
+        if facet == "set":
+            return values.get(value, 0)
+        if facet == "foil":
+            bits = 0
+            for finish in FOIL_VALUES.get(value, ()):
+                bits |= values.get(finish, 0)
+            return bits
+        # Deck and category names are long, so any name containing the value matches
+        bits = 0
+        for name, name_bits in values.items():
+            if value in name:
+                bits |= name_bits
+        return bits
+
+    def search(self, query, cancelled=None):
+        """Cards matching every filter in `query` and fuzzily matching its remaining name text.
+
+        Returns None if the `cancelled` Event is set while name matching is in progress.
+        """
+        from fuzzywuzzy import fuzz
+        cards, _, facets = self._state
+        filters, name = parse_query(query)
+        if filters:
+            bits = (1 << len(cards)) - 1
+            for facet, values in filters.items():
+                for value in values:
+                    bits &= self._facet_bits(facets, facet, value)
+            candidates = [cards[i] for i in bitset_ids(bits)]
+        else:
+            candidates = [card for card in cards if card is not None]
+        name = name.lower()
+        if not name:
+            return list(candidates)
+        results = []
+        for i, card in enumerate(candidates):
+            if cancelled is not None and i % CANCEL_CHECK_INTERVAL == 0 and cancelled.is_set():
+                return None
+            if fuzz.partial_ratio(name, card["name"].lower()) >= FUZZY_THRESHOLD:
+                results.append(card)
+        return results
+
+
+card_index = CardIndex()
@@ -2,7 +2,6 @@
 import os
 import json
 from src.config.settings import CACHE_DIR
-from fuzzywuzzy import fuzz
 import logging
 
 CARDS_JSON = os.path.join(CACHE_DIR, "cards.json")
@@ -53,8 +52,72 @@ def add_card(name, set_code, collector_number, filename):
         logging.debug(f"Card already exists in cards.json: {filename}")
 
 
+def add_cards(entries):
+    """Add many cards to cards.json with a single read and write.
+
+    `entries` is an iterable of (name, set_code, collector_number, filename) tuples.
+    """
+    try:
+        with open(CARDS_JSON, "r") as f:
+            cards = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        logging.warning(f"Failed to read cards.json, starting fresh: {str(e)}")
+        cards = []
+
+    known = {c["filename"] for c in cards}
+    added = 0
+    for name, set_code, collector_number, filename in entries:
+        if filename in known:
+            continue
+        known.add(filename)
+        cards.append({
+            "name": name,
+            "set_code": set_code,
+            "collector_number": collector_number,
+            "filename": filename
+        })
+        added += 1
+    try:
+        with open(CARDS_JSON, "w") as f:
+            json.dump(cards, f)
+        logging.info(f"Added {added} cards to cards.json")
+    except Exception as e:
+        logging.error(f"Failed to write cards to cards.json: {str(e)}", exc_info=True)
+
+
+def replace_card(old_filename, name, set_code, collector_number, filename):
+    """Swap one card in cards.json for another printing, keeping its position."""
+    try:
+        with open(CARDS_JSON, "r") as f:
+            cards = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        logging.warning(f"Failed to read cards.json, starting fresh: {str(e)}")
+        cards = []
+
+    card = {
+        "name": name,
+        "set_code": set_code,
+        "collector_number": collector_number,
+        "filename": filename
+    }
+    cards = [c for c in cards if c["filename"] != filename or filename == old_filename]
+    for i, c in enumerate(cards):
+        if c["filename"] == old_filename:
+            cards[i] = card
+            break
+    else:
+        cards.append(card)
+    try:
+        with open(CARDS_JSON, "w") as f:
+            json.dump(cards, f)
+        logging.debug(f"Replaced {old_filename} with {filename} in cards.json")
+    except Exception as e:
+        logging.error(f"Failed to write cards.json: {str(e)}", exc_info=True)
+
+
 def search_cards(query):
     """Search cards with fuzzy matching."""
+    from fuzzywuzzy import fuzz
     try:
         with open(CARDS_JSON, "r") as f:
             cards = json.load(f)
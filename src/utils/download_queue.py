@@ -0,0 +1,343 @@
+# src/utils/download_queue.py
+# Durable, resumable queue of Scryfall image downloads
+import os
+import json
+import time
+import random
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from src.config.settings import CACHE_DIR, DOWNLOAD_MAX_ATTEMPTS, DOWNLOAD_BACKOFF_BASE, DOWNLOAD_BACKOFF_MAX, \
+    DOWNLOAD_WORKERS, DOWNLOAD_JOB_MAX_RUNS, GALLERY_IMAGE_QUALITY, STREAM_IMAGE_QUALITY
+from src.utils.image_cache import image_cache, card_cache_key
+from src.utils.scryfall_client import scryfall_client, request_priority, current_priority
+
+JOBS_JSON = os.path.join(CACHE_DIR, "download_jobs.json")
+COLLECTION_URL = scryfall_client.url("/cards/collection")
+COLLECTION_BATCH_SIZE = 75  # Scryfall's limit for /cards/collection
+BASIC_LANDS = ["Island", "Mountain", "Swamp", "Forest", "Plains"]
+PNG_END = b"IEND\xaeB`\x82"
+JPEG_START = b"\xff\xd8"
+JPEG_END = b"\xff\xd9"
+
+
+class RetryableError(Exception):
+    """A failure worth retrying: network errors, 429s, 5xx responses and truncated bodies."""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _retry_after_seconds(value):
+    """Parse a Retry-After header given either as seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt, retry_after=None):
+    """Seconds to wait before retry `attempt` (1-based): Retry-After if given, else capped exponential with jitter."""
+    if retry_after is not None:
+        return min(retry_after, DOWNLOAD_BACKOFF_MAX)
+    delay = min(DOWNLOAD_BACKOFF_BASE * (2 ** (attempt - 1)), DOWNLOAD_BACKOFF_MAX)
+    return delay * random.uniform(0.5, 1.0)
+
+
+def request_with_retry(method, url, max_attempts=DOWNLOAD_MAX_ATTEMPTS, validate=None, **kwargs):
+    """Issue an HTTP request, retrying transient failures with exponential backoff.
+
+    HTTP 429 and 5xx responses are retried, honouring Retry-After. Other 4xx
+    responses raise immediately. Bodies shorter than their Content-Length (whether
+    the connection drops mid-body or not), or rejected by `validate(response)`,
+    count as transient failures.
+    """
+    import requests
+    for attempt in range(1, max_attempts + 1):
+        try:
+            response = scryfall_client.request(method, url, **kwargs)
+            if response.status_code == 429 or response.status_code >= 500:
+                raise RetryableError(f"HTTP {response.status_code} from {url}",
+                                     _retry_after_seconds(response.headers.get("Retry-After")))
+            response.raise_for_status()
+            expected = response.headers.get("Content-Length")
+            if expected is not None and "Content-Encoding" not in response.headers and len(response.content) != int(expected):
+                raise RetryableError(f"Truncated body from {url}: {len(response.content)} of {expected} bytes")
+            if validate is not None and not validate(response):
+                raise RetryableError(f"Invalid body from {url}")
+            return response
+        except (RetryableError, requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+            if attempt == max_attempts:
+                raise
+            delay = backoff_delay(attempt, getattr(e, "retry_after", None))
+            logging.warning(f"{method} {url} failed ({str(e)}), retry {attempt}/{max_attempts - 1} in {delay:.1f}s")
+            time.sleep(delay)
+
+
+def image_complete(data):
+    """False for a PNG or JPEG cut off before its end marker (trailing padding is ignored)."""
+    data = data.rstrip(b"\0")
+    if data.startswith(JPEG_START):
+        return data.endswith(JPEG_END)
+    return data.endswith(PNG_END)
+
+
+def card_images(card):
+    """(face index, face) for each separately imaged side of a Scryfall card; (None, card) when the
+    card has one image. Any layout with card_faces and no top-level image_uris has one per face."""
+    if "card_faces" in card and "image_uris" not in card:
+        return list(enumerate(card["card_faces"]))
+    return [(None, card)]
+
+
+def image_urls(card_or_face, quality=GALLERY_IMAGE_QUALITY):
+    """(quality, url) to download for a card or face, falling back to the stream quality, and the
+    stream-quality url to record for a later upgrade (None when they are the same)."""
+    uris = card_or_face.get("image_uris", {})
+    if quality not in uris:
+        quality = STREAM_IMAGE_QUALITY
+    full_url = uris.get(STREAM_IMAGE_QUALITY)
+    return quality, uris.get(quality), full_url if quality != STREAM_IMAGE_QUALITY else None
+
+
+def _download_image(url):
+    """Fetch one image, treating a body without its format's end marker as truncated."""
+    return request_with_retry("GET", url, validate=lambda r: image_complete(r.content)).content
+
+
+def needs_stream_quality(entry):
+    """True if a cached image is a gallery tier that should be upgraded before going on stream."""
+    return entry is not None and entry.get("quality", "png") != STREAM_IMAGE_QUALITY
+
+
+def fetch_stream_quality(key, keep_replaced=False):
+    """Replace a gallery-tier image with the stream-quality one. Returns the new absolute path,
+    or None if no upgrade was needed or it failed (the gallery image stays in place).
+    With `keep_replaced` the gallery file stays on disk until `image_cache.discard_file`."""
+    entry = image_cache.get(key)
+    if not needs_stream_quality(entry):
+        return None
+    try:
+        url = entry.get("full_url")
+        if not url:
+            card = request_with_retry("GET", scryfall_client.url(f"/cards/{entry['scryfall_id']}")).json()
+            source = card["card_faces"][entry["face"]] if entry.get("face") is not None else card
+            url = source["image_uris"][STREAM_IMAGE_QUALITY]
+        data = _download_image(url)
+        path = image_cache.store(key, data, entry["name"], entry["set"], entry["collector_number"],
+                                 scryfall_id=entry.get("scryfall_id"), face=entry.get("face"),
+                                 quality=STREAM_IMAGE_QUALITY, keep_replaced=keep_replaced)
+        logging.info(f"Fetched {STREAM_IMAGE_QUALITY} image for {key} ({len(data) / 1048576:.1f} MB)")
+        return path
+    except Exception as e:
+        logging.warning(f"Could not fetch {STREAM_IMAGE_QUALITY} image for {key}, keeping the "
+                        f"{entry.get('quality')} one: {str(e)}")
+        return None
+
+
+def _job_id(card):
+    return f"{card['set_code'].lower()}/{card['collector_number']}"
+
+
+class DownloadQueue:
+    """Image downloads persisted to download_jobs.json until they complete.
+
+    Jobs are card dicts (card_name, set_code, collector_number, is_foil). A job is
+    only removed once every face of the card is in the image cache, so a run that
+    is interrupted, or fails after its retries, is picked up again by the next run,
+    including after a restart. Printings already cached are never fetched again.
+    A card whose download fails in DOWNLOAD_JOB_MAX_RUNS runs is parked in
+    `failed()` instead of being retried on every launch; a forced enqueue or
+    `retry_failed` makes it pending again. A batch request that fails as a whole
+    (e.g. offline) does not count against its cards.
+    """
+
+    def __init__(self, jobs_path=JOBS_JSON):
+        self.jobs_path = jobs_path
+        self._lock = threading.Lock()
+        self._run_lock = threading.Lock()
+        self._jobs, self._failed = self._load()
+
+    def _load(self):
+        if not os.path.exists(self.jobs_path):
+            return {}, {}
+        try:
+            with open(self.jobs_path, "r") as f:
+                data = json.load(f)
+            jobs, failed = data.get("jobs", []), data.get("failed", [])
+            logging.info(f"Found {len(jobs)} unfinished download jobs"
+                         f"{f' and {len(failed)} failed ones' if failed else ''}")
+            return {_job_id(card): card for card in jobs}, {_job_id(card): card for card in failed}
+        except (OSError, json.JSONDecodeError) as e:
+            logging.warning(f"Failed to read download_jobs.json, starting empty: {str(e)}")
+            return {}, {}
+
+    def _save(self):
+        tmp_path = f"{self.jobs_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"jobs": list(self._jobs.values()), "failed": list(self._failed.values())}, f)
+        os.replace(tmp_path, self.jobs_path)
+
+    def enqueue(self, cards, force=False):
+        """Persist jobs for cards whose printing is not cached yet.
+
+        With `force`, jobs are added even if some of the printing is cached, e.g. to
+        replace one bad face of a double-faced card; faces already cached are kept.
+        Parked failed jobs are only added again with `force`.
+        """
+        with self._lock:
+            added = 0
+            for card in cards:
+                job_id = _job_id(card)
+                if job_id in self._jobs or (job_id in self._failed and not force):
+                    continue
+                if force or not image_cache.find(card["set_code"], card["collector_number"]):
+                    self._failed.pop(job_id, None)
+                    self._jobs[job_id] = {field: value for field, value in card.items() if field != "attempts"}
+                    added += 1
+            if added:
+                self._save()
+            return added
+
+    def pending(self):
+        with self._lock:
+            return list(self._jobs.values())
+
+    def failed(self):
+        """Jobs parked after failing in DOWNLOAD_JOB_MAX_RUNS runs."""
+        with self._lock:
+            return list(self._failed.values())
+
+    def retry_failed(self):
+        """Make every parked job pending again with a fresh attempt count. Returns how many."""
+        with self._lock:
+            retried = len(self._failed)
+            for job_id, job in self._failed.items():
+                self._jobs[job_id] = {field: value for field, value in job.items() if field != "attempts"}
+            self._failed = {}
+            if retried:
+                self._save()
+            return retried
+
+    @property
+    def running(self):
+        """True while a run is downloading."""
+        return self._run_lock.locked()
+
+    def clear(self):
+        """Drop every pending job, e.g. when the cache is wiped."""
+        with self._lock:
+            self._jobs = {}
+            self._failed = {}
+            self._save()
+
+    def _complete(self, job_ids):
+        if not job_ids:
+            return
+        with self._lock:
+            for job_id in job_ids:
+                self._jobs.pop(job_id, None)
+            self._save()
+
+    def _record_failures(self, job_ids):
+        """Count a failed run against each job, parking those that reached DOWNLOAD_JOB_MAX_RUNS."""
+        if not job_ids:
+            return
+        with self._lock:
+            for job_id in job_ids:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    continue
+                job["attempts"] = job.get("attempts", 0) + 1
+                if job["attempts"] >= DOWNLOAD_JOB_MAX_RUNS:
+                    self._failed[job_id] = self._jobs.pop(job_id)
+                    logging.warning(f"Giving up on {job['card_name']} ({job['set_code']} #{job['collector_number']}) "
+                                    f"after {job['attempts']} failed runs")
+            self._save()
+
+    def run(self):
+        """Process pending jobs until none are left or every remaining batch has failed.
+
+        Only one run is active at a time; a second caller waits for it and then
+        picks up whatever is still pending. Returns the number of jobs still pending.
+        """
+        with self._run_lock:
+            jobs = self.pending()
+            if jobs:
+                logging.info(f"Downloading images for {len(jobs)} cards")
+            for i in range(0, len(jobs), COLLECTION_BATCH_SIZE):
+                self._run_batch(jobs[i:i + COLLECTION_BATCH_SIZE])
+            remaining = len(self.pending())
+            if remaining:
+                logging.warning(f"{remaining} download jobs left pending; they will be retried on the next run")
+            return remaining
+
+    def _run_batch(self, jobs):
+        by_print = {_job_id(job): job for job in jobs}
+        payload = {"identifiers": [{"set": job["set_code"], "collector_number": job["collector_number"]} for job in jobs]}
+        try:
+            response = request_with_retry("POST", COLLECTION_URL, json=payload,
+                                          headers={"Content-Type": "application/json"})
+            body = response.json()
+        except Exception as e:
+            logging.error(f"Failed to fetch Scryfall batch: {str(e)}", exc_info=True)
+            return
+
+        done, failed = [], []
+        for missing in body.get("not_found", []):
+            job_id = f"{missing.get('set', '').lower()}/{missing.get('collector_number')}"
+            job = by_print.get(job_id)
+            if job is not None:
+                done.append(job_id)  # Retrying cannot help, so drop it
+                logging.warning(f"Scryfall has no card for {job['card_name']} ({job['set_code']} #{job['collector_number']})")
+
+        priority = current_priority()
+
+        def download(card):
+            with request_priority(priority):
+                self._download_card(card)
+
+        with image_cache.batch(), ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as pool:
+            downloads = []
+            for card in body.get("data", []):
+                job_id = f"{card['set'].lower()}/{card['collector_number']}"
+                job = by_print.get(job_id)
+                if job is not None:
+                    downloads.append((job_id, job, card, pool.submit(download, card)))
+            for job_id, job, card, future in downloads:
+                try:
+                    future.result()
+                    done.append(job_id)
+                    logging.debug(f"Downloaded images for {card['name']} ({card['set']} #{card['collector_number']})")
+                except Exception as e:
+                    failed.append(job_id)
+                    if not any(basic in job["card_name"] for basic in BASIC_LANDS):
+                        logging.warning(f"Failed to download {job['card_name']} ({job['set_code']} #{job['collector_number']}): {str(e)}")
+        # Record finished jobs only once their manifest entries are on disk
+        self._complete(done)
+        self._record_failures(failed)
+
+    @staticmethod
+    def _download_card(card):
+        """Store each face of a card at the gallery quality, remembering where the stream-quality image is."""
+        for face_index, face in card_images(card):
+            key = card_cache_key(face["name"], card["set"], card["collector_number"])
+            if image_cache.contains(key):
+                continue
+            quality, url, full_url = image_urls(face)
+            if url is None:
+                raise ValueError(f"Scryfall lists no image for {face['name']}")
+            image_cache.store(key, _download_image(url), face["name"], card["set"], card["collector_number"],
+                              scryfall_id=card.get("id"), face=face_index, quality=quality, full_url=full_url)
+
+
+download_queue = DownloadQueue()
+
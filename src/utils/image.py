@@ -1,36 +1,47 @@
 # src/utils/image.py
-import os
-import requests
-import time
 import logging
-from datetime import datetime
-from src.config.settings import CACHE_DIR, CLEAR_IMAGE_SIZE, LOGS_DIR
-from PIL import Image, ImageTk
+import functools
+from src.config.settings import CACHE_DIR, CLEAR_IMAGE_SIZE
+from src.utils.image_cache import image_cache
 import io
 import base64
 
-# Logging setup (LOGS_DIR is already created by settings.py)
-log_file = os.path.join(LOGS_DIR, "app.log")
-if os.path.exists(log_file):
-    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    os.rename(log_file, os.path.join(LOGS_DIR, f"{timestamp}.log"))
-logging.basicConfig(filename=log_file, level=logging.INFO,
-                    format="%(asctime)s - %(levelname)s - %(message)s")
+# Pillow is imported where they are used so that importing this
+# module stays cheap on the startup path.
 
 class CustomImage:
-    def __init__(self, directory, name):
-        self.directory = directory
+    def __init__(self, name, path=None):
+        # `name` is the image cache key; the file lives wherever the manifest says
         self.name = name
+        self._path = path
         self.thumbnail = None
 
-    def load_thumbnail(self, button_width, button_height):
-        image_path = os.path.join(self.directory, self.name)
-        image = Image.open(image_path)
-        image = image.resize((button_width, button_height), resample=Image.LANCZOS)
+    @property
+    def path(self):
+        # Looked up on use, since a stream-quality upgrade moves the file
+        return self._path or image_cache.path(self.name)
+
+    def render_thumbnail(self, button_width, button_height):
+        """Decode and resize the image. Safe to call off the Tk thread."""
+        from PIL import Image
+        if self.path is None:
+            raise FileNotFoundError(f"{self.name} is not in the image cache")
+        image_cache.touch(self.name)
+        with Image.open(self.path) as image:
+            return image.resize((button_width, button_height), resample=Image.LANCZOS)
+
+    def set_thumbnail(self, image):
+        """Wrap a rendered thumbnail in a PhotoImage. Must run on the Tk thread."""
+        from PIL import ImageTk
         self.thumbnail = ImageTk.PhotoImage(image)
 
+    def load_thumbnail(self, button_width, button_height):
+        self.set_thumbnail(self.render_thumbnail(button_width, button_height))
+
+@functools.lru_cache(maxsize=1)
 def create_clear_png():
-    """Create clear.png in memory as a base64 string."""
+    """Create clear.png in memory as a base64 string (built once, then cached)."""
+    from PIL import Image
     width, height = CLEAR_IMAGE_SIZE
     image = Image.new("RGBA", (width, height), (0, 0, 0, 0))
     buffer = io.BytesIO()
@@ -42,61 +53,17 @@ def create_clear_png():
     return base64_str
 
 def download_scryfall_images(cards):
-    """Download images for a list of cards in bulk from Scryfall."""
-    # CACHE_DIR is already created by settings.py
-    base_url = "https://api.scryfall.com/cards/collection"
-    headers = {"Content-Type": "application/json"}
-    identifiers = [
-        {"set": card["set_code"], "collector_number": card["collector_number"]}
-        for card in cards
-    ]
-    all_image_paths = []
-
-    logging.debug(f"Starting download for {len(identifiers)} cards")
-    for i in range(0, len(identifiers), 75):
-        batch = identifiers[i:i + 75]
-        batch_cards = cards[i:i + 75]
-        payload = {"identifiers": batch}
-        batch_paths = []
-        try:
-            response = requests.post(base_url, json=payload, headers=headers)
-            response.raise_for_status()
-            card_data = response.json()["data"]
-            for card, orig_card in zip(card_data, batch_cards):
-                safe_name = f"{card['name'].replace(' ', '_').replace('/', '_')}_{card['set']}_{card['collector_number']}.png"
-                file_path = os.path.join(CACHE_DIR, safe_name)
-                image_paths = []
+    """Download images for a list of cards in bulk from Scryfall.
 
-                if "card_faces" in card and card["layout"] in ["modal_dfc", "transform"]:
-                    for face in card["card_faces"]:
-                        face_name = face["name"].replace(" ", "_").replace("/", "_")
-                        face_file = f"{face_name}_{card['set']}_{card['collector_number']}.png"
-                        face_path = os.path.join(CACHE_DIR, face_file)
-                        if not os.path.isfile(face_path):
-                            image_url = face["image_uris"]["png"] if not orig_card["is_foil"] else face.get("image_uris", {}).get("png")
-                            with requests.get(image_url) as img_response:
-                                img_response.raise_for_status()
-                                with open(face_path, "wb") as f:
-                                    f.write(img_response.content)
-                        image_paths.append(face_path)
-                else:
-                    if not os.path.isfile(file_path):
-                        image_url = card["image_uris"]["png"] if not orig_card["is_foil"] else card.get("image_uris", {}).get("png")
-                        with requests.get(image_url) as img_response:
-                            img_response.raise_for_status()
-                            with open(file_path, "wb") as f:
-                                f.write(img_response.content)
-                    image_paths.append(file_path)
-
-                batch_paths.extend(image_paths)
-                logging.debug(f"Downloaded images for {card['name']} ({card['set']} #{card['collector_number']})")
-            all_image_paths.extend(batch_paths)
-            time.sleep(0.1)
-        except Exception as e:
-            logging.error(f"Failed to fetch Scryfall batch: {str(e)}", exc_info=True)
-            for card in batch_cards:
-                if not any(basic in card["card_name"] for basic in ["Island", "Mountain", "Swamp", "Forest", "Plains"]):
-                    logging.warning(f"Failed to download {card['card_name']} ({card['set_code']} #{card['collector_number']})")
+    Cards are queued on disk first, so an interrupted download resumes where it
+    stopped instead of starting over.
+    """
+    from src.utils.download_queue import download_queue
+    download_queue.enqueue(cards)
+    download_queue.run()
+    all_image_paths = []
+    for card in cards:
+        all_image_paths.extend(image_cache.path(key) for key in image_cache.find(card["set_code"], card["collector_number"]))
     logging.debug(f"Completed download: {len(all_image_paths)} paths")
     return all_image_paths
 
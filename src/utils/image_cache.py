@@ -0,0 +1,363 @@
+# src/utils/image_cache.py
+# Sharded, manifest-indexed store for card images
+import io
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from src.config.settings import CACHE_DIR
+
+MANIFEST_JSON = os.path.join(CACHE_DIR, "manifest.json")
+IMAGES_DIR = os.path.join(CACHE_DIR, "images")
+MANIFEST_VERSION = 1
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def card_cache_key(name, set_code, collector_number):
+    """Image cache key for a card or card face, e.g. `Sol_Ring_cmm_400.png`."""
+    safe_name = name.replace(" ", "_").replace("/", "_")
+    return f"{safe_name}_{set_code}_{collector_number}.png"
+
+
+class ImageCache:
+    """Card images stored in sharded subdirectories and indexed by one manifest.
+
+    Each card image is identified by a key: the `Name_set_cn.png` name the rest of
+    the app already stores in favorites.txt, deck_cache.json and cards.json. The
+    manifest maps every key to its file (`images/<2 hex>/<id>.png`, or `.jpg` for JPEG tiers, where the id is
+    the Scryfall id or a content hash) and to the card's name, set, collector
+    number and face, so lookups and enumeration never list the directory.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.images_dir = os.path.join(cache_dir, "images")
+        self.quarantine_dir = os.path.join(cache_dir, "quarantine")
+        self.manifest_path = os.path.join(cache_dir, "manifest.json")
+        self._lock = threading.RLock()
+        self._entries = None
+        self._by_print = {}
+        self._path_refs = Counter()
+        self._total_bytes = 0
+        self._batch_depth = 0
+        self._dirty = False
+        self.generation = 0  # Bumped whenever entries are added or removed, for derived indexes
+
+    # Loading and saving
+
+    def _ensure_loaded(self):
+        if self._entries is not None:
+            return
+        with self._lock:
+            if self._entries is not None:
+                return
+            entries = {}
+            if os.path.exists(self.manifest_path):
+                try:
+                    with open(self.manifest_path, "r") as f:
+                        entries = json.load(f).get("entries", {})
+                    logging.debug(f"Loaded image manifest with {len(entries)} entries")
+                except (OSError, json.JSONDecodeError) as e:
+                    logging.error(f"Failed to read image manifest, rebuilding: {str(e)}", exc_info=True)
+            self._entries = entries
+            self._by_print = {}
+            self._path_refs = Counter()
+            self._total_bytes = 0
+            for key, entry in entries.items():
+                self._index(key, entry)
+            if not os.path.exists(self.manifest_path):
+                self._migrate_flat_cache()
+
+    def _index(self, key, entry):
+        print_id = (entry["set"].lower(), entry["collector_number"])
+        self._by_print.setdefault(print_id, []).append(key)
+        if not self._path_refs[entry["path"]]:
+            self._total_bytes += entry.get("size", 0)
+        self._path_refs[entry["path"]] += 1
+
+    def _unindex(self, key, entry):
+        print_id = (entry["set"].lower(), entry["collector_number"])
+        keys = self._by_print.get(print_id, [])
+        if key in keys:
+            keys.remove(key)
+        if not keys:
+            self._by_print.pop(print_id, None)
+        self._path_refs[entry["path"]] -= 1
+        if self._path_refs[entry["path"]] <= 0:
+            del self._path_refs[entry["path"]]
+            self._total_bytes -= entry.get("size", 0)
+
+    def _changed(self):
+        self.generation += 1
+        self._dirty = True
+        if self._batch_depth == 0:
+            self.flush()
+
+    def flush(self):
+        """Write the manifest atomically if it has unsaved changes."""
+        with self._lock:
+            if not self._dirty or self._entries is None:
+                return
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{self.manifest_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"version": MANIFEST_VERSION, "entries": self._entries}, f)
+            os.replace(tmp_path, self.manifest_path)
+            self._dirty = False
+
+    @contextmanager
+    def batch(self):
+        """Defer manifest writes until the outermost batch exits."""
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self.flush()
+
+    def reset(self):
+        """Forget every entry, e.g. after the cache directory was wiped."""
+        with self._lock:
+            self._entries = {}
+            self._by_print = {}
+            self._path_refs = Counter()
+            self._total_bytes = 0
+            self.generation += 1
+            self._dirty = True
+            self.flush()
+
+    # Lookups
+
+    def contains(self, key):
+        self._ensure_loaded()
+        return key in self._entries
+
+    def get(self, key):
+        """Return a copy of the manifest entry for `key`, or None."""
+        self._ensure_loaded()
+        entry = self._entries.get(key)
+        return dict(entry) if entry is not None else None
+
+    def path(self, key):
+        """Absolute path of the image stored under `key`, or None."""
+        self._ensure_loaded()
+        entry = self._entries.get(key)
+        return os.path.join(self.cache_dir, entry["path"]) if entry is not None else None
+
+    def keys(self):
+        self._ensure_loaded()
+        with self._lock:
+            return list(self._entries)
+
+    def find(self, set_code, collector_number):
+        """Keys stored for a printing; double-faced cards have one key per face."""
+        self._ensure_loaded()
+        with self._lock:
+            return list(self._by_print.get((set_code.lower(), str(collector_number)), []))
+
+    def display_name(self, key):
+        entry = self.get(key)
+        if entry is not None:
+            return entry["name"]
+        return " ".join(key.replace("_", " ").split(" ")[0:-2])
+
+    def items(self):
+        """Snapshot of (key, entry copy) pairs."""
+        self._ensure_loaded()
+        with self._lock:
+            return [(key, dict(entry)) for key, entry in self._entries.items()]
+
+    def total_size(self):
+        """Bytes used by stored images, counting shared files once."""
+        self._ensure_loaded()
+        return self._total_bytes
+
+    def touch(self, key):
+        """Record a use of `key` for LRU eviction. Saved with the next manifest write."""
+        self._ensure_loaded()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry["last_used"] = time.time()
+                self._dirty = True
+
+    def set_stamp(self, key, stamp):
+        """Record the (size, mtime, hash) a verification pass found for `key`. Saved with the next manifest write."""
+        self._ensure_loaded()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry["verified"] = stamp
+                self._dirty = True
+
+    def orphan_files(self):
+        """Relative paths under images/ that no manifest entry points to, e.g. interrupted writes."""
+        self._ensure_loaded()
+        orphans = []
+        for dirpath, _, filenames in os.walk(self.images_dir):
+            for filename in filenames:
+                rel_path = os.path.relpath(os.path.join(dirpath, filename), self.cache_dir).replace(os.sep, "/")
+                if not self._path_refs.get(rel_path):
+                    orphans.append(rel_path)
+        return orphans
+
+    def __len__(self):
+        self._ensure_loaded()
+        return len(self._entries)
+
+    # Writing
+
+    def store(self, key, data, name, set_code, collector_number, scryfall_id=None, face=None, quality=None,
+              full_url=None, keep_replaced=False):
+        """Write image bytes under `key` and record the card's identity in the manifest.
+
+        `quality` is the Scryfall image_uris size the bytes came from (PNG when not
+        given); for a lower tier, `full_url` is where the stream-quality image lives.
+        """
+        return self.store_stream(key, io.BytesIO(data), name, set_code, collector_number, scryfall_id, face,
+                                 sha1=None if scryfall_id else hashlib.sha1(data).hexdigest(), quality=quality,
+                                 full_url=full_url, keep_replaced=keep_replaced)
+
+    def store_stream(self, key, stream, name, set_code, collector_number, scryfall_id=None, face=None, sha1=None,
+                     quality=None, full_url=None, keep_replaced=False):
+        """Like `store`, but copy the image from a file object in chunks.
+
+        `sha1` names the file when there is no Scryfall id, and if given the copied
+        bytes must match it: on a mismatch nothing is stored and ValueError is raised.
+        With `keep_replaced`, a different file previously stored under `key` is left
+        on disk for the caller to remove with `discard_file` once nothing shows it.
+        """
+        quality = quality or "png"
+        self._ensure_loaded()
+        if scryfall_id:
+            file_id = f"{scryfall_id}-{face}" if face is not None else scryfall_id
+        elif sha1:
+            file_id = sha1
+        else:
+            raise ValueError(f"{key} needs a Scryfall id or a content hash")
+        extension = "png" if quality == "png" else "jpg"  # Scryfall's other sizes are JPEGs
+        rel_path = f"images/{file_id[:2]}/{file_id}.{extension}"  # Forward slashes keep the manifest portable
+        abs_path = os.path.join(self.cache_dir, rel_path)
+        images_root = os.path.realpath(self.images_dir)
+        if os.path.commonpath([images_root, os.path.realpath(abs_path)]) != images_root:
+            raise ValueError(f"{key} would be stored outside the image cache: {rel_path}")
+        os.makedirs(os.path.dirname(abs_path), exist_ok=True)
+        tmp_path = f"{abs_path}.{threading.get_ident()}.part"
+        digest = hashlib.sha1()
+        with open(tmp_path, "wb") as f:
+            for chunk in iter(lambda: stream.read(COPY_CHUNK_SIZE), b""):
+                digest.update(chunk)
+                f.write(chunk)
+            size = f.tell()
+        if sha1 and digest.hexdigest() != sha1:
+            os.remove(tmp_path)
+            raise ValueError(f"{key} does not match its content hash")
+        os.replace(tmp_path, abs_path)
+        entry = {
+            "path": rel_path,
+            "name": name,
+            "set": set_code,
+            "collector_number": str(collector_number),
+            "face": face,
+            "scryfall_id": scryfall_id,
+            "quality": quality,
+            "size": size,
+            "stored_at": time.time(),
+        }
+        if full_url:
+            entry["full_url"] = full_url
+        self._add_entry(key, entry, delete_replaced=not keep_replaced)
+        return abs_path
+
+    def _add_entry(self, key, entry, delete_replaced=True):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._unindex(key, old)
+                if "last_used" in old:
+                    entry.setdefault("last_used", old["last_used"])
+            self._entries[key] = entry
+            self._index(key, entry)
+            if old is not None and old["path"] != entry["path"] and delete_replaced:
+                self._delete_file(old["path"])
+            self._changed()
+
+    def remove(self, key):
+        """Delete the image stored under `key`. Returns the number of bytes freed."""
+        self._ensure_loaded()
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return 0
+            self._unindex(key, entry)
+            freed = self._delete_file(entry["path"])
+            self._changed()
+            return freed
+
+    def quarantine(self, key):
+        """Drop `key` and move its file to cache/quarantine for inspection. Returns the removed entry."""
+        self._ensure_loaded()
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return None
+            self._unindex(key, entry)
+            abs_path = os.path.join(self.cache_dir, entry["path"])
+            if not self._path_refs.get(entry["path"]) and os.path.exists(abs_path):
+                os.makedirs(self.quarantine_dir, exist_ok=True)
+                os.replace(abs_path, os.path.join(self.quarantine_dir, os.path.basename(abs_path)))
+            self._changed()
+            return entry
+
+    def discard_file(self, rel_path):
+        """Delete a manifest-relative file kept by `keep_replaced`, unless an entry uses it again."""
+        self._ensure_loaded()
+        with self._lock:
+            return self._delete_file(rel_path)
+
+    def _delete_file(self, rel_path):
+        abs_path = os.path.join(self.cache_dir, rel_path)
+        # Several keys can share one content-addressed file
+        if self._path_refs.get(rel_path):
+            return 0
+        try:
+            size = os.path.getsize(abs_path)
+            os.remove(abs_path)
+            return size
+        except OSError:
+            return 0
+
+    # Migration
+
+    def _migrate_flat_cache(self):
+        """Move images from the old flat `Name_set_cn.png` layout into shards, once."""
+        try:
+            legacy_files = [f for f in os.listdir(self.cache_dir) if f.endswith(".png")]
+        except FileNotFoundError:
+            legacy_files = []
+        with self.batch():
+            for filename in legacy_files:
+                legacy_path = os.path.join(self.cache_dir, filename)
+                try:
+                    with open(legacy_path, "rb") as f:
+                        data = f.read()
+                    parts = filename[:-len(".png")].rsplit("_", 2)
+                    if len(parts) != 3:
+                        raise ValueError("unrecognised legacy filename")
+                    self.store(filename, data, parts[0].replace("_", " "), parts[1], parts[2])
+                    os.remove(legacy_path)
+                except (OSError, ValueError) as e:
+                    logging.warning(f"Could not migrate legacy cache file {filename}: {str(e)}")
+            self._dirty = True
+        if legacy_files:
+            logging.info(f"Migrated {len(legacy_files)} images into the sharded image cache")
+
+
+image_cache = ImageCache()
@@ -0,0 +1,63 @@
+# src/utils/latest_task.py
+# Worker threads for requests where only the newest submission matters (search-as-you-type)
+import logging
+import threading
+
+
+class LatestTaskRunner:
+    """Run a task per submission on a worker thread, keeping only the newest result.
+
+    Every `submit` returns a generation token and cancels the task before it
+    through a `cancelled` Event passed to the task as a keyword argument. Results
+    from older generations are dropped, so the Tk side, polling `result`, only
+    ever applies the newest one.
+    """
+
+    def __init__(self, name="task"):
+        self.name = name
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._cancelled = None
+        self._result = None  # (generation, value, error)
+
+    def submit(self, fn, *args, **kwargs):
+        """Start fn(*args, cancelled=Event, **kwargs) on a daemon thread and return its generation."""
+        with self._lock:
+            if self._cancelled is not None:
+                self._cancelled.set()
+            self._generation += 1
+            generation = self._generation
+            cancelled = self._cancelled = threading.Event()
+        threading.Thread(target=self._run, args=(generation, cancelled, fn, args, kwargs), daemon=True).start()
+        return generation
+
+    def _run(self, generation, cancelled, fn, args, kwargs):
+        value, error = None, None
+        try:
+            value = fn(*args, cancelled=cancelled, **kwargs)
+        except Exception as e:
+            error = e
+        with self._lock:
+            if generation != self._generation or cancelled.is_set():
+                logging.debug(f"Discarded stale {self.name} result (generation {generation})")
+                return
+            self._result = (generation, value, error)
+
+    def cancel(self):
+        """Cancel the running task, if any, and invalidate its generation."""
+        with self._lock:
+            if self._cancelled is not None:
+                self._cancelled.set()
+            self._generation += 1
+
+    def is_current(self, generation):
+        return generation == self._generation
+
+    def result(self, generation):
+        """(done, value, error) for `generation`; done stays False once it is superseded."""
+        with self._lock:
+            if self._result is not None and self._result[0] == generation:
+                _, value, error = self._result
+                self._result = None
+                return True, value, error
+            return False, None, None
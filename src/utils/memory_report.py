@@ -0,0 +1,192 @@
+# src/utils/memory_report.py
+# Per-subsystem memory accounting: tracemalloc allocations plus live object counts
+import os
+import sys
+import time
+import logging
+import threading
+import tracemalloc
+from src.config.settings import MEMORY_TRACE_FRAMES, MEMORY_REPORT_TOP, MEMORY_BUDGETS_MB
+
+_probes = {}
+_lock = threading.Lock()
+_last_by_subsystem = {}
+_tracing_since = None
+
+
+def _core_probes():
+    from src.utils.image_cache import image_cache
+    from src.utils.card_index import card_index
+    from src.utils.download_queue import download_queue
+    return {
+        "image cache": lambda: {"entries": len(image_cache), "disk_bytes": image_cache.total_size()},
+        "card index": lambda: {"cards": len(card_index)},
+        "download queue": lambda: {"pending": len(download_queue.pending())},
+    }
+
+
+def register_probe(name, fn):
+    """Add a subsystem probe: `fn()` returns a dict of counts, with optional "estimated_bytes".
+
+    Probes are called from whichever thread builds the report, so anything that
+    must be read on the Tk thread should return values sampled there.
+    """
+    with _lock:
+        _probes[name] = fn
+
+
+def start_tracing():
+    """Start tracemalloc if it is not running. Only allocations made after this are attributed."""
+    global _tracing_since
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(MEMORY_TRACE_FRAMES)
+        _tracing_since = time.time()
+        logging.info(f"Started memory tracing ({MEMORY_TRACE_FRAMES} frames per allocation)")
+
+
+def stop_tracing():
+    """Stop tracemalloc and forget the previous report's figures, freeing its traces."""
+    global _tracing_since, _last_by_subsystem
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+        logging.info("Stopped memory tracing")
+    _tracing_since = None
+    _last_by_subsystem = {}
+
+
+def process_rss_bytes():
+    """Resident set size of this process, or None where it cannot be read."""
+    if sys.platform.startswith("linux"):
+        try:
+            with open("/proc/self/status", "r") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1]) * 1024
+        except OSError:
+            return None
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+                (name, ctypes.c_size_t) for name in (
+                    "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+                    "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage")]
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        handle = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+            return counters.WorkingSetSize
+    return None
+
+
+def subsystem_of(traceback):
+    """The app module responsible for an allocation: the innermost frame under src/, else the
+    innermost frame's top-level package (e.g. PIL, json, tkinter)."""
+    for frame in reversed(traceback):
+        path = frame.filename.replace("\\", "/")
+        index = path.rfind("/src/")
+        if index != -1:
+            return path[index + 1:-3].replace("/", ".") if path.endswith(".py") else path[index + 1:]
+    if not len(traceback):
+        return "unknown"
+    path = traceback[-1].filename.replace("\\", "/")
+    if path.startswith("<"):
+        return f"python:{path}"  # <string>, <frozen ...>
+    if "/site-packages/" in path:
+        return path.split("/site-packages/", 1)[1].split("/", 1)[0].replace(".py", "")
+    name = os.path.basename(path)
+    return "python:" + (os.path.basename(os.path.dirname(path)) if name == "__init__.py" else name[:-3])
+
+
+def _allocations():
+    """[(subsystem, bytes, blocks)] for everything tracemalloc currently holds, largest first."""
+    snapshot = tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ])
+    totals = {}
+    for trace in snapshot.traces:
+        subsystem = subsystem_of(trace.traceback)
+        size, blocks = totals.get(subsystem, (0, 0))
+        totals[subsystem] = (size + trace.size, blocks + 1)
+    return sorted(((name, size, blocks) for name, (size, blocks) in totals.items()), key=lambda t: t[1], reverse=True)
+
+
+def build_report(trace=False):
+    """Process RSS, tracemalloc usage by subsystem (with growth since the last report) and probe counts.
+
+    Allocations are only reported while tracing is on. With `trace`, tracing is
+    started if needed and stays on so later reports show growth; the figures then
+    cover only what was allocated since it started.
+    """
+    global _last_by_subsystem
+    started_now = trace and not tracemalloc.is_tracing()
+    if trace:
+        start_tracing()
+    report = {"generated_at": time.time(), "rss_bytes": process_rss_bytes(), "probes": {}, "over_budget": []}
+
+    with _lock:
+        probes = dict(_core_probes(), **_probes)
+    for name, fn in probes.items():
+        try:
+            values = dict(fn())
+        except Exception as e:
+            values = {"error": str(e)}
+        budget_mb = MEMORY_BUDGETS_MB.get(name)
+        if budget_mb is not None and values.get("estimated_bytes", 0) > budget_mb * 1048576:
+            report["over_budget"].append(name)
+        report["probes"][name] = values
+
+    if not tracemalloc.is_tracing():
+        report["tracemalloc"] = {"tracing": False}
+        return report
+    current, peak = tracemalloc.get_traced_memory()
+    allocations = _allocations()
+    by_subsystem = {name: size for name, size, _ in allocations}
+    report["tracemalloc"] = {
+        "tracing": True,
+        "tracing_since": _tracing_since,
+        "started_now": started_now,
+        "current_bytes": current,
+        "peak_bytes": peak,
+        "by_subsystem": [{"subsystem": name, "bytes": size, "blocks": blocks,
+                          "growth_bytes": size - _last_by_subsystem.get(name, 0) if _last_by_subsystem else None}
+                         for name, size, blocks in allocations[:MEMORY_REPORT_TOP]],
+    }
+    _last_by_subsystem = by_subsystem
+    return report
+
+
+def format_report(report):
+    """Readable multi-line summary of `build_report()` for the log."""
+    def mb(value):
+        return f"{value / 1048576:.1f} MB" if value is not None else "n/a"
+
+    traced = report["tracemalloc"]
+    if not traced["tracing"]:
+        lines = [f"Memory report: RSS {mb(report['rss_bytes'])}; allocation tracing is off, so only probe counts "
+                 f"are shown"]
+    else:
+        lines = [f"Memory report: RSS {mb(report['rss_bytes'])}, traced Python allocations "
+                 f"{mb(traced['current_bytes'])} (peak {mb(traced['peak_bytes'])})"]
+        if traced["started_now"]:
+            lines.append("  Tracing just started; generate another report later to see what grows")
+    for row in traced.get("by_subsystem", []):
+        growth = f", {'+' if row['growth_bytes'] >= 0 else ''}{mb(row['growth_bytes'])} since last" \
+            if row["growth_bytes"] is not None else ""
+        lines.append(f"  {row['subsystem']}: {mb(row['bytes'])} in {row['blocks']} blocks{growth}")
+    for name, values in report["probes"].items():
+        details = ", ".join(f"{key} {mb(value) if key.endswith('bytes') else value}" for key, value in values.items())
+        flag = " (OVER BUDGET)" if name in report["over_budget"] else ""
+        lines.append(f"  [{name}]{flag} {details}")
+    return "\n".join(lines)
+
+
+def log_report(trace=False):
+    """Build a report, log it, and return it."""
+    report = build_report(trace)
+    log = logging.warning if report["over_budget"] else logging.info
+    log(format_report(report))
+    return report
@@ -2,6 +2,16 @@
 # Path-related utilities
 
 import os
+from src.utils.image_cache import IMAGES_DIR
 
 def get_relative_path(image_directory, filename):
-    return os.path.relpath(os.path.join(image_directory, filename))
\ No newline at end of file
+    return os.path.relpath(os.path.join(image_directory, filename))
+
+def image_url(image_path):
+    """Map a cached image path to its /cache/images URL; data URLs and other values pass through."""
+    if image_path.startswith("data:"):
+        return image_path
+    abs_path = os.path.abspath(image_path)
+    if not abs_path.startswith(os.path.join(os.path.abspath(IMAGES_DIR), "")):
+        return image_path
+    return "/cache/images/" + os.path.relpath(abs_path, IMAGES_DIR).replace(os.sep, "/")
@@ -0,0 +1,274 @@
+# src/utils/printings_cache.py
+# On-disk cache of every printing of a card, with small previews, filled speculatively while the app is idle
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from src.config.settings import CACHE_DIR, PRINTINGS_MAX_AGE_DAYS, PRINTINGS_BUDGET_MB, \
+    PRINTINGS_PREFETCH_PER_MINUTE, PRINTINGS_IDLE_SECONDS
+from src.utils.scryfall_client import scryfall_client, RateLimiter, request_priority, SPECULATIVE
+
+PRINTINGS_DIR = os.path.join(CACHE_DIR, "printings")
+# Fields of a Scryfall card object the Scryfall Search tab uses; the rest is dropped before caching
+PRINTING_FIELDS = ("id", "name", "set", "collector_number", "layout", "image_uris", "card_faces", "foil", "nonfoil",
+                   "frame_effects")
+
+
+def search_pages(card_name, cancelled=None, before_request=None):
+    """Yield (cards, total_cards) for each page of `card_name`'s printings; no pages if it has none."""
+    url, params = scryfall_client.url("/cards/search"), {"q": f'"{card_name}" unique:prints'}
+    while url and not (cancelled and cancelled.is_set()):
+        if before_request:
+            before_request()
+        logging.debug(f"Fetching Scryfall search page: {url}")
+        response = scryfall_client.get(url, params=params)
+        params = None  # next_page URLs already carry the query
+        if response.status_code == 404:  # Scryfall's answer for a search with no matches
+            return
+        response.raise_for_status()
+        data = response.json()
+        cards = data.get("data", [])
+        yield cards, data.get("total_cards", len(cards))
+        url = data.get("next_page") if data.get("has_more") else None
+
+
+class PrintingsCache:
+    """Printings lists (one JSON file per card name) and the small preview of each printing.
+
+    Lists older than PRINTINGS_MAX_AGE_DAYS are treated as missing so new sets
+    show up. When the directory grows past PRINTINGS_BUDGET_MB the least recently
+    used files are deleted; reading a list or preview counts as a use.
+    """
+
+    def __init__(self, root=PRINTINGS_DIR, budget_mb=PRINTINGS_BUDGET_MB, max_age_days=PRINTINGS_MAX_AGE_DAYS):
+        self.root = root
+        self.previews_dir = os.path.join(root, "small")
+        self.budget = budget_mb * 1048576
+        self.max_age = max_age_days * 86400
+        self._lock = threading.Lock()
+        self._total = None  # Bytes on disk, scanned on first write
+
+    def _list_path(self, card_name):
+        digest = hashlib.sha1(card_name.strip().lower().encode("utf-8")).hexdigest()[:20]
+        return os.path.join(self.root, f"{digest}.json")
+
+    def _preview_path(self, card_id):
+        return os.path.join(self.previews_dir, f"{card_id}.jpg")
+
+    def get(self, card_name):
+        """Cached printings of `card_name`, or None if there is no fresh list."""
+        path = self._list_path(card_name)
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if time.time() - data.get("fetched_at", 0) > self.max_age:
+            return None
+        _touch(path)
+        return data["cards"]
+
+    def has(self, card_name):
+        return self.get(card_name) is not None
+
+    def put(self, card_name, cards):
+        """Store a complete printings list for `card_name`."""
+        cards = [{field: card[field] for field in PRINTING_FIELDS if field in card} for card in cards]
+        self._write(self._list_path(card_name), json.dumps({"name": card_name, "fetched_at": time.time(),
+                                                            "cards": cards}).encode("utf-8"))
+
+    def has_preview(self, card_id):
+        return os.path.exists(self._preview_path(card_id))
+
+    def preview(self, card, before_request=None):
+        """Bytes of a printing's small image, from disk or downloaded and stored."""
+        path = self._preview_path(card["id"])
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            _touch(path)
+            return data
+        except OSError:
+            pass
+        if before_request:
+            before_request()
+        response = scryfall_client.get(card["image_uris"]["small"])
+        response.raise_for_status()
+        self._write(path, response.content)
+        return response.content
+
+    def fill(self, card_name, before_request=None):
+        """Cache `card_name`'s printings list and every preview that is missing.
+
+        `before_request` is called before each request, e.g. to wait or pace.
+        Returns (list fetched, previews fetched); (False, 0) means it was all cached.
+        """
+        cards = self.get(card_name)
+        fetched = cards is None
+        if fetched:
+            cards = [card for page, _ in search_pages(card_name, before_request=before_request) for card in page]
+            self.put(card_name, cards)
+        previews = 0
+        for card in cards:
+            if "small" in card.get("image_uris", {}) and not self.has_preview(card["id"]):
+                self.preview(card, before_request=before_request)
+                previews += 1
+        return fetched, previews
+
+    def _write(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        try:
+            replaced = os.path.getsize(path)
+        except OSError:
+            replaced = 0
+        os.replace(tmp_path, path)
+        with self._lock:
+            if self._total is None:
+                self._total = self._scan()
+            else:
+                self._total += len(data) - replaced
+            over = self._total > self.budget
+        if over:
+            self.enforce_budget()
+
+    def _scan(self):
+        return sum(size for _, size, _ in self._files())
+
+    def _files(self):
+        files = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((path, stat.st_size, stat.st_mtime))
+        return files
+
+    def enforce_budget(self):
+        """Delete least recently used lists and previews until the directory is under budget."""
+        with self._lock:
+            files = sorted(self._files(), key=lambda f: f[2])
+            total = sum(size for _, size, _ in files)
+            removed = 0
+            for path, size, _ in files:
+                if total <= self.budget * 0.9:  # Leave headroom so every write does not trigger a scan
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                removed += 1
+            self._total = total
+        if removed:
+            logging.info(f"Printings cache over {self.budget // 1048576} MB; removed {removed} least recently used files")
+
+    def reset(self):
+        """Forget the size tally after the directory was deleted from outside."""
+        with self._lock:
+            self._total = None
+
+    def total_size(self):
+        with self._lock:
+            if self._total is None:
+                self._total = self._scan()
+            return self._total
+
+
+def _touch(path):
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+class _Superseded(Exception):
+    """Raised inside a prefetch run that a newer `start` or `stop` replaced."""
+
+
+class PrintingsPrefetcher:
+    """Fetch printings lists and previews for deck cards in the background while the app is idle.
+
+    Work pauses whenever the user has been active in the last PRINTINGS_IDLE_SECONDS
+    or deck images are downloading, and every request it makes is paced to
+    PRINTINGS_PREFETCH_PER_MINUTE and sent in the client's speculative class. Names
+    with a fresh cached list and previews are skipped, so restarts resume cheaply.
+    """
+
+    def __init__(self, cache, requests_per_minute=PRINTINGS_PREFETCH_PER_MINUTE, idle_seconds=PRINTINGS_IDLE_SECONDS):
+        self.cache = cache
+        self.rate_limiter = RateLimiter(requests_per_minute / 60)
+        self.idle_seconds = idle_seconds
+        self.last_activity = 0.0
+        self.stats = {"lists": 0, "previews": 0, "skipped": 0, "failed": 0}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def note_activity(self):
+        """Record user activity; prefetching waits until the app has been idle for a while."""
+        self.last_activity = time.monotonic()
+
+    def start(self, card_names):
+        """Prefetch printings for `card_names` in order, replacing any earlier run."""
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+        names = list(dict.fromkeys(name for name in card_names if name))
+        if names:
+            threading.Thread(target=self._run, args=(names, generation), daemon=True).start()
+
+    def stop(self):
+        with self._lock:
+            self._generation += 1
+
+    def _current(self, generation):
+        return generation == self._generation
+
+    def _wait_for_idle(self, generation):
+        """Block until the app is idle and the prefetch rate allows another request."""
+        from src.utils.download_queue import download_queue
+        while self._current(generation):
+            quiet_for = time.monotonic() - self.last_activity
+            if quiet_for >= self.idle_seconds and not download_queue.running:
+                self.rate_limiter.acquire()
+                return
+            time.sleep(max(0.5, self.idle_seconds - quiet_for))
+        raise _Superseded()
+
+    def _run(self, names, generation):
+        logging.info(f"Prefetching printings for {len(names)} deck cards while idle")
+        started = time.monotonic()
+        try:
+            with request_priority(SPECULATIVE):
+                for name in names:
+                    self._prefetch(name, generation)
+        except _Superseded:
+            logging.debug("Printings prefetch superseded")
+            return
+        logging.info(f"Printings prefetch finished in {time.monotonic() - started:.0f}s: {self.stats['lists']} lists "
+                     f"and {self.stats['previews']} previews fetched, {self.stats['skipped']} cards already cached, "
+                     f"{self.stats['failed']} failed; cache {self.cache.total_size() / 1048576:.1f} MB")
+
+    def _prefetch(self, name, generation):
+        try:
+            fetched, previews = self.cache.fill(name, before_request=lambda: self._wait_for_idle(generation))
+            self.stats["lists"] += fetched
+            self.stats["previews"] += previews
+            if not fetched and not previews:
+                self.stats["skipped"] += 1
+        except _Superseded:
+            raise
+        except Exception as e:
+            self.stats["failed"] += 1
+            logging.warning(f"Failed to prefetch printings of {name}: {str(e)}")
+
+
+printings_cache = PrintingsCache()
+printings_prefetcher = PrintingsPrefetcher(printings_cache)
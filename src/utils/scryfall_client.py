@@ -0,0 +1,323 @@
+# src/utils/scryfall_client.py
+# One HTTP client for every Scryfall call: pooled connections, prioritised rate limit, request coalescing
+import time
+import logging
+import itertools
+import threading
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import Future
+from urllib.parse import urlsplit, urlencode
+from src.config.settings import SCRYFALL_API_URL, SCRYFALL_REQUESTS_PER_SECOND, SCRYFALL_USER_AGENT, \
+    SCRYFALL_IMAGE_CONCURRENCY, SCHEDULER_AGING_SECONDS
+
+POOL_SIZE = 16  # Connections kept open per host
+LATENCY_SAMPLES = 500  # Recent samples kept per endpoint for percentiles
+
+# Request classes, most urgent first
+INTERACTIVE = 0  # The caster is waiting on it: searches, replace and add clicks
+BULK = 1         # User-started batch work such as deck downloads; the default
+SPECULATIVE = 2  # Prefetching nobody has asked for yet
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BULK: "bulk", SPECULATIVE: "speculative"}
+
+_context = threading.local()
+
+
+@contextmanager
+def request_priority(priority):
+    """Send the Scryfall requests made on this thread inside the block in class `priority`."""
+    previous = current_priority()
+    _context.priority = priority
+    try:
+        yield
+    finally:
+        _context.priority = previous
+
+
+def current_priority():
+    return getattr(_context, "priority", BULK)
+
+
+class RateLimiter:
+    """Space calls at least 1/rate seconds apart across all threads."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_at - now
+            self._next_at = max(now, self._next_at) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+class Ticket:
+    """One request's place in a PriorityGate queue."""
+    _sequence = itertools.count()
+
+    def __init__(self, priority):
+        self.priority = priority
+        self.seq = next(self._sequence)
+        self.enqueued_at = None
+
+
+class ClassStats:
+    def __init__(self):
+        self.granted = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.samples = deque(maxlen=LATENCY_SAMPLES)
+
+    def add(self, wait_ms):
+        self.granted += 1
+        self.total_wait_ms += wait_ms
+        self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+        self.samples.append(wait_ms)
+
+
+class PriorityGate:
+    """Admit requests in priority order, at most `rate` per second and `max_in_flight` at once.
+
+    A waiting request ages by one class every `aging_seconds`, so bulk and
+    speculative work still gets through under a steady stream of interactive
+    requests. Ties go to whoever queued first. Requests already sent are never
+    interrupted; an interactive request just jumps ahead of everything queued.
+    """
+
+    def __init__(self, rate=None, max_in_flight=POOL_SIZE, aging_seconds=SCHEDULER_AGING_SECONDS):
+        self.interval = 1.0 / rate if rate else 0.0
+        self.max_in_flight = max_in_flight
+        self.aging_seconds = aging_seconds
+        self._cond = threading.Condition()
+        self._waiting = []
+        self._in_flight = 0
+        self._next_at = 0.0
+        self._stats = {priority: ClassStats() for priority in PRIORITY_NAMES}
+
+    def _rank(self, ticket, now):
+        return (ticket.priority - (now - ticket.enqueued_at) / self.aging_seconds, ticket.seq)
+
+    def acquire(self, ticket):
+        """Block until `ticket` is the most urgent waiter and the rate and in-flight limits allow it."""
+        with self._cond:
+            ticket.enqueued_at = time.monotonic()
+            self._waiting.append(ticket)
+            self._cond.notify_all()
+            while True:
+                now = time.monotonic()
+                best = min(self._waiting, key=lambda waiter: self._rank(waiter, now))
+                if best is ticket and self._in_flight < self.max_in_flight:
+                    wait = self._next_at - now
+                    if wait <= 0:
+                        break
+                    self._cond.wait(wait)
+                    self._cond.notify_all()  # Aging may have made someone else the most urgent meanwhile
+                else:
+                    self._cond.wait()
+            self._waiting.remove(ticket)
+            self._in_flight += 1
+            self._next_at = max(now, self._next_at) + self.interval
+            self._stats[ticket.priority].add((now - ticket.enqueued_at) * 1000)
+            self._cond.notify_all()
+
+    def release(self):
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def promote(self, ticket, priority):
+        """Raise a queued ticket's class, e.g. when an interactive caller joins a speculative request."""
+        with self._cond:
+            if priority < ticket.priority:
+                ticket.priority = priority
+                self._cond.notify_all()
+
+    def stats(self):
+        """{class name: {queued, granted, mean_wait_ms, p95_wait_ms, max_wait_ms}} plus "in_flight"."""
+        with self._cond:
+            report = {}
+            for priority, stats in self._stats.items():
+                ordered = sorted(stats.samples)
+                report[PRIORITY_NAMES[priority]] = {
+                    "queued": sum(1 for ticket in self._waiting if ticket.priority == priority),
+                    "granted": stats.granted,
+                    "mean_wait_ms": round(stats.total_wait_ms / stats.granted, 1) if stats.granted else None,
+                    "p95_wait_ms": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))], 1)
+                    if ordered else None,
+                    "max_wait_ms": round(stats.max_wait_ms, 1),
+                }
+            report["in_flight"] = self._in_flight
+            return report
+
+
+class EndpointStats:
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.coalesced = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.samples = deque(maxlen=LATENCY_SAMPLES)
+
+    def summary(self):
+        ordered = sorted(self.samples)
+
+        def pick(p):
+            return round(ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))], 1) if ordered else None
+        return {
+            "requests": self.count,
+            "errors": self.errors,
+            "coalesced": self.coalesced,
+            "mean_ms": round(self.total_ms / self.count, 1) if self.count else None,
+            "p50_ms": pick(50),
+            "p95_ms": pick(95),
+            "max_ms": round(self.max_ms, 1),
+        }
+
+
+class ScryfallClient:
+    """Shared requests.Session for Scryfall's API and image hosts.
+
+    Every request waits its turn in a PriorityGate: calls to the API host share
+    one rate budget, image downloads share a concurrency cap, and within each the
+    most urgent class goes first. The class comes from `request_priority` on the
+    calling thread (BULK if unset). Identical GETs that are already in flight or
+    queued are coalesced: later callers wait for the first fetch and receive the
+    same response, and an urgent caller promotes the queued one. Latency is
+    recorded per endpoint (API path, or host for images) for `latency_stats`,
+    queueing per class for `scheduler_stats`.
+    """
+
+    def __init__(self, api_url=SCRYFALL_API_URL, requests_per_second=SCRYFALL_REQUESTS_PER_SECOND,
+                 image_concurrency=SCRYFALL_IMAGE_CONCURRENCY):
+        self.api_url = api_url
+        self.api_host = urlsplit(api_url).netloc
+        self.api_gate = PriorityGate(rate=requests_per_second)
+        self.image_gate = PriorityGate(max_in_flight=image_concurrency)
+        self._session = None
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._stats = {}
+
+    @property
+    def session(self):
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE)
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    session.headers.update({"User-Agent": SCRYFALL_USER_AGENT,
+                                            "Accept": "application/json;q=0.9,*/*;q=0.8"})
+                    self._session = session
+        return self._session
+
+    def url(self, path):
+        """Absolute URL for an API path such as `/cards/search`."""
+        return f"{self.api_url}{path}"
+
+    def endpoint(self, url):
+        """Stats bucket for a URL: the first two API path segments, or the host for anything else."""
+        parts = urlsplit(url)
+        if parts.netloc == self.api_host:
+            return "/" + "/".join(parts.path.strip("/").split("/")[:2])
+        return parts.netloc
+
+    def _stats_for(self, endpoint):
+        with self._lock:
+            return self._stats.setdefault(endpoint, EndpointStats())
+
+    def request(self, method, url, params=None, timeout=30, **kwargs):
+        """Send a request through the shared session. GETs without a body are coalesced."""
+        ticket = Ticket(current_priority())
+        if method.upper() == "GET" and "json" not in kwargs and "data" not in kwargs:
+            key = url + ("?" + urlencode(sorted(params.items())) if params else "")
+            return self._coalesced(key, ticket, lambda: self._send(method, url, params, timeout, ticket, **kwargs))
+        return self._send(method, url, params, timeout, ticket, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def _gate(self, url):
+        return self.api_gate if urlsplit(url).netloc == self.api_host else self.image_gate
+
+    def _send(self, method, url, params, timeout, ticket, **kwargs):
+        stats = self._stats_for(self.endpoint(url))
+        gate = self._gate(url)
+        gate.acquire(ticket)
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, url, params=params, timeout=timeout, **kwargs)
+        except Exception:
+            with self._lock:
+                stats.errors += 1
+            raise
+        finally:
+            gate.release()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            stats.count += 1
+            stats.total_ms += elapsed_ms
+            stats.max_ms = max(stats.max_ms, elapsed_ms)
+            stats.samples.append(elapsed_ms)
+            if response.status_code >= 400:
+                stats.errors += 1
+        return response
+
+    def _coalesced(self, key, ticket, fetch):
+        with self._lock:
+            future, owner_ticket = self._in_flight.get(key, (None, None))
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[key] = (future, ticket)
+        if not owner:
+            self._gate(key).promote(owner_ticket, ticket.priority)
+            stats = self._stats_for(self.endpoint(key))
+            with self._lock:
+                stats.coalesced += 1
+            logging.debug(f"Coalesced request for {key}")
+            return future.result()
+        try:
+            response = fetch()
+            future.set_result(response)
+            return response
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def latency_stats(self):
+        """{endpoint: {requests, errors, coalesced, mean_ms, p50_ms, p95_ms, max_ms}}."""
+        with self._lock:
+            return {endpoint: stats.summary() for endpoint, stats in sorted(self._stats.items())}
+
+    def scheduler_stats(self):
+        """{"api"|"images": {class name: {queued, granted, mean_wait_ms, p95_wait_ms, max_wait_ms}, "in_flight"}}."""
+        return {"api": self.api_gate.stats(), "images": self.image_gate.stats()}
+
+    def log_latency_summary(self):
+        for endpoint, summary in self.latency_stats().items():
+            logging.info(f"Scryfall {endpoint}: {summary['requests']} requests, {summary['errors']} errors, "
+                         f"{summary['coalesced']} coalesced, p50 {summary['p50_ms']}ms, p95 {summary['p95_ms']}ms")
+        for gate, classes in self.scheduler_stats().items():
+            for name, summary in classes.items():
+                if name != "in_flight" and summary["granted"]:
+                    logging.info(f"Scryfall {gate} queue, {name}: {summary['granted']} requests, "
+                                 f"mean wait {summary['mean_wait_ms']}ms, p95 {summary['p95_wait_ms']}ms, "
+                                 f"max {summary['max_wait_ms']}ms")
+
+
+scryfall_client = ScryfallClient()
@@ -0,0 +1,95 @@
+# src/utils/scryfall_stream.py
+# Background Scryfall search that streams result pages and thumbnails to the Tk thread
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from src.utils.printings_cache import printings_cache, search_pages
+from src.utils.scryfall_client import request_priority, INTERACTIVE
+
+THUMBNAIL_FETCH_WORKERS = 4
+
+
+def fetch_thumbnail(card, width, height):
+    """Small image of a printing, from the printings cache or downloaded into it, resized to a
+    PIL image. Safe off the Tk thread."""
+    import io
+    from PIL import Image
+    with Image.open(io.BytesIO(printings_cache.preview(card))) as image:
+        return image.resize((width, height), Image.Resampling.LANCZOS)
+
+
+class ScryfallSearchStream:
+    """Fetch every printing of a card in the background, one page at a time.
+
+    Events come back through a queue so the Tk side can render as they arrive:
+    ("page", cards, total_cards) as soon as each page is parsed, then
+    ("thumbnail", scryfall_id, PIL image or None, error) as that page's small
+    images download. Requests are sent in the client's interactive class.
+    A fresh list in the printings cache is sent as a single page without any
+    request, and previews already on disk are not downloaded again; a list
+    fetched in full is cached for next time. Cancelling stops further page and
+    image requests.
+    """
+
+    def __init__(self, card_name, thumb_width, thumb_height):
+        self.card_name = card_name
+        self.thumb_width = thumb_width
+        self.thumb_height = thumb_height
+        self.events = queue.Queue()
+        self.cancelled = threading.Event()
+        self.done = False
+        self.error = None
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def _run(self):
+        try:
+            with request_priority(INTERACTIVE), ThreadPoolExecutor(max_workers=THUMBNAIL_FETCH_WORKERS) as pool:
+                cached = printings_cache.get(self.card_name)
+                pages = [(cached, len(cached))] if cached is not None else search_pages(self.card_name, self.cancelled)
+                fetched = []
+                for cards, total_cards in pages:
+                    fetched.extend(cards)
+                    self.events.put(("page", cards, total_cards))
+                    for card in cards:
+                        if "small" in card.get("image_uris", {}):
+                            pool.submit(self._fetch_thumbnail, card)
+                if cached is None and not fetched:
+                    self.events.put(("page", [], 0))
+                elif cached is None and not self.cancelled.is_set():
+                    printings_cache.put(self.card_name, fetched)
+        except Exception as e:
+            self.events.put(("error", e))
+        self.events.put(None)
+
+    def _fetch_thumbnail(self, card):
+        if self.cancelled.is_set():
+            return
+        try:
+            with request_priority(INTERACTIVE):
+                image = fetch_thumbnail(card, self.thumb_width, self.thumb_height)
+            self.events.put(("thumbnail", card["id"], image, None))
+        except Exception as e:
+            self.events.put(("thumbnail", card["id"], None, e))
+
+    def drain(self, limit):
+        """Return up to `limit` events without blocking; sets `done` (and `error`) at the end."""
+        events = []
+        while len(events) < limit and not self.done:
+            try:
+                event = self.events.get_nowait()
+            except queue.Empty:
+                break
+            if event is None:
+                self.done = True
+            elif event[0] == "error":
+                self.error = event[1]
+            else:
+                events.append(event)
+        return events
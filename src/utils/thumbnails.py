@@ -0,0 +1,152 @@
+# src/utils/thumbnails.py
+# Background thumbnail decoding for progressive gallery loading
+import queue
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from src.config.settings import THUMBNAIL_WORKERS
+from src.utils.image import CustomImage
+from src.utils.image_cache import image_cache
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def render_thumbnail_bytes(path, button_width, button_height):
+    """Decode and resize one image, returning (mode, size, raw pixels). Runs in a worker process."""
+    from PIL import Image
+    if path is None:
+        raise FileNotFoundError("image is not in the image cache")
+    with Image.open(path) as image:
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA")
+        thumbnail = image.resize((button_width, button_height), resample=Image.LANCZOS)
+    return thumbnail.mode, thumbnail.size, thumbnail.tobytes()
+
+
+def get_thumbnail_pool(workers=THUMBNAIL_WORKERS):
+    """Shared process pool for thumbnail work, created on first use. None when disabled."""
+    global _pool
+    if workers <= 1:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=workers)
+            logging.info(f"Started thumbnail process pool with {workers} workers")
+        return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        _pool = None
+
+
+def render_thumbnails(paths, button_width, button_height, pool=None, cancelled=None, window=32):
+    """Yield (index, mode, size, pixels, error) for each path, in order.
+
+    With a process pool, decode and resize are spread across its workers with
+    at most `window` images in flight, so cancelling stops new work quickly.
+    Without one, images are rendered on the calling thread.
+    """
+    if pool is None:
+        for index, path in enumerate(paths):
+            if cancelled is not None and cancelled.is_set():
+                return
+            try:
+                yield (index,) + render_thumbnail_bytes(path, button_width, button_height) + (None,)
+            except Exception as e:
+                yield index, None, None, None, e
+        return
+
+    in_flight = deque()
+    paths = iter(enumerate(paths))
+    while True:
+        while len(in_flight) < window and not (cancelled is not None and cancelled.is_set()):
+            try:
+                index, path = next(paths)
+            except StopIteration:
+                break
+            in_flight.append((index, pool.submit(render_thumbnail_bytes, path, button_width, button_height)))
+        if not in_flight:
+            return
+        index, future = in_flight.popleft()
+        if cancelled is not None and cancelled.is_set():
+            future.cancel()
+            continue
+        try:
+            yield (index,) + future.result() + (None,)
+        except BrokenProcessPool:
+            _reset_pool()
+            raise
+        except Exception as e:
+            yield index, None, None, None, e
+
+
+class ThumbnailLoader:
+    """Decode and resize thumbnails off the Tk thread.
+
+    Rendering is spread over the shared process pool and the finished pixel
+    buffers come back through a queue. PhotoImages can only be created on the
+    Tk thread, so the Tk side calls `drain` from an `after()` loop.
+    """
+
+    def __init__(self, filenames, button_width, button_height):
+        self.filenames = list(filenames)
+        self.button_width = button_width
+        self.button_height = button_height
+        self.results = queue.Queue()
+        self.cancelled = threading.Event()
+        self.done = False
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def _run(self):
+        images = [CustomImage(filename) for filename in self.filenames]
+        try:
+            pool = get_thumbnail_pool()
+        except (OSError, ValueError) as e:
+            logging.warning(f"Thumbnail process pool unavailable, rendering in-thread: {str(e)}")
+            pool = None
+        finished = set()
+        try:
+            self._render(images, pool, finished)
+        except BrokenProcessPool as e:
+            logging.error(f"Thumbnail process pool failed, rendering the rest in-thread: {str(e)}", exc_info=True)
+            self._render([image for i, image in enumerate(images) if i not in finished], None, set())
+        self.results.put(None)
+
+    def _render(self, images, pool, finished):
+        from PIL import Image
+        results = render_thumbnails([image.path for image in images], self.button_width, self.button_height,
+                                    pool=pool, cancelled=self.cancelled)
+        for index, mode, size, pixels, error in results:
+            finished.add(index)
+            image = images[index]
+            if error is None:
+                image_cache.touch(image.name)
+                self.results.put((image, Image.frombytes(mode, size, pixels), None))
+            else:
+                self.results.put((image, None, error))
+
+    def drain(self, limit):
+        """Return up to `limit` (CustomImage, PIL image, error) results without blocking."""
+        items = []
+        while len(items) < limit and not self.done:
+            try:
+                item = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                self.done = True
+            else:
+                items.append(item)
+        return items
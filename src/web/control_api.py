@@ -0,0 +1,257 @@
+# src/web/control_api.py
+# HTTP and WebSocket API for driving the overlay slots without the GUI
+import json
+import hmac
+import time
+import bisect
+import logging
+import threading
+from functools import wraps
+from flask import request, jsonify
+from src.config.settings import CACHE_DIR, CONTROL_API_TOKEN, CONTROL_API_BUDGET_MS
+from src.utils.image import create_clear_png
+from src.utils.image_cache import image_cache
+from src.utils.paths import get_relative_path, image_url
+from src.core.stream_quality import upgrade_slotted
+
+try:  # WebSocket support is optional
+    from flask_sock import Sock
+except ImportError:
+    Sock = None
+
+
+class ControlError(Exception):
+    """A control request that cannot be applied; carries the HTTP status to return."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class CardLookup:
+    """Name index over the image cache, rebuilt only when the cache changes."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._generation = None
+        self._names = []  # Sorted (lowercase name, key) pairs
+
+    def _refresh(self):
+        with self._lock:
+            if self._generation == image_cache.generation:
+                return self._names
+            self._generation = image_cache.generation
+            self._names = sorted((entry["name"].lower(), key) for key, entry in image_cache.items())
+            return self._names
+
+    def find(self, name, set_code=None, limit=20):
+        """Keys whose card name matches `name`: exact matches, then prefix, then substring."""
+        names = self._refresh()
+        query = name.lower().strip()
+        start = bisect.bisect_left(names, (query, ""))
+        exact, prefix = [], []
+        for card_name, key in names[start:]:
+            if not card_name.startswith(query):
+                break
+            (exact if card_name == query else prefix).append(key)
+        keys = exact + prefix
+        if not keys:
+            keys = [key for card_name, key in names if query in card_name]
+        if set_code:
+            keys = [key for key in keys if image_cache.get(key)["set"].lower() == set_code.lower()]
+        return keys[:limit]
+
+
+card_lookup = CardLookup()
+
+
+def _card_json(key):
+    entry = image_cache.get(key)
+    return {
+        "card": key,
+        "name": entry["name"],
+        "set": entry["set"],
+        "collector_number": entry["collector_number"],
+        "url": image_url(image_cache.path(key)),
+    }
+
+
+def _resolve_card(spec):
+    """(cache key, slot path) for an operation's card, given by cache key ("card") or by "name" and optional "set"."""
+    key = spec.get("card")
+    if key is None and spec.get("name"):
+        matches = card_lookup.find(spec["name"], spec.get("set"), limit=1)
+        key = matches[0] if matches else None
+    entry = image_cache.get(key) if key is not None else None
+    if entry is None:
+        raise ControlError(f"Card not found: {spec.get('card') or spec.get('name')}", 404)
+    return key, get_relative_path(CACHE_DIR, entry["path"])
+
+
+def _slot_index(browser, slot):
+    """Convert a 1-based API slot number to the WebPage index."""
+    if not isinstance(slot, int) or not 1 <= slot <= len(browser.slots):
+        raise ControlError(f"Invalid slot: {slot}")
+    return slot - 1
+
+
+def parse_operation(browser, op):
+    """Turn one JSON operation into (WebPage.apply tuple, cache key of its card or None), resolving cards up front."""
+    if not isinstance(op, dict):
+        raise ControlError("Each operation must be a JSON object")
+    kind = op.get("op")
+    if kind == "set":
+        slot = _slot_index(browser, op.get("slot"))
+        key, path = _resolve_card(op)
+        return ("set", slot, path), key
+    if kind == "clear":
+        return ("clear", _slot_index(browser, op.get("slot"))), None
+    if kind == "push":
+        key, path = _resolve_card(op)
+        return ("push", path), key
+    raise ControlError(f"Unknown operation: {kind}")
+
+
+def apply_operations(browser, ops):
+    """Validate every operation, then apply them as one atomic update."""
+    if not isinstance(ops, list) or not ops:
+        raise ControlError("Expected a non-empty list of operations")
+    parsed = [parse_operation(browser, op) for op in ops]
+    snapshot = browser.apply([operation for operation, _ in parsed], create_clear_png())
+    for operation, key in parsed:
+        if key is not None:
+            browser.note_recent(operation[-1])
+            upgrade_slotted(browser, key)
+    return slots_json(browser, snapshot)
+
+
+def slots_json(browser, snapshot=None):
+    snapshot = snapshot or browser.snapshot()
+    clear_url = create_clear_png()
+    return {"version": snapshot.version,
+            "slots": {f"slot{i + 1}": image_url(path or clear_url) for i, path in enumerate(snapshot.slots)}}
+
+
+def handle_message(browser, message):
+    """Handle one WebSocket message: an operation object or {"ops": [...]}. Returns the reply dict."""
+    try:
+        payload = json.loads(message)
+        if isinstance(payload, dict) and "op" not in payload:
+            return apply_operations(browser, payload.get("ops"))
+        return apply_operations(browser, [payload])
+    except json.JSONDecodeError as e:
+        return {"error": f"Invalid JSON: {str(e)}", "status": 400}
+    except ControlError as e:
+        return {"error": str(e), "status": e.status}
+
+
+def _authorized():
+    if not CONTROL_API_TOKEN:
+        return True
+    supplied = request.headers.get("X-API-Token") or request.args.get("token") or ""
+    return hmac.compare_digest(supplied, CONTROL_API_TOKEN)
+
+
+def _endpoint(fn=None, budget_ms=CONTROL_API_BUDGET_MS):
+    """Check the token, map ControlError to JSON errors and report handler time.
+
+    Handlers slower than `budget_ms` are logged; pass None for diagnostics that are slow by design.
+    """
+    if fn is None:
+        return lambda f: _endpoint(f, budget_ms)
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        if not _authorized():
+            response = jsonify({"error": "Missing or invalid API token"})
+            response.status_code = 401
+            return response
+        try:
+            response = jsonify(fn(*args, **kwargs))
+        except ControlError as e:
+            response = jsonify({"error": str(e)})
+            response.status_code = e.status
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        response.headers["Server-Timing"] = f"handler;dur={elapsed_ms:.2f}"
+        if budget_ms is not None and elapsed_ms > budget_ms:
+            logging.warning(f"Control API {request.method} {request.path} took {elapsed_ms:.1f}ms")
+        return response
+    return wrapper
+
+
+def register_control_api(app, browser):
+    """Add the /api routes (and /api/ws when flask-sock is installed) bound to `browser`."""
+    # Build the clear image and name index now so the first control request stays within budget
+    create_clear_png()
+    card_lookup.find("")
+
+    @_endpoint
+    def get_slots():
+        return slots_json(browser)
+
+    @_endpoint
+    def set_slot(slot):
+        body = request.get_json(silent=True) or {}
+        return apply_operations(browser, [dict(body, op="set", slot=slot)])
+
+    @_endpoint
+    def clear_slot(slot):
+        return apply_operations(browser, [{"op": "clear", "slot": slot}])
+
+    @_endpoint
+    def push_slot():
+        body = request.get_json(silent=True) or {}
+        return apply_operations(browser, [dict(body, op="push")])
+
+    @_endpoint
+    def batch():
+        body = request.get_json(silent=True) or {}
+        return apply_operations(browser, body.get("ops"))
+
+    @_endpoint
+    def find_cards():
+        name = request.args.get("name", "")
+        if not name.strip():
+            raise ControlError("Query parameter 'name' is required")
+        limit = request.args.get("limit", 20, type=int)
+        return {"cards": [_card_json(key) for key in card_lookup.find(name, request.args.get("set"), limit)]}
+
+    @_endpoint(budget_ms=None)
+    def memory():
+        from src.utils.memory_report import log_report
+        return log_report()
+
+    @_endpoint(budget_ms=None)
+    def memory_tracing():
+        from src.utils.memory_report import start_tracing, stop_tracing
+        if request.method == "POST":
+            start_tracing()
+        else:
+            stop_tracing()
+        return {"tracing": request.method == "POST"}
+
+    app.add_url_rule('/api/slots', 'api_get_slots', get_slots, methods=["GET"])
+    app.add_url_rule('/api/slots/<int:slot>', 'api_set_slot', set_slot, methods=["POST", "PUT"])
+    app.add_url_rule('/api/slots/<int:slot>', 'api_clear_slot', clear_slot, methods=["DELETE"])
+    app.add_url_rule('/api/push', 'api_push_slot', push_slot, methods=["POST"])
+    app.add_url_rule('/api/batch', 'api_batch', batch, methods=["POST"])
+    app.add_url_rule('/api/cards', 'api_find_cards', find_cards, methods=["GET"])
+    app.add_url_rule('/api/memory', 'api_memory', memory, methods=["GET"])
+    app.add_url_rule('/api/memory/tracing', 'api_memory_tracing', memory_tracing, methods=["POST", "DELETE"])
+
+    if Sock is None:
+        logging.info("flask-sock not installed; WebSocket control API disabled")
+        return
+    sock = Sock(app)
+
+    @sock.route('/api/ws')
+    def control_socket(ws):
+        if not _authorized():
+            ws.send(json.dumps({"error": "Missing or invalid API token", "status": 401}))
+            return
+        while True:
+            message = ws.receive()
+            if message is None:
+                break
+            ws.send(json.dumps(handle_message(browser, message)))
@@ -11,8 +11,9 @@ def write_html(browser):
     css_path = os.path.join(OUTPUT_DIR, "style.css")
     clear_path = os.path.join(OUTPUT_DIR, "images", "clear.png")
 
-    slot1_path = browser.get_slot(0) if browser.get_slot(0) else clear_path
-    slot2_path = browser.get_slot(1) if browser.get_slot(1) else clear_path
+    slots = browser.snapshot().slots
+    slot1_path = slots[0] or clear_path
+    slot2_path = slots[1] or clear_path
 
     if not os.path.exists(slot1_path):
         logging.warning(f"Slot 1 path does not exist: {slot1_path}")
@@ -1,10 +1,15 @@
 # src/web/server.py
 import os
 import json
-from flask import Flask, render_template_string, send_from_directory, jsonify
-from src.config.settings import CACHE_DIR
-from src.utils.paths import get_relative_path
+import ipaddress
+from flask import Flask, render_template_string, send_from_directory, jsonify, request
+from src.utils.paths import get_relative_path, image_url
 from src.utils.image import create_clear_png
+from src.utils.image_cache import IMAGES_DIR, image_cache
+from src.utils.favorites import favorite_filenames
+from src.config.settings import PREFETCH_MEMORY_BUDGET_MB, PREFETCH_INTERVAL_MS, SERVER_HOST, SERVER_PORT, \
+    SLOTS_LONG_POLL_SECONDS, CONTROL_API_TOKEN
+from src.web.control_api import register_control_api
 import logging
 
 app = Flask(__name__, static_folder=None)
@@ -13,8 +18,8 @@ app = Flask(__name__, static_folder=None)
 # Serve cache/images only—no output directory
 @app.route('/cache/images/<path:filename>')
 def cache_images(filename):
-    """Serve files from cache/images directory."""
-    return send_from_directory(CACHE_DIR, filename)
+    """Serve files from the sharded cache/images directory."""
+    return send_from_directory(IMAGES_DIR, filename)
 
 
 @app.route('/')
@@ -22,12 +27,13 @@ def index(browser):
     """Serve the HTML with slot images and inline CSS/JS."""
     try:
         clear_url = create_clear_png()  # Base64 in-memory clear.png
-        slot1 = browser.get_slot(0) or clear_url
-        slot2 = browser.get_slot(1) or clear_url
+        snapshot = browser.snapshot()
+        slot1 = snapshot.slots[0] or clear_url
+        slot2 = snapshot.slots[1] or clear_url
 
         # Use base64 for clear.png, Flask route for card images
-        slot1_url = f"/cache/images/{os.path.basename(slot1)}" if 'cache' in slot1 else slot1
-        slot2_url = f"/cache/images/{os.path.basename(slot2)}" if 'cache' in slot2 else slot2
+        slot1_url = image_url(slot1)
+        slot2_url = image_url(slot2)
 
         if 'cache' in slot1 and not os.path.exists(slot1):
             logging.warning(f"Slot 1 file missing: {slot1}")
@@ -86,26 +92,81 @@ def index(browser):
             }});
         }}
 
-        async function updateSlots() {{
+        // Decoded images for likely next cards, least recently used first
+        const PREFETCH_BUDGET_BYTES = {PREFETCH_MEMORY_BUDGET_MB} * 1024 * 1024;
+        const prefetched = new Map();
+        let prefetchedBytes = 0;
+
+        function whenIdle() {{
+            return new Promise(resolve => {{
+                if (window.requestIdleCallback) {{
+                    window.requestIdleCallback(resolve, {{ timeout: 2000 }});
+                }} else {{
+                    setTimeout(resolve, 50);
+                }}
+            }});
+        }}
+
+        async function prefetch(url) {{
+            const cached = prefetched.get(url);
+            if (cached) {{
+                prefetched.delete(url);
+                prefetched.set(url, cached);
+                return;
+            }}
+            const img = new Image();
+            img.src = url;
+            await img.decode();
+            const bytes = img.naturalWidth * img.naturalHeight * 4;
+            prefetched.set(url, {{ img, bytes }});
+            prefetchedBytes += bytes;
+            for (const [oldUrl, entry] of prefetched) {{
+                if (prefetchedBytes <= PREFETCH_BUDGET_BYTES || oldUrl === url) break;
+                prefetched.delete(oldUrl);
+                prefetchedBytes -= entry.bytes;
+            }}
+        }}
+
+        async function prefetchHints() {{
             try {{
-                const response = await fetch('/slots');
+                const response = await fetch('/prefetch');
                 const data = await response.json();
-                const slot1 = document.getElementById('slot1');
-                const slot2 = document.getElementById('slot2');
-                if (slot1.src !== window.location.origin + data.slot1) {{
-                    await preloadImage(data.slot1);
-                    slot1.src = data.slot1;
-                }}
-                if (slot2.src !== window.location.origin + data.slot2) {{
-                    await preloadImage(data.slot2);
-                    slot2.src = data.slot2;
+                // Lowest priority first so the most likely cards end up most recently used
+                for (const url of data.urls.slice().reverse()) {{
+                    await whenIdle();
+                    await prefetch(url).catch(error => console.warn('Prefetch failed:', url, error));
                 }}
+            }} catch (error) {{
+                console.error('Error fetching prefetch hints:', error);
+            }}
+        }}
+
+        async function showInSlot(slot, url) {{
+            if (slot.src === window.location.origin + url || slot.src === url) return;
+            if (!prefetched.has(url)) {{
+                await preloadImage(url);
+            }}
+            slot.src = url;
+        }}
+
+        // Long-poll: the server answers as soon as the slots move past slotsVersion
+        let slotsVersion = -1;
+        async function updateSlots() {{
+            try {{
+                const response = await fetch('/slots?since=' + slotsVersion);
+                const data = await response.json();
+                slotsVersion = data.version;
+                await showInSlot(document.getElementById('slot1'), data.slot1);
+                await showInSlot(document.getElementById('slot2'), data.slot2);
+                updateSlots();
             }} catch (error) {{
                 console.error('Error updating slots:', error);
+                setTimeout(updateSlots, 1000);
             }}
         }}
-        setInterval(updateSlots, 1000);
         updateSlots();
+        setInterval(prefetchHints, {PREFETCH_INTERVAL_MS});
+        prefetchHints();
     </script>
 </body>
 </html>
@@ -117,24 +178,71 @@ def index(browser):
 
 @app.route('/slots')
 def get_slots(browser):
-    """Return current slot paths as JSON."""
+    """Return current slot paths and their version as JSON.
+
+    With `?since=<version>` the request is held until the slots move past that
+    version or SLOTS_LONG_POLL_SECONDS pass, so overlays see changes immediately
+    without polling.
+    """
+    since = request.args.get("since", type=int)
+    if since is None:
+        snapshot = browser.snapshot()
+    else:
+        snapshot = browser.wait_for_change(since, timeout=SLOTS_LONG_POLL_SECONDS)
     clear_url = create_clear_png()
-    slot1 = browser.get_slot(0) or clear_url
-    slot2 = browser.get_slot(1) or clear_url
     slot_data = {
-        "slot1": f"/cache/images/{os.path.basename(slot1)}" if 'cache' in slot1 else slot1,
-        "slot2": f"/cache/images/{os.path.basename(slot2)}" if 'cache' in slot2 else slot2
+        "version": snapshot.version,
+        "slot1": image_url(snapshot.slots[0] or clear_url),
+        "slot2": image_url(snapshot.slots[1] or clear_url)
     }
     return jsonify(slot_data)
 
 
+@app.route('/prefetch')
+def get_prefetch(browser):
+    """Return image URLs the overlay should decode ahead of time: recent cards first, then favorites."""
+    # Compare URLs: slots hold cwd-relative paths, favorites absolute ones
+    current = set(image_url(path) for path in browser.snapshot().slots if path)
+    paths = browser.get_recent() + [image_cache.path(key) for key in favorite_filenames()]
+    urls = []
+    for path in paths:
+        if not path:
+            continue
+        url = image_url(path)
+        if url not in current and url not in urls:
+            urls.append(url)
+    return jsonify({"urls": urls})
+
+
+def is_loopback(host):
+    """True for localhost and loopback addresses, which only this machine can reach."""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def server_host(host=SERVER_HOST, token=CONTROL_API_TOKEN):
+    """Host to bind; a LAN-facing host is refused unless the control API requires a token."""
+    if is_loopback(host) or token:
+        return host
+    logging.error(f"Refusing to serve on {host} without MTG_OBS_API_TOKEN: anyone on the network could drive "
+                  f"the slots. Serving on localhost only; set MTG_OBS_API_TOKEN to accept other machines.")
+    return "localhost"
+
+
 def start_server(browser_instance):
     """Start the Flask server with the given browser instance."""
     app.view_functions['index'] = lambda: index(browser_instance)
     app.view_functions['get_slots'] = lambda: get_slots(browser_instance)
+    app.view_functions['get_prefetch'] = lambda: get_prefetch(browser_instance)
+    register_control_api(app, browser_instance)
 
+    host = server_host()
     from threading import Thread
-    server_thread = Thread(target=lambda: app.run(host="localhost", port=8000, debug=True, use_reloader=False))
+    server_thread = Thread(target=lambda: app.run(host=host, port=SERVER_PORT, debug=False, use_reloader=False, threaded=True))
     server_thread.daemon = True
     server_thread.start()
-    logging.info("Flask server started on http://localhost:8000")
\ No newline at end of file
+    logging.info(f"Flask server started on http://{host}:{SERVER_PORT}")
\ No newline at end of file